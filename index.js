@@ -19,6 +19,7 @@ const commandHandler = require('./src/handlers/command.handler');
 const aliasService = require('./src/services/alias.service');
 const { incrementStats } = require('./src/handlers/system.handler');
 const messageBuffer = require('./src/services/message-buffer.service');
+const prefetchService = require('./src/services/prefetch.service');
 const botConfig = require('./config/bot.config');
 
 console.log("🚀 Iniciando Botillero v2.0...");
@@ -135,6 +136,7 @@ client.on('message_update', message => handleMessageUpdate(client, message));
 // --- CIERRE ELEGANTE ---
 process.on('SIGINT', async () => {
     console.log('\n🛑 Cerrando bot...');
+    prefetchService.stopPrefetch();
     try {
         await client.destroy();
         console.log('✅ Cliente cerrado correctamente.');
@@ -147,6 +149,9 @@ process.on('SIGINT', async () => {
 // --- INICIAR CLIENTE ---
 client.initialize();
 
+// Cachés de Python calientes desde el arranque (solo con PYTHON_PREFETCH=1)
+prefetchService.startPrefetch();
+
 setTimeout(() => {
     console.log('💡 Recordatorio: Usa prefijo ! para comandos: !menu, !clima, !metro, etc.');
 }, 3000);
\ No newline at end of file
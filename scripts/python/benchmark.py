@@ -0,0 +1,361 @@
+# -*- coding: utf-8 -*-
+"""
+benchmark.py
+Mide el camino de parseo + formato de cada script contra fixtures guardados
+(mejor tiempo y pico de memoria) y lo compara con benchmark_baseline.json.
+
+Los fixtures son cassettes de utils.cassette en fixtures/cassettes: las mismas
+URLs que piden los scripts, así que al grabar respuestas reales con
+BOTILLERO_HTTP_MODE=record el benchmark pasa a medir sobre ellas. Los que
+vienen en el repo son páginas sintéticas con la estructura y el tamaño de las
+reales (--generar-fixtures las vuelve a escribir).
+
+Uso:
+  python scripts/python/benchmark.py                     # todos los casos
+  python scripts/python/benchmark.py metro bolsa         # casos que empiezan así
+  python scripts/python/benchmark.py --actualizar        # reescribe la línea base
+  python scripts/python/benchmark.py --backends          # html.parser vs lxml, con/sin subárbol
+  python scripts/python/benchmark.py --generar-fixtures  # reescribe los cassettes sintéticos
+
+Sale con código 1 si algún caso empeora más allá de la tolerancia. La línea
+base depende de la máquina: regenerarla al cambiar de equipo.
+"""
+import base64
+import contextlib
+import gc
+import importlib
+import importlib.util
+import io
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import namedtuple
+
+from utils import cassette, fetch, sopa
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_FILE = os.path.join(SCRIPTS_DIR, 'benchmark_baseline.json')
+
+REPETICIONES = 15
+# Cuánto peor que la línea base se tolera antes de marcar regresión. El tiempo
+# es ruidoso en un VPS compartido; la memoria es casi determinista.
+TOLERANCIA_TIEMPO = 2.0
+TOLERANCIA_MEMORIA = 1.2
+
+URL_JORNADA = 'https://chile.as.com/resultados/futbol/chile/2026/jornada/regular_a_3/'
+URL_TCLASI = 'https://chile.as.com/resultados/futbol/clasificacion_mundial_sudamerica/clasificacion/'
+URL_TRANSBANK = 'https://status.transbankdevelopers.cl/'
+URL_COPA_LIGA = 'https://www.campeonatochileno.cl/ligas/copa-de-la-liga/'
+URL_METRO = 'https://www.metro.cl/el-viaje/estado-red'
+URL_BOLSA = 'https://es.investing.com/indices/chile-indices'
+URL_BENCINA = 'https://api.bencinaenlinea.cl/api/busqueda_estacion_filtro'
+
+def fixture(url):
+    """requests.Response guardado para `url` en los cassettes."""
+    return fetch.respuesta_desde_cache(cassette.reproducir(fetch.host_de(url), url))
+
+
+# ──────────────────────────────────────────
+# Casos
+# ──────────────────────────────────────────
+def _proxpar(m, r):
+    soup = m.sopa_de(r.text)
+    m.numero_de_h1(soup)
+    return m.parsear_jornada(soup)
+
+
+def _bolsa(m, r):
+    return m.formatear_para_whatsapp(m.parsear_indices(r.content, URL_BOLSA))
+
+
+def _bencina(m, r):
+    return [m.imprimir_datos(estacion) for estacion in r.json()['data']]
+
+
+def _texto(m, _):
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta = os.path.join(carpeta, 'base.jpg')
+        from PIL import Image
+        Image.new('RGB', (1080, 1080), (30, 90, 160)).save(ruta)
+        with contextlib.redirect_stdout(io.StringIO()):
+            m.agregar_texto_transparente(ruta, 'Cuando el bot responde', 'antes que el café')
+
+
+# modulo: script a importar; url: fixture (None si no necesita); funcion(modulo, respuesta);
+# parseo: True si el caso depende del backend HTML (entra en --backends)
+Caso = namedtuple('Caso', 'modulo url funcion parseo')
+
+CASOS = {
+    'proxpar.parsear_jornada': Caso('proxpar', URL_JORNADA, _proxpar, True),
+    'metro.parsear_estado_red': Caso('metro', URL_METRO, lambda m, r: m.parsear_estado_red(r.content), True),
+    'bolsa.parsear_indices': Caso('bolsa', URL_BOLSA, _bolsa, True),
+    'bencina.imprimir_datos': Caso('bencina', URL_BENCINA, _bencina, False),
+    'cliga.extraer_grupos': Caso('cliga', URL_COPA_LIGA, lambda m, r: m.extraer_grupos(r.content), True),
+    'liga.extraer_fechas': Caso('liga', URL_COPA_LIGA, lambda m, r: m.extraer_fechas(r.content), True),
+    'tclasi.extraer_equipos': Caso('tclasi', URL_TCLASI, lambda m, r: m.extraer_equipos(r.content), True),
+    'transbank.extraer_estados': Caso('transbank', URL_TRANSBANK, lambda m, r: m.extraer_estados(r.content), True),
+    'texto.agregar_texto_transparente': Caso('texto', None, _texto, False),
+}
+
+
+def medir_tiempo(funcion, repeticiones=REPETICIONES):
+    """
+    Mejor tiempo en ms de varias ejecuciones. Como timeit, se apaga el GC
+    mientras se mide y se toma el mínimo: es lo menos sensible al ruido.
+    """
+    funcion()
+    tiempos = []
+    for _ in range(repeticiones):
+        gc.collect()
+        gc.disable()
+        try:
+            inicio = time.perf_counter()
+            funcion()
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+        finally:
+            gc.enable()
+    return min(tiempos)
+
+
+def medir_memoria(funcion):
+    """Pico de memoria (KB) asignada durante una ejecución."""
+    tracemalloc.start()
+    try:
+        funcion()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return pico / 1024
+
+
+def preparar(caso):
+    modulo = importlib.import_module(caso.modulo)
+    respuesta = fixture(caso.url) if caso.url else None
+    return lambda: caso.funcion(modulo, respuesta)
+
+
+def comparar(nombres, actualizar):
+    try:
+        with open(BASELINE_FILE, encoding='utf-8') as f:
+            base = json.load(f)
+    except FileNotFoundError:
+        base = {}
+
+    fallos = 0
+    print(f"{'caso':<34} {'ms':>8} {'base':>8} {'KB pico':>9} {'base':>8}")
+    for nombre in nombres:
+        funcion = preparar(CASOS[nombre])
+        ms, kb = medir_tiempo(funcion), medir_memoria(funcion)
+        previo = base.get(nombre)
+
+        if actualizar:
+            base[nombre] = {'ms': math.ceil(ms * 10) / 10, 'kb': math.ceil(kb)}
+            print(f"📝 {nombre:<32} {ms:>8.1f} {'':>8} {kb:>9.0f}")
+            continue
+        if previo is None:
+            print(f"⚠️ {nombre:<32} {ms:>8.1f} {'-':>8} {kb:>9.0f} {'-':>8}")
+            continue
+
+        lento = ms > previo['ms'] * TOLERANCIA_TIEMPO
+        pesado = kb > previo['kb'] * TOLERANCIA_MEMORIA
+        marca = '❌' if lento or pesado else '✅'
+        fallos += lento or pesado
+        print(f"{marca} {nombre:<32} {ms:>8.1f} {previo['ms']:>8.1f} {kb:>9.0f} {previo['kb']:>8}")
+
+    if actualizar:
+        with open(BASELINE_FILE, 'w', encoding='utf-8') as f:
+            json.dump(dict(sorted(base.items())), f, indent=2)
+            f.write('\n')
+    return fallos
+
+
+def comparar_backends(nombres):
+    """Tabla de tiempos por backend HTML, con y sin subárbol (utils.sopa)."""
+    backends = ['html.parser'] + (['lxml'] if importlib.util.find_spec('lxml') else [])
+    columnas = [(b + ('+solo' if p else ''), b, p) for b in backends for p in (False, True)]
+    original = sopa.BACKEND, sopa.PARCIAL
+
+    print(f"{'caso':<34} " + ' '.join(f'{etiqueta:>16}' for etiqueta, _, _ in columnas))
+    try:
+        for nombre in nombres:
+            if not CASOS[nombre].parseo:
+                continue
+            funcion = preparar(CASOS[nombre])
+            tiempos = []
+            for _, backend, parcial in columnas:
+                sopa.BACKEND, sopa.PARCIAL = backend, parcial
+                tiempos.append(f"{medir_tiempo(funcion):>13.1f} ms")
+            print(f"{nombre:<34} " + ' '.join(tiempos))
+    finally:
+        sopa.BACKEND, sopa.PARCIAL = original
+
+
+# ──────────────────────────────────────────
+# Fixtures sintéticos
+# ──────────────────────────────────────────
+def relleno(bloques):
+    """Markup de navegación/publicidad que acompaña a los datos en la página real."""
+    item = (
+        '<li class="nav-item"><a href="/seccion/{i}" class="nav-link">Sección {i}</a>'
+        '<div class="promo"><img src="/img/{i}.jpg" alt="promo {i}"><p>Texto promocional {i} '
+        'con algo de contenido para que pese como la página real.</p></div></li>'
+    )
+    return '<ul class="menu">' + ''.join(item.format(i=i) for i in range(bloques)) + '</ul>'
+
+
+def pagina(cuerpo, bloques=400):
+    return (
+        '<!DOCTYPE html><html><head><meta charset="utf-8"><title>x</title></head><body>'
+        f'<header>{relleno(bloques // 2)}</header><main>{cuerpo}</main>'
+        f'<footer>{relleno(bloques // 2)}</footer></body></html>'
+    )
+
+
+def html_jornada():
+    partido = (
+        '<li class="a_sc_l_it"><div class="a_sc_tm"><span class="a_sc_tn">Local {i}</span></div>'
+        '<div class="a_sc_gl">2 - 1</div><div class="a_sc_st">Finalizado</div>'
+        '<div class="a_sc_tm a_sc_tm-r"><span class="a_sc_tn">Visita {i}</span></div></li>'
+    )
+    dias = ''.join(
+        f'<div class="a_sd"><h2 class="a_sd_t">Sábado {d}</h2><ul>'
+        + ''.join(partido.format(i=i) for i in range(4)) + '</ul></div>'
+        for d in range(2)
+    )
+    return pagina(f'<h1>Resultados jornada 3Liga Chilena 2026</h1>{dias}')
+
+
+def html_tclasi():
+    fila = (
+        '<tr><td class="col0">{i}</td><td><span class="a_tb_n">Chile</span></td>'
+        '<td class="--bd">{p}</td><td>10</td><td>5</td></tr>'
+    )
+    filas = ''.join(fila.format(i=i, p=30 - i) for i in range(10))
+    return pagina(f'<table class="a_tb"><thead><tr><th>#</th></tr></thead><tbody>{filas}</tbody></table>')
+
+
+def html_transbank():
+    servicio = (
+        '<div class="component-inner-container"><span class="name">Servicio {i}</span>'
+        '<span class="component-status">Operational</span></div>'
+    )
+    servicios = ''.join(servicio.format(i=i) for i in range(12))
+    return pagina(f'<div class="components-container">{servicios}</div>', bloques=100)
+
+
+def html_copa_liga():
+    """Misma página para liga.py (slides de fechas) y cliga.py (tablas por grupo)."""
+    juego = (
+        '<div class="anwp-fl-game" data-fl-game-datetime="2026-0{m}-1{d}T18:00:00-03:00">'
+        '<div class="match-slim__team-home-title">Local {d}</div>'
+        '<div class="match-slim__team-away-title">Visita {d}</div>'
+        '<span class="match-slim__scores-home">1</span><span class="match-slim__scores-away">0</span></div>'
+    )
+    slides = ''.join(
+        f'<div class="anwp-fl-matchweek-slides__swiper-slide"><div class="competition__stage-title">Fecha {m}</div>'
+        + ''.join(juego.format(m=m, d=d) for d in range(6)) + '</div>'
+        for m in range(1, 10)
+    )
+    celda = '<div class="anwp-grid-table__td">{v}</div>'
+    encabezado = ''.join(
+        f'<div class="anwp-grid-table__th">{c}</div>' for c in ('#', 'Club', 'PJ', 'PT')
+    )
+    grupos = ''
+    for g in 'ABCD':
+        filas = ''.join(
+            celda.format(v=i) + f'<div><a class="anwp-link">Club {g}{i}</a></div>'
+            + celda.format(v=3) + celda.format(v=9 - i)
+            for i in range(1, 5)
+        )
+        grupos += f'<h4>Grupo {g}</h4><div class="anwp-grid-table">{encabezado}{filas}</div>'
+    return pagina(slides + grupos)
+
+
+def html_metro():
+    lineas = ['l1', 'l2', 'l3', 'l4', 'l4a', 'l5', 'l6']
+    filas = ''
+    for i, linea in enumerate(lineas):
+        alertas = '<li>Estación Baquedano cerrada por manifestación</li>' if i == 4 else ''
+        filas += (
+            '<div class="row padding-bottom-30"><div class="col-md-4">'
+            f'<img src="/assets/img/lineas/ico-{linea}.svg"><p class="h4">Operativa</p></div>'
+            f'<div class="col-md-8"><ul>{alertas}</ul></div></div>'
+        )
+    return pagina(f'<div class="card"><div class="card-body">{filas}</div></div>')
+
+
+def html_bolsa():
+    nombres = ['S&P CLX IPSA', 'S&P CLX IGPA', 'US 30', 'US 500', 'DAX', 'FTSE 100', 'Nikkei 225']
+    fila = (
+        '<tr><td><span class="flag"></span></td><td><a href="/indices/{i}">{n}</a></td>'
+        '<td>6.512,34</td><td>6.540,10</td><td>6.498,02</td><td>+12,40</td><td>+0,19%</td>'
+        '<td>1,2M</td><td>16:00:00</td></tr>'
+    )
+    filas = ''.join(fila.format(i=i, n=nombres[i % len(nombres)]) for i in range(40))
+    return pagina(f'<table data-test="indices-cfds" class="common-table"><tbody>{filas}</tbody></table>')
+
+
+def json_bencina(estaciones=800):
+    comunas = ['Santiago', 'Providencia', 'Ñuñoa', 'Maipú', 'La Florida', 'Puente Alto', 'Valparaíso']
+    combustibles = [
+        ('Gasolina 93', '1289'), ('Gasolina 95', '1325'), ('Gasolina 97', '1369'), ('Petróleo Diésel', '1098'),
+    ]
+    datos = [{
+        'comuna': comunas[i % len(comunas)],
+        'direccion': f'Av. Siempre Viva {100 + i}',
+        'latitud': f'-33.{4400 + i}',
+        'longitud': f'-70.{6400 + i}',
+        'combustibles': [
+            {'nombre_largo': nombre, 'precio': precio, 'unidad_cobro': '$/L'}
+            for nombre, precio in combustibles
+        ],
+    } for i in range(estaciones)]
+    return json.dumps({'data': datos}, ensure_ascii=False, separators=(',', ':'))
+
+
+FIXTURES = {
+    URL_JORNADA: ('text/html; charset=utf-8', html_jornada),
+    URL_TCLASI: ('text/html; charset=utf-8', html_tclasi),
+    URL_TRANSBANK: ('text/html; charset=utf-8', html_transbank),
+    URL_COPA_LIGA: ('text/html; charset=UTF-8', html_copa_liga),
+    URL_METRO: ('text/html; charset=UTF-8', html_metro),
+    URL_BOLSA: ('text/html; charset=utf-8', html_bolsa),
+    URL_BENCINA: ('application/json', json_bencina),
+}
+
+
+def generar_fixtures():
+    for url, (tipo, generar) in FIXTURES.items():
+        cuerpo = generar().encode('utf-8')
+        cassette.grabar(fetch.host_de(url), url, {
+            'url': url,
+            'status': 200,
+            'headers': {'Content-Type': tipo},
+            'encoding': 'utf-8',
+            'cuerpo': base64.b64encode(cuerpo).decode('ascii'),
+        })
+        print(f"📝 {url} ({len(cuerpo) // 1024} KB)")
+
+
+def main():
+    opciones = {a for a in sys.argv[1:] if a.startswith('--')}
+    prefijos = [a for a in sys.argv[1:] if not a.startswith('--')]
+    nombres = [n for n in CASOS if not prefijos or any(n.startswith(p) for p in prefijos)]
+
+    if '--generar-fixtures' in opciones:
+        generar_fixtures()
+        return
+    if '--backends' in opciones:
+        comparar_backends(nombres)
+        return
+
+    fallos = comparar(nombres, '--actualizar' in opciones)
+    sys.exit(1 if fallos else 0)
+
+
+if __name__ == '__main__':
+    main()
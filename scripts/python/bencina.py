@@ -3,15 +3,23 @@
 import requests
 import sys
 import json
+from utils import fetch, salida, script
 
 # Asegura que stdout use UTF-8 incluso en Windows (evita UnicodeEncodeError)
-if hasattr(sys.stdout, "reconfigure"):
-    sys.stdout.reconfigure(encoding="utf-8")
+script.configurar_utf8()
+
+def filtrar_estaciones(estaciones, comuna):
+    """Estaciones cuya comuna contiene el texto buscado (sin distinguir mayúsculas)."""
+    comuna = comuna.lower()
+    return [
+        estacion for estacion in estaciones
+        if isinstance(estacion, dict) and "comuna" in estacion and comuna in estacion["comuna"].lower()
+    ]
 
 def obtener_datos_bencina(comuna):
     try:
         url = "https://api.bencinaenlinea.cl/api/busqueda_estacion_filtro"
-        response = requests.get(url, timeout=30)
+        response = fetch.get(url, timeout=30)
         response.raise_for_status()
         datos = response.json()
 
@@ -22,11 +30,7 @@ def obtener_datos_bencina(comuna):
             return {"error": "La API de Bencina en Línea devolvió una respuesta inesperada."}
         
         # Filtrar los datos localmente
-        estaciones_encontradas = [
-            estacion for estacion in datos["data"] 
-            if isinstance(estacion, dict) and "comuna" in estacion and comuna.lower() in estacion["comuna"].lower()
-        ]
-        return estaciones_encontradas
+        return filtrar_estaciones(datos["data"], comuna)
         
     except requests.exceptions.Timeout:
         return {"error": f"El servidor de Bencina en Línea se demoró demasiado en responder (más de 30 segundos)."}
@@ -66,6 +70,7 @@ def main(comuna):
         print(json.dumps(datos_bencina))
         return
 
+    salida.datos({"comuna": comuna, "estaciones": datos_bencina})
     if datos_bencina:
         resultados_finales = [f"✅ Precios de bencina para *{comuna.title()}*:\n"]
         for estacion in datos_bencina:
@@ -77,10 +82,11 @@ def main(comuna):
         print(f"❌ No se encontraron estaciones de servicio para la comuna '{comuna}'.\n\n_Asegúrate de que el nombre esté bien escrito y no uses abreviaturas._")
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
+    argumentos = salida.argumentos()
+    if not argumentos:
         print(json.dumps({"error": "No se proporcionó una comuna."}))
         sys.exit(1)
     
-    comuna_input = " ".join(sys.argv[1:])
-    main(comuna_input)
+    comuna_input = " ".join(argumentos)
+    script.ejecutar(main, comuna_input)
 
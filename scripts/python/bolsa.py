@@ -1,32 +1,20 @@
 # -*- coding: utf-8 -*-
+import asyncio
 import requests
-from bs4 import BeautifulSoup
 import sys
+from utils import afetch, salida, script, sopa, tiempos
 
-# --- Configuración de Codificación ---
-try:
-    import codecs
-    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer)
-    sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer)
-except AttributeError:
-    import codecs
-    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer)
-    sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer)
-except Exception as e:
-    print(f"Advertencia: No se pudo configurar la codificación UTF-8: {e}", file=sys.stderr)
+# Salida UTF-8 (Windows/PowerShell)
+script.configurar_utf8()
 
 # --- Constantes ---
+# Los índices están en una tabla: el resto de la página (pesada) no se arma
+SOLO_TABLAS = sopa.filtro("table")
+
 URLS = {
     "Chile": "https://es.investing.com/indices/chile-indices",  # Chile primero
     "Global": "https://es.investing.com/indices/indices-cfds"
 }
-HEADERS = {
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/110.0.0.0 Safari/537.36",
-    "Accept-Language": "es-ES,es;q=0.9",
-    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8",
-    "Connection": "keep-alive",
-    "Upgrade-Insecure-Requests": "1",
-}
 PAISES_INDICES = {
     "US 30": "Estados Unidos", "US 500": "Estados Unidos", "US Tech 100": "Estados Unidos",
     "SmallCap 2000": "Estados Unidos", "DAX": "Alemania", "FTSE 100": "Reino Unido",
@@ -42,17 +30,10 @@ BANDERAS_PAISES = {
 }
 
 # --- Funciones ---
-def obtener_datos(url):
-    """Extrae datos de índices bursátiles desde una URL específica."""
-    try:
-        response = requests.get(url, headers=HEADERS, timeout=15)
-        response.raise_for_status()
-    except requests.exceptions.RequestException as e:
-        print(f"Error al obtener la página {url}: {e}", file=sys.stderr)
-        return []
-
+def parsear_indices(html, url):
+    """Extrae las filas de la tabla de índices; `url` solo se usa en los mensajes de error."""
     try:
-        soup = BeautifulSoup(response.text, "html.parser")
+        soup = sopa.crear(html, solo=SOLO_TABLAS)
         tabla = soup.find("table", {"data-test": "indices-cfds"}) or \
                 soup.find("table", class_="common-table") or \
                 soup.find("table")
@@ -93,6 +74,17 @@ def obtener_datos(url):
         print(f"Error durante el parseo del HTML en {url}: {e}", file=sys.stderr)
         return []
 
+async def obtener_datos(url):
+    """Extrae datos de índices bursátiles desde una URL específica."""
+    try:
+        response = await afetch.get(url, timeout=15)
+        response.raise_for_status()
+    except requests.exceptions.RequestException as e:
+        print(f"Error al obtener la página {url}: {e}", file=sys.stderr)
+        return []
+
+    return parsear_indices(response.content, url)
+
 def formatear_para_whatsapp(indices):
     """Genera el mensaje formateado para WhatsApp."""
     if not indices:
@@ -110,12 +102,25 @@ def formatear_para_whatsapp(indices):
         )
     return "\n".join(mensaje_partes).strip()
 
+async def obtener_todos():
+    """Descarga todas las URLS en paralelo y junta los índices en el orden de URLS."""
+    resultados = await asyncio.gather(*(obtener_datos(url) for url in URLS.values()))
+    return [indice for indices in resultados for indice in indices]
+
 # --- Ejecución Principal ---
-if __name__ == "__main__":
-    indices_obtenidos = []
-    for nombre, url in URLS.items():
-        print(f"Obteniendo datos de {nombre}...")
-        indices_obtenidos.extend(obtener_datos(url))
+def main():
+    # El avance va a stderr: stdout queda solo con el mensaje final
+    for nombre in URLS:
+        print(f"Obteniendo datos de {nombre}...", file=sys.stderr)
+    indices_obtenidos = afetch.correr(obtener_todos())
+    salida.datos([
+        dict(zip(('nombre', 'ultimo', 'maximo', 'minimo', 'variacion', 'porcentaje'), indice))
+        for indice in indices_obtenidos
+    ])
+
+    with tiempos.etapa('format'):
+        mensaje_whatsapp = formatear_para_whatsapp(indices_obtenidos)
+    print(mensaje_whatsapp)
 
-    mensaje_whatsapp = formatear_para_whatsapp(indices_obtenidos)
-    print(mensaje_whatsapp)  # Imprime solo el resultado final
+if __name__ == "__main__":
+    script.ejecutar(main)
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+check_import_time.py
+Mide el tiempo de importación de cada script con `python -X importtime` y lo
+compara contra el presupuesto versionado en import_budget.json.
+
+Uso:
+  python scripts/python/check_import_time.py               # verifica todos
+  python scripts/python/check_import_time.py metro.py      # solo algunos
+  python scripts/python/check_import_time.py --actualizar  # reescribe el presupuesto
+
+Sale con código 1 si algún script supera su presupuesto o no se puede importar.
+"""
+import json
+import math
+import os
+import statistics
+import subprocess
+import sys
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+BUDGET_FILE = os.path.join(SCRIPTS_DIR, 'import_budget.json')
+
+REPETICIONES = 5
+# Holgura al regenerar el presupuesto: cubre ruido de máquina sin esconder
+# regresiones grandes (p. ej. volver a importar Selenium o Playwright al inicio)
+MARGEN_ACTUALIZAR = 2.0
+
+
+def medir_importacion(script):
+    """Devuelve el tiempo acumulado (ms) de importar el módulo del script."""
+    modulo = script[:-3]
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {modulo}'],
+        cwd=SCRIPTS_DIR, capture_output=True, text=True, encoding='utf-8', errors='replace'
+    )
+    if proc.returncode != 0:
+        ultima = proc.stderr.strip().splitlines()[-1:] or ['sin detalle']
+        raise RuntimeError(ultima[0])
+
+    # Formato: "import time: self [us] | cumulative | imported package"
+    for linea in proc.stderr.splitlines():
+        if not linea.startswith('import time:'):
+            continue
+        partes = linea[len('import time:'):].split('|')
+        if len(partes) == 3 and partes[2].strip() == modulo:
+            return int(partes[1]) / 1000
+    raise RuntimeError('No apareció en la salida de -X importtime')
+
+
+def medir(script, repeticiones=REPETICIONES):
+    """Mediana de varias mediciones para aplanar el ruido del disco/CPU."""
+    return statistics.median(medir_importacion(script) for _ in range(repeticiones))
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    actualizar = '--actualizar' in sys.argv
+
+    with open(BUDGET_FILE, encoding='utf-8') as f:
+        presupuesto = json.load(f)
+
+    scripts = args or sorted(presupuesto)
+    fallos = 0
+
+    for script in scripts:
+        try:
+            ms = medir(script)
+        except RuntimeError as e:
+            print(f"❌ {script}: no se pudo importar ({e})")
+            fallos += 1
+            continue
+
+        if actualizar:
+            presupuesto[script] = int(math.ceil(ms * MARGEN_ACTUALIZAR / 10) * 10)
+            print(f"📝 {script}: {ms:.1f} ms -> presupuesto {presupuesto[script]} ms")
+            continue
+
+        limite = presupuesto.get(script)
+        if limite is None:
+            print(f"⚠️ {script}: {ms:.1f} ms (sin presupuesto)")
+        elif ms > limite:
+            print(f"❌ {script}: {ms:.1f} ms > {limite} ms")
+            fallos += 1
+        else:
+            print(f"✅ {script}: {ms:.1f} ms <= {limite} ms")
+
+    if actualizar:
+        with open(BUDGET_FILE, 'w', encoding='utf-8') as f:
+            json.dump(dict(sorted(presupuesto.items())), f, indent=2)
+            f.write('\n')
+
+    sys.exit(1 if fallos else 0)
+
+
+if __name__ == '__main__':
+    main()
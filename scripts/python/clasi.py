@@ -1,8 +1,7 @@
 # -*- coding: utf-8 -*-
 import requests
-from bs4 import BeautifulSoup
 from unidecode import unidecode
-import sys
+from utils import fetch, salida, script, sopa
 
 # Diccionario de banderas
 banderas = {
@@ -19,20 +18,22 @@ banderas = {
 }
 
 # Configura la codificación de salida para la consola
-sys.stdout.reconfigure(encoding='utf-8')
+script.configurar_utf8()
 
 def obtener_datos_jornada(url, fechas_buscadas):
     try:
-        page = requests.get(url)
+        page = fetch.get(url)
         page.raise_for_status()  # Lanza un error para códigos de estado HTTP 4xx/5xx
 
-        soup = BeautifulSoup(page.content, 'html.parser')
+        soup = sopa.crear(page.content, solo=sopa.filtro(clase='cont-modulo'))
         jornadas = soup.select(".cont-modulo.resultados")
         
+        encontradas = []
         for jornada in jornadas:
             fecha_jornada = jornada.select_one('h2 span').text.strip()
             if fecha_jornada in fechas_buscadas:
-                imprimir_jornada(jornada, fecha_jornada)
+                encontradas.append(imprimir_jornada(jornada, fecha_jornada))
+        salida.datos(encontradas)
     except requests.RequestException as e:
         print(f"Error en request: {e}")
     except Exception as e:
@@ -45,6 +46,7 @@ def imprimir_jornada(jornada, fecha_jornada):
     print(f'Jornada {unidecode(jornada_num)} : {unidecode(fecha_jornada)}')
     print('---------------------------------')
     
+    datos = {'jornada': unidecode(jornada_num), 'fecha': unidecode(fecha_jornada), 'partidos': []}
     partidos = jornada.select('tbody tr')
     for partido in partidos:
         equipo_local = unidecode(partido.select_one('.col-equipo-local').text.strip())
@@ -57,12 +59,15 @@ def imprimir_jornada(jornada, fecha_jornada):
         
         print(f"{bandera_local} {equipo_local} {resultado} {equipo_visitante} {bandera_visitante}")
         print()
+        datos['partidos'].append({'local': equipo_local, 'resultado': resultado, 'visitante': equipo_visitante})
         
     print('---------------------------------')
+    return datos
 
 # URL y fechas a buscar
 urlas = 'https://chile.as.com/resultados/futbol/clasificacion_mundial_sudamerica/calendario/?omnil=mpal'
 fechas_buscadas = ['09 Sept.']
 
-# Ejecuta la función principal
-obtener_datos_jornada(urlas, fechas_buscadas)
+if __name__ == "__main__":
+    # Ejecuta la función principal
+    script.ejecutar(obtener_datos_jornada, urlas, fechas_buscadas)
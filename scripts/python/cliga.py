@@ -1,21 +1,11 @@
-import requests
-from bs4 import BeautifulSoup
 import sys
-import io
+from utils import fetch, salida, script, sopa
 
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+script.configurar_utf8()
 
-def main():
-    url = "https://www.campeonatochileno.cl/ligas/copa-de-la-liga/"
-    headers = {'User-Agent': 'Mozilla/5.0'}
-    try:
-        r = requests.get(url, headers=headers, timeout=15)
-        r.raise_for_status()
-    except Exception as e:
-        print("Error al obtener datos:", e)
-        sys.exit(1)
-
-    soup = BeautifulSoup(r.text, 'html.parser')
+def extraer_grupos(html):
+    """Extrae los grupos de la Copa de la Liga con sus equipos (pos, club, pts)."""
+    soup = sopa.crear(html)
     grupos = []
     
     # Cada grupo empieza con un h4 "Grupo A", etc.
@@ -91,6 +81,19 @@ def main():
                             grupos.append({'name': group_title, 'teams': teams})
                         break
                 table_container = table_container.find_next_sibling()
+    return grupos
+
+def main():
+    url = "https://www.campeonatochileno.cl/ligas/copa-de-la-liga/"
+    try:
+        r = fetch.get(url, timeout=15)
+        r.raise_for_status()
+    except Exception as e:
+        print("Error al obtener datos:", e)
+        sys.exit(1)
+
+    grupos = fetch.parsear(r, 'cliga.grupos/v1', extraer_grupos)
+    salida.datos(grupos)
 
     if not grupos:
         print("No se encontraron los grupos.")
@@ -112,4 +115,4 @@ def main():
             print(f"{emoji} `{str(t['pos'])+'.':<3} {nom:<24} {str(t['pts']):>3}pts`")
 
 if __name__ == "__main__":
-    main()
+    script.ejecutar(main)
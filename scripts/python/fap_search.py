@@ -1,12 +1,10 @@
 import sys
 import json
-import requests
 import re
-import io
-from bs4 import BeautifulSoup
+from utils import fetch, script, sopa
 
 # Configurar salida UTF-8 para evitar errores en Windows
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+script.configurar_utf8()
 
 BASE_URL = "https://fapello.com/search/{}/"
 
@@ -15,16 +13,11 @@ def search_fap(search_term):
     term_url = search_term.strip().lower().replace(' ', '').replace('-', '').replace('_', '')
     url = BASE_URL.format(term_url)
 
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-        'Referer': 'https://fapello.com/'
-    }
-
     try:
-        r = requests.get(url, headers=headers, timeout=10, allow_redirects=True)
+        r = fetch.get(url, headers={'Referer': 'https://fapello.com/'}, timeout=10, allow_redirects=True)
         r.raise_for_status()
 
-        soup = BeautifulSoup(r.text, 'html.parser')
+        soup = sopa.crear(r.content, solo=sopa.filtro('a'))
 
         # Los resultados son links a perfiles: href="https://fapello.com/username/"
         patron = re.compile(r'https://fapello\.com/([a-zA-Z0-9_\-\.]+)/$')
@@ -81,9 +74,12 @@ def search_fap(search_term):
         return json.dumps({'text': msg.strip()}, ensure_ascii=False)
 
 
-if __name__ == '__main__':
+def main():
     if len(sys.argv) > 1:
         search_term = " ".join(sys.argv[1:])
         print(search_fap(search_term))
     else:
         print(json.dumps({'text': 'Error: Término de búsqueda no proporcionado.'}, ensure_ascii=False))
+
+if __name__ == '__main__':
+    script.ejecutar(main)
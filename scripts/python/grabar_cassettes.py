@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+grabar_cassettes.py
+Graba (o regraba) los cassettes de fixtures/cassettes corriendo cada scraper
+contra la red real con BOTILLERO_HTTP_MODE=record (ver utils/cassette.py).
+
+  python grabar_cassettes.py              graba todos
+  python grabar_cassettes.py metro bolsa  solo los scripts que empiezan así
+
+Los cassettes que trae el repo para el benchmark son páginas sintéticas
+(benchmark.py --generar-fixtures); una grabación real las reemplaza, así que
+después de grabar hay que regenerar la línea base con
+`python benchmark.py --actualizar`. Selenium/Playwright y las consultas
+DNS/SSL de net_analyzer no pasan por utils.fetch y no quedan grabadas.
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import namedtuple
+
+from utils import cassette, tiempos
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+TIMEOUT = 180
+
+Grabacion = namedtuple('Grabacion', 'script args')
+
+# Un caso por scraper, con argumentos representativos
+GRABACIONES = [
+    Grabacion('bencina.py', ['Maipú']),
+    Grabacion('bolsa.py', []),
+    Grabacion('clasi.py', []),
+    Grabacion('cliga.py', []),
+    Grabacion('liga.py', []),
+    Grabacion('metro.py', []),
+    Grabacion('net_analyzer.py', ['example.com']),
+    Grabacion('partidos.py', []),
+    Grabacion('proxpar.py', []),
+    Grabacion('tabla.py', []),
+    Grabacion('tclasi.py', []),
+    Grabacion('transbank.py', []),
+    Grabacion('valores.py', []),
+]
+
+
+def _cassettes():
+    try:
+        return {n: os.path.getmtime(os.path.join(cassette.CASSETTE_DIR, n)) for n in os.listdir(cassette.CASSETTE_DIR)}
+    except OSError:
+        return {}
+
+
+def _peticiones_fallidas(stderr):
+    """Peticiones con error según la línea BOTILLERO_TIMING (los scripts salen 0 igual)."""
+    for linea in stderr.splitlines():
+        if linea.startswith(tiempos.PREFIJO):
+            try:
+                return json.loads(linea[len(tiempos.PREFIJO):]).get('cache', {}).get('error', 0)
+            except ValueError:
+                return 0
+    return 0
+
+
+def grabar(grabacion):
+    """
+    Corre el script en modo record; devuelve (code, segundos, peticiones
+    fallidas, última línea de stderr que no sea la de tiempos).
+    """
+    env = {**os.environ, 'BOTILLERO_HTTP_MODE': cassette.GRABAR, 'BOTILLERO_TIMING': '1'}
+    for clave in ('BOTILLERO_JSON', 'BOTILLERO_SWR', 'BOTILLERO_DEADLINE'):
+        env.pop(clave, None)
+    inicio = time.monotonic()
+    try:
+        proc = subprocess.run(
+            [sys.executable, os.path.join(SCRIPTS_DIR, grabacion.script), *grabacion.args],
+            cwd=SCRIPTS_DIR, env=env, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE, timeout=TIMEOUT, text=True, encoding='utf-8', errors='replace',
+        )
+    except subprocess.TimeoutExpired:
+        return 1, time.monotonic() - inicio, 0, f"timeout de {TIMEOUT} s"
+    lineas = [l for l in proc.stderr.strip().splitlines() if not l.startswith(tiempos.PREFIJO)]
+    detalle = (lineas or [''])[-1][:200]
+    return proc.returncode, time.monotonic() - inicio, _peticiones_fallidas(proc.stderr), detalle
+
+
+def main():
+    prefijos = sys.argv[1:]
+    casos = [g for g in GRABACIONES if not prefijos or any(g.script.startswith(p) for p in prefijos)]
+
+    antes = _cassettes()
+    fallidos = 0
+    for grabacion in casos:
+        code, segundos, errores, detalle = grabar(grabacion)
+        if code == 0 and not errores:
+            print(f"✅ {grabacion.script} ({segundos:.1f} s)")
+        elif code == 0:
+            fallidos += 1
+            print(f"⚠️ {grabacion.script} ({segundos:.1f} s) {errores} peticiones sin grabar")
+        else:
+            fallidos += 1
+            print(f"❌ {grabacion.script} (code {code}, {segundos:.1f} s) {detalle}".rstrip())
+
+    despues = _cassettes()
+    cambiados = sorted(n for n, mtime in despues.items() if antes.get(n) != mtime)
+    print(f"\n📼 Cassettes escritos: {', '.join(cambiados) or 'ninguno'}")
+    sys.exit(1 if fallidos else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,42 +1,69 @@
-import requests
-from bs4 import BeautifulSoup
 import json
 from datetime import datetime
-import sys
+from utils import fetch, script, sopa
+
+# Solo se arman los slides de fechas; el resto de la página se descarta
+SOLO_FECHAS = sopa.filtro('div', clase='anwp-fl-matchweek-slides__swiper-slide')
+
+def extraer_fechas(html):
+    """
+    Extrae todas las fechas (slides) del torneo con sus partidos en bruto.
+    No depende de la hora actual, así que su resultado se puede reutilizar
+    mientras la página no cambie.
+    """
+    soup = sopa.crear(html, solo=SOLO_FECHAS)
+    fechas = []
+
+    # Cada fecha del torneo es un slide
+    for slide in soup.find_all('div', class_='anwp-fl-matchweek-slides__swiper-slide'):
+        titulo = slide.find('div', class_='competition__stage-title')
+        partidos = []
+        for partido in slide.find_all('div', class_='anwp-fl-game'):
+            try:
+                partidos.append({
+                    'iso': partido.get('data-fl-game-datetime', ''),
+                    'local': partido.find('div', class_='match-slim__team-home-title').text.strip(),
+                    'visita': partido.find('div', class_='match-slim__team-away-title').text.strip(),
+                    'goles_local': partido.find('span', class_='match-slim__scores-home').text.strip(),
+                    'goles_visita': partido.find('span', class_='match-slim__scores-away').text.strip(),
+                })
+            except AttributeError:
+                # Igual cuenta para saber cuándo termina la fecha
+                partidos.append({'iso': partido.get('data-fl-game-datetime', '')})
+
+        fechas.append({
+            'titulo': titulo.text.strip() if titulo else None,
+            'partidos': partidos,
+        })
+    return fechas
+
 
 def scrapear_fecha_actual():
     url = "https://www.campeonatochileno.cl/ligas/copa-de-la-liga/"
     
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-    }
-    
     try:
-        respuesta = requests.get(url, headers=headers)
+        respuesta = fetch.get(url, timeout=15)
         if respuesta.status_code != 200:
             print(json.dumps({"error": f"Error HTTP: {respuesta.status_code}"}))
             return
             
-        soup = BeautifulSoup(respuesta.text, 'html.parser')
-        
         # 1. Buscar TODAS las fechas (los contenedores de los slides)
-        slides = soup.find_all('div', class_='anwp-fl-matchweek-slides__swiper-slide')
+        fechas = fetch.parsear(respuesta, 'liga.fechas/v1', extraer_fechas)
         
-        if not slides:
+        if not fechas:
             print(json.dumps({"error": "No se encontraron las fechas del torneo en el HTML."}))
             return
 
-        slide_activo = None
+        fecha_activa = None
         ahora = datetime.now()
         
         # 2. Encontrar la fecha actual basada en el tiempo real
-        for slide in slides:
-            partidos_slide = slide.find_all('div', class_='anwp-fl-game')
-            if not partidos_slide:
+        for fecha in fechas:
+            if not fecha['partidos']:
                 continue
                 
             # Tomamos el último partido de esa fecha para saber cuándo termina la jornada
-            ultimo_partido_iso = partidos_slide[-1].get('data-fl-game-datetime', '')
+            ultimo_partido_iso = fecha['partidos'][-1]['iso']
             if ultimo_partido_iso:
                 # Extraer solo la parte "YYYY-MM-DDTHH:MM:SS" (cortamos la zona horaria para evitar problemas)
                 fecha_str = ultimo_partido_iso[:19] 
@@ -45,50 +72,46 @@ def scrapear_fecha_actual():
                     
                     # Si el último partido de esta fecha es en el futuro (o hoy), ¡esta es la fecha activa!
                     if ultimo_partido_dt >= ahora:
-                        slide_activo = slide
+                        fecha_activa = fecha
                         break
                 except ValueError:
                     continue
         
         # Si ya pasó todo el torneo, por defecto mostramos la última fecha registrada
-        if not slide_activo:
-            slide_activo = slides[-1]
+        if not fecha_activa:
+            fecha_activa = fechas[-1]
             
-        titulo_fecha = slide_activo.find('div', class_='competition__stage-title').text.strip()
-        partidos = slide_activo.find_all('div', class_='anwp-fl-game')
+        titulo_fecha = fecha_activa['titulo']
         
         datos_partidos = []
         
         # 3. Extraer los datos exactos de esa fecha ganadora
-        for partido in partidos:
-            try:
-                local = partido.find('div', class_='match-slim__team-home-title').text.strip()
-                visita = partido.find('div', class_='match-slim__team-away-title').text.strip()
-                
-                goles_local = partido.find('span', class_='match-slim__scores-home').text.strip()
-                goles_visita = partido.find('span', class_='match-slim__scores-away').text.strip()
-                
-                if goles_local == "–" or goles_visita == "–":
-                    resultado = "Por jugar"
-                else:
-                    resultado = f"{goles_local} - {goles_visita}"
-                
-                fecha_iso = partido.get('data-fl-game-datetime', '')
-                if fecha_iso:
-                    fecha_str_limpia = fecha_iso[:19]
-                    fecha_obj = datetime.strptime(fecha_str_limpia, "%Y-%m-%dT%H:%M:%S")
-                    fecha_str = fecha_obj.strftime('%d/%m a las %H:%M')
-                else:
-                    fecha_str = "Por definir"
-                
-                datos_partidos.append({
-                    'fecha_hora': fecha_str,
-                    'local': local,
-                    'resultado': resultado,
-                    'visita': visita
-                })
-            except AttributeError:
+        for partido in fecha_activa['partidos']:
+            if 'local' not in partido:
                 continue
+
+            goles_local = partido['goles_local']
+            goles_visita = partido['goles_visita']
+            
+            if goles_local == "–" or goles_visita == "–":
+                resultado = "Por jugar"
+            else:
+                resultado = f"{goles_local} - {goles_visita}"
+            
+            fecha_iso = partido['iso']
+            if fecha_iso:
+                fecha_str_limpia = fecha_iso[:19]
+                fecha_obj = datetime.strptime(fecha_str_limpia, "%Y-%m-%dT%H:%M:%S")
+                fecha_str = fecha_obj.strftime('%d/%m a las %H:%M')
+            else:
+                fecha_str = "Por definir"
+            
+            datos_partidos.append({
+                'fecha_hora': fecha_str,
+                'local': partido['local'],
+                'resultado': resultado,
+                'visita': partido['visita']
+            })
                 
         # Empaquetar y enviar como JSON para Node.js
         salida = {
@@ -103,5 +126,5 @@ def scrapear_fecha_actual():
 
 if __name__ == "__main__":
     # Necesario para no tener problemas de caracteres UTF-8 en Windows/PowerShell
-    sys.stdout.reconfigure(encoding='utf-8')
-    scrapear_fecha_actual()
\ No newline at end of file
+    script.configurar_utf8()
+    script.ejecutar(scrapear_fecha_actual)
\ No newline at end of file
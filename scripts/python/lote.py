@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""
+lote.py
+Corre varios scripts a la vez en un solo proceso y devuelve todos los
+resultados juntos: una respuesta tipo tablero (!metro + !transbank + !valores)
+paga un solo arranque en vez de uno por script, y los scripts comparten las
+sesiones HTTP y la caché de utils.fetch.
+
+  python lote.py '[{"script": "metro.py"}, {"script": "bencina.py", "args": ["Maipú"]}]'
+  python lote.py - < lote.json
+
+Cada elemento puede traer un "id" (por defecto el nombre del script). La
+salida es un objeto JSON:
+
+    {
+      "results": {id: {"code", "ok", "ms", "text", "data", "sources",
+                       "cache", "timings", "stderr"}, ...},
+      "total_ms": ...
+    }
+
+donde text/data/sources/cache/timings son los del sobre de utils.salida de
+cada script. Con --json (o BOTILLERO_JSON=1) ese objeto va como data del
+sobre del propio lote, y su text junta los textos de los scripts que salieron
+bien. Los scripts corren en hilos, cada uno con su stdout, stderr, argv y
+registro de tiempos propios (utils.contexto); el entorno es el del lote para
+todos.
+"""
+import contextvars
+import io
+import json
+import os
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import worker
+from utils import contexto, salida, script
+
+MAX_ELEMENTOS = 12
+MAX_HILOS = 6
+
+# Variables que el lote fija mientras corren sus scripts
+ENTORNO = {'BOTILLERO_JSON': '1', 'BOTILLERO_TIMING': None}
+
+Elemento = namedtuple('Elemento', 'id script args')
+
+
+def leer_elementos(texto):
+    """Valida la lista del lote; ValueError con el motivo si viene mal formada."""
+    lista = json.loads(texto)
+    if not isinstance(lista, list) or not lista:
+        raise ValueError("El lote debe ser una lista no vacía")
+    if len(lista) > MAX_ELEMENTOS:
+        raise ValueError(f"Máximo {MAX_ELEMENTOS} scripts por lote")
+
+    elementos, usados = [], set()
+    for crudo in lista:
+        if isinstance(crudo, str):
+            crudo = {'script': crudo}
+        if not isinstance(crudo, dict) or not crudo.get('script'):
+            raise ValueError(f"Elemento inválido: {crudo!r}")
+        nombre = crudo['script']
+        if nombre == os.path.basename(__file__):
+            raise ValueError("Un lote no puede incluir lote.py")
+        args = crudo.get('args') or []
+        if not isinstance(args, list):
+            raise ValueError(f"args de {nombre} debe ser una lista")
+
+        id_base = str(crudo.get('id') or nombre)
+        id_elemento, n = id_base, 2
+        while id_elemento in usados:
+            id_elemento, n = f"{id_base}#{n}", n + 1
+        usados.add(id_elemento)
+        elementos.append(Elemento(id_elemento, nombre, [str(a) for a in args]))
+    return elementos
+
+
+def _sobre(texto):
+    """Sobre de utils.salida que dejó el script (su última línea), o None."""
+    lineas = texto.strip().splitlines()
+    if not lineas:
+        return None
+    try:
+        sobre = json.loads(lineas[-1])
+    except ValueError:
+        return None
+    return sobre if isinstance(sobre, dict) and 'text' in sobre else None
+
+
+def correr(elemento):
+    """Ejecuta un elemento en el contexto actual y devuelve su resultado."""
+    inicio = time.perf_counter()
+    out, err = io.StringIO(), io.StringIO()
+    try:
+        ruta = worker.resolver_script(elemento.script)
+        codigo = worker.compilar(ruta)
+    except (ValueError, FileNotFoundError) as e:
+        code = 1
+        err.write(str(e))
+    else:
+        with contexto.ejecucion([ruta, *elemento.args], out, err):
+            code = worker.correr_como_main(ruta, codigo)
+
+    texto = out.getvalue()
+    sobre = _sobre(texto) or {'text': texto.rstrip('\n'), 'data': None}
+    return {
+        'code': code,
+        'ok': code == 0,
+        'ms': round((time.perf_counter() - inicio) * 1000, 1),
+        'text': sobre.get('text'),
+        'data': sobre.get('data'),
+        'sources': sobre.get('sources', []),
+        'cache': sobre.get('cache'),
+        'timings': sobre.get('timings'),
+        'stderr': err.getvalue(),
+    }
+
+
+def correr_lote(elementos):
+    """Corre los elementos en paralelo; {id: resultado} en el orden del lote."""
+    previo = {clave: os.environ.get(clave) for clave in ENTORNO}
+    for clave, valor in ENTORNO.items():
+        if valor is None:
+            os.environ.pop(clave, None)
+        else:
+            os.environ[clave] = valor
+    contexto.instalar()
+    try:
+        with ThreadPoolExecutor(max_workers=min(MAX_HILOS, len(elementos))) as pool:
+            # Contexto vacío por elemento: los hilos del pool se reutilizan
+            futuros = [pool.submit(contextvars.Context().run, correr, e) for e in elementos]
+            return {e.id: f.result() for e, f in zip(elementos, futuros)}
+    finally:
+        contexto.desinstalar()
+        for clave, valor in previo.items():
+            if valor is None:
+                os.environ.pop(clave, None)
+            else:
+                os.environ[clave] = valor
+
+
+def main():
+    argumentos = salida.argumentos()
+    if len(argumentos) != 1:
+        print("Uso: python lote.py '<lista JSON>' | -", file=sys.stderr)
+        sys.exit(2)
+    texto = sys.stdin.read() if argumentos[0] == '-' else argumentos[0]
+    try:
+        elementos = leer_elementos(texto)
+    except ValueError as e:
+        print(f"Lote inválido: {e}", file=sys.stderr)
+        sys.exit(2)
+
+    inicio = time.perf_counter()
+    resultados = correr_lote(elementos)
+    respuesta = {'results': resultados, 'total_ms': round((time.perf_counter() - inicio) * 1000, 1)}
+    if salida.pedido():
+        # En el sobre van los resultados como data y el mensaje armado como text
+        salida.datos(respuesta)
+        print('\n\n'.join(r['text'] for r in resultados.values() if r['ok'] and r['text']))
+    else:
+        print(json.dumps(respuesta, ensure_ascii=False, default=str))
+
+
+if __name__ == '__main__':
+    script.configurar_utf8()
+    script.ejecutar(main)
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+metricas.py
+Expone las métricas de la capa Python (ver utils/metricas.py).
+
+  python metricas.py                  imprime el texto de Prometheus
+  python metricas.py --serve [PUERTO] sirve GET /metrics (por defecto en 127.0.0.1:9464)
+  python metricas.py --reset          borra lo acumulado
+"""
+import argparse
+import os
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from utils import archivos, metricas
+
+PUERTO_POR_DEFECTO = 9464
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        cuerpo = metricas.formatear(metricas.leer()).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, formato, *args):
+        pass  # Prometheus consulta cada pocos segundos: no llenar el log
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Métricas de los scripts Python del bot.')
+    parser.add_argument('--serve', nargs='?', const=PUERTO_POR_DEFECTO, type=int, metavar='PUERTO')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--reset', action='store_true')
+    args = parser.parse_args()
+
+    if args.reset:
+        with archivos.bloqueo(metricas.ruta_almacen() + '.lock'):
+            for ruta in (metricas.ruta_almacen(), metricas.ruta_prom()):
+                if os.path.exists(ruta):
+                    os.unlink(ruta)
+        return
+
+    if args.serve is None:
+        sys.stdout.write(metricas.formatear(metricas.leer()))
+        return
+
+    servidor = ThreadingHTTPServer((args.host, args.serve), _Handler)
+    print(f"Métricas en http://{args.host}:{args.serve}/metrics", file=sys.stderr)
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -4,23 +4,26 @@ Script mejorado para obtener el estado del Metro de Santiago.
 Incluye: caché, mejor manejo de errores, output JSON opcional, timeouts optimizados.
 """
 import sys
-import json
 import time
-from bs4 import BeautifulSoup
+import asyncio
 import requests
 from unidecode import unidecode
+from utils import afetch, salida, script, sopa, tiempos
 from datetime import datetime
-import io
 from zoneinfo import ZoneInfo
 import re
-from concurrent.futures import ThreadPoolExecutor
 
 # Configurar la salida estándar para soportar UTF-8
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+script.configurar_utf8()
 
 # --- CONFIGURACIÓN ---
 REQUEST_TIMEOUT = 8  # segundos (reducido de 10)
 
+# Nodos que se arman de cada página; el resto se descarta al parsear
+SOLO_ALERTAS = sopa.filtro('div', clase='tgme_widget_message_wrap')
+SOLO_ESTADO_RED = sopa.filtro('div', clase='card-body')
+SOLO_METROTREN = sopa.filtro('ul', clase='linea-metrotren')
+
 # Mapeo de los íconos de la web a los nombres de las líneas
 LINE_ICONS = {
     'ico-l1.svg': 'Línea 1',
@@ -45,13 +48,13 @@ COLORS = {
 
 # --- FUNCIONES DE SCRAPING ---
 
-def get_latest_telegram_alert():
+async def get_latest_telegram_alert():
     """Obtiene el último post del canal de Telegram @metrosantiagoalertas."""
     url = "https://t.me/s/metrosantiagoalertas"
     try:
-        response = requests.get(url, timeout=REQUEST_TIMEOUT)
+        response = await afetch.get(url, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = sopa.crear(response.content, solo=SOLO_ALERTAS)
         
         messages = soup.find_all('div', class_='tgme_widget_message_wrap')
         
@@ -85,73 +88,77 @@ def get_latest_telegram_alert():
     except requests.exceptions.RequestException as e:
         return {'error': f'Error de conexión: {str(e)}', 'text': None}
 
-def get_metro_cl_status():
-    """Extrae el estado general de cada línea desde metro.cl."""
-    url = 'https://www.metro.cl/el-viaje/estado-red'
-    try:
-        page = requests.get(url, timeout=REQUEST_TIMEOUT)
-        page.raise_for_status()
-        soup = BeautifulSoup(page.content, 'html.parser')
+def parsear_estado_red(html):
+    """Estado de cada línea a partir del HTML de la página de estado de red."""
+    soup = sopa.crear(html, solo=SOLO_ESTADO_RED)
 
-        lines_data = []
-        lines_with_problems = []
-        
-        card_body = soup.find('div', class_='card-body')
-        if not card_body:
-            return {'error': 'No se encontró el contenedor principal', 'lines': [], 'all_operational': None}
+    lines_data = []
+    lines_with_problems = []
+    
+    card_body = soup.find('div', class_='card-body')
+    if not card_body:
+        return {'error': 'No se encontró el contenedor principal', 'lines': [], 'all_operational': None}
 
-        line_rows = card_body.find_all('div', class_='padding-bottom-30')
-        if not line_rows:
-            return {'error': 'No se encontraron líneas', 'lines': [], 'all_operational': None}
+    line_rows = card_body.find_all('div', class_='padding-bottom-30')
+    if not line_rows:
+        return {'error': 'No se encontraron líneas', 'lines': [], 'all_operational': None}
 
-        for row in line_rows:
-            line_info_col = row.find('div', class_='col-md-4')
-            alerts_col = row.find('div', class_='col-md-8')
+    for row in line_rows:
+        line_info_col = row.find('div', class_='col-md-4')
+        alerts_col = row.find('div', class_='col-md-8')
 
-            if not line_info_col or not alerts_col:
-                continue
+        if not line_info_col or not alerts_col:
+            continue
 
-            line_name = "Línea Desconocida"
-            line_img = line_info_col.find('img', src=re.compile(r'ico-l[0-9a-z]+\.svg'))
-            if line_img and 'src' in line_img.attrs:
-                icon_file = line_img['src'].split('/')[-1]
-                if icon_file in LINE_ICONS:
-                    line_name = LINE_ICONS[icon_file]
+        line_name = "Línea Desconocida"
+        line_img = line_info_col.find('img', src=re.compile(r'ico-l[0-9a-z]+\.svg'))
+        if line_img and 'src' in line_img.attrs:
+            icon_file = line_img['src'].split('/')[-1]
+            if icon_file in LINE_ICONS:
+                line_name = LINE_ICONS[icon_file]
 
-            color = COLORS.get(line_name, '⚪️')
+        color = COLORS.get(line_name, '⚪️')
 
-            status_text_tag = line_info_col.find('p', class_='h4')
-            status_text = " ".join(status_text_tag.get_text(separator=' ').split()) if status_text_tag else "Estado no encontrado"
+        status_text_tag = line_info_col.find('p', class_='h4')
+        status_text = " ".join(status_text_tag.get_text(separator=' ').split()) if status_text_tag else "Estado no encontrado"
 
-            problem_list_items = alerts_col.find_all('li')
-            problems = [unidecode(item.get_text(strip=True)) for item in problem_list_items if item.get_text(strip=True)]
-            
-            has_problems = len(problems) > 0
-            
-            if has_problems:
-                lines_with_problems.append(line_name)
-            
-            # Mantener emoji original, solo aplicar unidecode al nombre para comparación
-            lines_data.append({
-                'name': line_name,
-                'name_clean': unidecode(line_name),
-                'color': color,
-                'status': status_text,
-                'has_problems': has_problems,
-                'problems': problems
-            })
+        problem_list_items = alerts_col.find_all('li')
+        problems = [unidecode(item.get_text(strip=True)) for item in problem_list_items if item.get_text(strip=True)]
         
-        return {
-            'error': None,
-            'lines': lines_data,
-            'all_operational': len(lines_with_problems) == 0,
-            'lines_with_problems': [unidecode(name) for name in lines_with_problems]
-        }
+        has_problems = len(problems) > 0
+        
+        if has_problems:
+            lines_with_problems.append(line_name)
+        
+        # Mantener emoji original, solo aplicar unidecode al nombre para comparación
+        lines_data.append({
+            'name': line_name,
+            'name_clean': unidecode(line_name),
+            'color': color,
+            'status': status_text,
+            'has_problems': has_problems,
+            'problems': problems
+        })
+    
+    return {
+        'error': None,
+        'lines': lines_data,
+        'all_operational': len(lines_with_problems) == 0,
+        'lines_with_problems': [unidecode(name) for name in lines_with_problems]
+    }
+
+async def get_metro_cl_status():
+    """Extrae el estado general de cada línea desde metro.cl."""
+    url = 'https://www.metro.cl/el-viaje/estado-red'
+    try:
+        page = await afetch.get(url, timeout=REQUEST_TIMEOUT)
+        page.raise_for_status()
+        return parsear_estado_red(page.content)
 
     except requests.exceptions.RequestException as e:
         return {'error': f'Error de conexión: {str(e)}', 'lines': [], 'all_operational': None}
 
-def get_metrotren_status():
+async def get_metrotren_status():
     """Extrae el estado del Metrotren Nos desde red.cl."""
     url = 'https://www.red.cl/mapas-y-horarios/metrotren/'
     
@@ -161,9 +168,9 @@ def get_metrotren_status():
     }
 
     try:
-        page = requests.get(url, timeout=REQUEST_TIMEOUT)
+        page = await afetch.get(url, timeout=REQUEST_TIMEOUT)
         page.raise_for_status()
-        soup = BeautifulSoup(page.content, 'html.parser')
+        soup = sopa.crear(page.content, solo=SOLO_METROTREN)
 
         problem_stations = []
 
@@ -203,6 +210,15 @@ def get_metrotren_status():
         return {'error': f'Error de conexión: {str(e)}', 'all_operational': None, 'problems': []}
 
 
+async def obtener_todo():
+    """Consulta las tres fuentes en paralelo."""
+    return await asyncio.gather(
+        get_latest_telegram_alert(),
+        get_metro_cl_status(),
+        get_metrotren_status(),
+    )
+
+
 # --- FORMATEO DE OUTPUT ---
 
 def format_text_output(telegram_data, metro_data, metrotren_data):
@@ -252,47 +268,32 @@ def format_text_output(telegram_data, metro_data, metrotren_data):
 
 def main():
     """Función principal."""
-    # Verificar si se pide output JSON
-    json_output = '--json' in sys.argv
-    
     try:
         # MEJORA: Ejecutar consultas en paralelo para reducir tiempo de espera
-        with ThreadPoolExecutor(max_workers=3) as executor:
-            future_telegram = executor.submit(get_latest_telegram_alert)
-            future_metro = executor.submit(get_metro_cl_status)
-            future_metrotren = executor.submit(get_metrotren_status)
-
-            telegram_data = future_telegram.result()
-            metro_data = future_metro.result()
-            metrotren_data = future_metrotren.result()
+        telegram_data, metro_data, metrotren_data = afetch.correr(obtener_todo())
         
-        if json_output:
-            # Output JSON para procesamiento programático
-            output = {
-                'success': True,
-                'telegram': telegram_data,
-                'metro': metro_data,
-                'metrotren': metrotren_data
-            }
-            print(json.dumps(output, ensure_ascii=False, indent=2))
-        else:
-            # Output de texto formateado para WhatsApp
+        # Datos para procesamiento programático (--json, ver utils.salida)
+        salida.datos({
+            'success': True,
+            'telegram': telegram_data,
+            'metro': metro_data,
+            'metrotren': metrotren_data
+        })
+        # Output de texto formateado para WhatsApp
+        with tiempos.etapa('format'):
             text = format_text_output(telegram_data, metro_data, metrotren_data)
-            print(text)
+        print(text)
         
         sys.exit(0)
         
     except Exception as e:
-        if json_output:
-            error_output = {
-                'success': False,
-                'error': str(e)
-            }
-            print(json.dumps(error_output, ensure_ascii=False))
-        else:
-            print(f"❌ Error inesperado: {str(e)}")
+        salida.datos({
+            'success': False,
+            'error': str(e)
+        })
+        print(f"❌ Error inesperado: {str(e)}")
         sys.exit(1)
 
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    script.ejecutar(main)
\ No newline at end of file
@@ -0,0 +1,321 @@
+# -*- coding: utf-8 -*-
+"""
+navegador.py
+Servicio que mantiene un Chromium headless caliente para tabla.py y
+proxpar.py (ver utils/navegador.py): los scripts se conectan a él por CDP y
+abren un contexto nuevo por consulta en vez de lanzar un navegador cada vez.
+
+  python navegador.py           corre el servicio
+  python navegador.py --estado  muestra el navegador vigente
+  python navegador.py --parar   detiene el servicio que esté corriendo
+
+El navegador se recicla pasadas MAX_PAGINAS páginas o si su memoria (RSS,
+sumando sus procesos hijos) supera MAX_RSS_MB: se lanza uno nuevo, los
+scripts pasan a usarlo y el anterior se cierra tras GRACIA segundos para no
+cortar consultas en curso. Sin uso durante INACTIVO el servicio se apaga; los
+scripts lo vuelven a arrancar cuando lo necesitan. Solo corre una instancia a
+la vez (temp/navegador/servicio.lock).
+
+--parar deja la marca temp/navegador/parar, que el servicio revisa en cada
+vuelta para cerrar sus Chromium antes de salir (en Windows una señal mataría
+el proceso sin pasar por ahí); en POSIX además le manda SIGTERM para no
+esperar la vuelta. Su salida queda en temp/navegador/servicio.log, que se
+rota al pasar de MAX_LOG (ver utils/navegador.py).
+"""
+import argparse
+import importlib.util
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+from utils import archivos
+from utils import navegador
+
+MINUTO = 60
+
+MAX_PAGINAS = 200
+MAX_RSS_MB = 800
+GRACIA = 90
+INACTIVO = 30 * MINUTO
+REVISION = 5
+TIMEOUT_ARRANQUE = 30
+# Lo que --parar espera a que el servicio cierre sus navegadores
+ESPERA_PARADA = 2 * REVISION + 15
+
+FLAGS = [
+    '--headless=new',
+    '--remote-debugging-address=127.0.0.1',
+    '--remote-debugging-port=0',
+    '--no-first-run',
+    '--no-default-browser-check',
+    '--disable-background-networking',
+    *navegador.ARGS,
+]
+
+
+def _log(texto):
+    print(f"(Navegador) -> {texto}", flush=True)
+
+
+def ejecutable():
+    """Chromium a usar: BOTILLERO_CHROMIUM o el que instaló Playwright."""
+    if os.environ.get('BOTILLERO_CHROMIUM'):
+        return os.environ['BOTILLERO_CHROMIUM']
+    from playwright.sync_api import sync_playwright
+    with sync_playwright() as p:
+        return p.chromium.executable_path
+
+
+def _descendientes_proc(pid):
+    """pid y todos sus descendientes leyendo /proc (Linux sin psutil)."""
+    hijos = {}
+    for nombre in os.listdir('/proc'):
+        if not nombre.isdigit():
+            continue
+        try:
+            with open(f'/proc/{nombre}/stat') as f:
+                # El nombre del proceso va entre paréntesis y puede tener espacios
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        hijos.setdefault(ppid, []).append(int(nombre))
+    pendientes, todos = [pid], []
+    while pendientes:
+        actual = pendientes.pop()
+        todos.append(actual)
+        pendientes.extend(hijos.get(actual, []))
+    return todos
+
+
+def rss_mb(pid):
+    """Memoria residente del navegador y sus procesos hijos, o None si no se puede medir."""
+    if importlib.util.find_spec('psutil'):
+        import psutil
+        try:
+            raiz = psutil.Process(pid)
+            procesos = [raiz, *raiz.children(recursive=True)]
+            return sum(p.memory_info().rss for p in procesos) / 2 ** 20
+        except psutil.Error:
+            return None
+    if not os.path.isdir('/proc'):
+        return None
+    total = 0
+    for actual in _descendientes_proc(pid):
+        try:
+            with open(f'/proc/{actual}/status') as f:
+                for linea in f:
+                    if linea.startswith('VmRSS:'):
+                        total += int(linea.split()[1])
+                        break
+        except (OSError, ValueError):
+            continue
+    return total / 1024
+
+
+class Chromium:
+    """Un navegador lanzado por el servicio (una generación)."""
+
+    def __init__(self, ruta_ejecutable):
+        self.generacion = str(time.time_ns() // 10 ** 6)
+        self.perfil = archivos.ruta_temp('navegador', 'perfiles', self.generacion)
+        self.desde = time.time()
+        self.endpoint = None
+        self._listo = threading.Event()
+        self.proc = subprocess.Popen(
+            [ruta_ejecutable, *FLAGS, f'--user-data-dir={self.perfil}', 'about:blank'],
+            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+            text=True, encoding='utf-8', errors='replace',
+        )
+        # Chromium anuncia el endpoint en stderr; el hilo sigue drenándolo después
+        threading.Thread(target=self._leer_stderr, daemon=True).start()
+        if not self._listo.wait(TIMEOUT_ARRANQUE) or self.endpoint is None:
+            self.cerrar()
+            raise RuntimeError("Chromium no anunció su endpoint de depuración")
+
+    def _leer_stderr(self):
+        for linea in self.proc.stderr:
+            if self.endpoint is None and linea.startswith('DevTools listening on '):
+                self.endpoint = linea.split(' on ', 1)[1].strip()
+                self._listo.set()
+        self._listo.set()
+
+    def vivo(self):
+        return self.proc.poll() is None
+
+    def paginas(self):
+        return navegador.paginas_usadas(self.generacion)
+
+    def ultimo_uso(self):
+        try:
+            return os.path.getmtime(navegador.ruta_paginas(self.generacion))
+        except OSError:
+            return self.desde
+
+    def cerrar(self):
+        if self.vivo():
+            self.proc.terminate()
+            try:
+                self.proc.wait(10)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+                self.proc.wait()
+        shutil.rmtree(self.perfil, ignore_errors=True)
+        try:
+            os.unlink(navegador.ruta_paginas(self.generacion))
+        except OSError:
+            pass
+
+
+class Servicio:
+    def __init__(self, ruta_ejecutable):
+        self.ejecutable = ruta_ejecutable
+        self.actual = None
+        self.retirados = []  # [(Chromium, cerrar_en)]
+
+    def lanzar(self):
+        nuevo = Chromium(self.ejecutable)
+        if self.actual is not None:
+            self.retirados.append((self.actual, time.time() + GRACIA))
+        self.actual = nuevo
+        archivos.escribir_json(navegador.ruta_estado(), {
+            'endpoint': nuevo.endpoint,
+            'pid': nuevo.proc.pid,
+            'generacion': nuevo.generacion,
+            'servicio': os.getpid(),
+            'desde': nuevo.desde,
+        })
+        _log(f"Chromium {nuevo.generacion} listo (pid {nuevo.proc.pid})")
+
+    def _motivo_reciclaje(self):
+        if not self.actual.vivo():
+            return f"terminó con código {self.actual.proc.returncode}"
+        paginas = self.actual.paginas()
+        if paginas >= MAX_PAGINAS:
+            return f"{paginas} páginas"
+        rss = rss_mb(self.actual.proc.pid)
+        if rss is not None and rss > MAX_RSS_MB:
+            return f"{rss:.0f} MB de RSS"
+        return None
+
+    def paso(self):
+        """Una revisión; False cuando toca apagarse por inactividad."""
+        motivo = self._motivo_reciclaje()
+        if motivo:
+            _log(f"reciclando {self.actual.generacion} ({motivo})")
+            self.lanzar()
+
+        ahora = time.time()
+        for chromium, cerrar_en in list(self.retirados):
+            if ahora >= cerrar_en or not chromium.vivo():
+                chromium.cerrar()
+                self.retirados.remove((chromium, cerrar_en))
+        return ahora - self.actual.ultimo_uso() < INACTIVO
+
+    def cerrar(self):
+        actual = navegador.estado()
+        if self.actual is not None and actual and actual.get('generacion') == self.actual.generacion:
+            try:
+                os.unlink(navegador.ruta_estado())
+            except OSError:
+                pass
+        for chromium in [c for c, _ in self.retirados] + ([self.actual] if self.actual else []):
+            chromium.cerrar()
+
+
+def ruta_parada():
+    return archivos.ruta_temp('navegador', 'parar')
+
+
+def _borrar_parada():
+    try:
+        os.unlink(ruta_parada())
+    except OSError:
+        pass
+
+
+def _terminar(signum, frame):
+    sys.exit(0)
+
+
+def mostrar_estado():
+    actual = navegador.estado()
+    if not actual:
+        print("Servicio detenido")
+        return
+    print(f"Chromium {actual['generacion']} (pid {actual['pid']}, servicio {actual['servicio']})")
+    print(f"  endpoint: {actual['endpoint']}")
+    print(f"  páginas:  {navegador.paginas_usadas(actual['generacion'])}/{MAX_PAGINAS}")
+    rss = rss_mb(actual['pid'])
+    if rss is not None:
+        print(f"  RSS:      {rss:.0f}/{MAX_RSS_MB} MB")
+
+
+def parar():
+    actual = navegador.estado()
+    if not actual:
+        print("Servicio detenido")
+        return
+    with open(ruta_parada(), 'w'):
+        pass
+    if os.name != 'nt':
+        try:
+            os.kill(actual['servicio'], signal.SIGTERM)
+        except OSError as e:
+            print(f"No se pudo detener el servicio: {e}", file=sys.stderr)
+            sys.exit(1)
+
+    # El servicio borra estado.json al cerrar sus navegadores
+    hasta = time.time() + ESPERA_PARADA
+    while time.time() < hasta:
+        if navegador.estado() is None:
+            print(f"Servicio detenido (pid {actual['servicio']})")
+            return
+        time.sleep(0.5)
+    print(f"El servicio (pid {actual['servicio']}) no se detuvo en {ESPERA_PARADA} s", file=sys.stderr)
+    sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Navegador headless compartido por los scripts.')
+    parser.add_argument('--estado', action='store_true', help='mostrar el navegador vigente')
+    parser.add_argument('--parar', action='store_true', help='detener el servicio')
+    args = parser.parse_args()
+
+    if args.estado:
+        mostrar_estado()
+        return
+    if args.parar:
+        parar()
+        return
+
+    with archivos.intentar_bloqueo(archivos.ruta_temp('navegador', 'servicio.lock')) as unico:
+        if not unico:
+            _log("ya hay otro servicio corriendo")
+            return
+
+        signal.signal(signal.SIGTERM, _terminar)
+        # Una marca de un --parar anterior que no alcanzó a ver nadie
+        _borrar_parada()
+        servicio = Servicio(ejecutable())
+        try:
+            servicio.lanzar()
+            while servicio.paso():
+                if os.path.exists(ruta_parada()):
+                    _log("detenido con --parar")
+                    break
+                time.sleep(REVISION)
+            else:
+                _log(f"sin uso hace {INACTIVO // MINUTO} min, apagando")
+        except KeyboardInterrupt:
+            pass
+        finally:
+            servicio.cerrar()
+            _borrar_parada()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,35 +1,19 @@
 import sys
+import asyncio
 import socket
-import whois
-import ipapi
 import requests
-import io
 import ssl
-import threading
 import re
-import dns.resolver
-import dns.reversename
 from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, List, Tuple, Optional
+from utils import afetch, fetch, plazo, salida, script
 
-# Importación segura de Wappalyzer (opcional)
-try:
-    from Wappalyzer import Wappalyzer, WebPage
-    WAPPALYZER_AVAILABLE = True
-except ImportError:
-    WAPPALYZER_AVAILABLE = False
+# ipapi, dnspython y Wappalyzer se importan dentro de la sección que los usa:
+# así un target inválido responde sin pagar su carga.
 
 socket.setdefaulttimeout(10)
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
-
-# Cabeceras para evitar bloqueos
-HEADERS = {
-    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-    'Accept-Language': 'es-ES,es;q=0.9,en;q=0.8',
-    'Accept-Encoding': 'gzip, deflate, br'
-}
+script.configurar_utf8()
 
 # Configuración ampliada de puertos
 COMMON_PORTS = {
@@ -87,13 +71,19 @@ def analyze_dns_records(domain: str) -> str:
     report = ["\n--- DNS RECORDS ---"]
     
     try:
+        import dns.exception
+        import dns.resolver
+
         resolver = dns.resolver.Resolver()
         resolver.timeout = DNS_TIMEOUT
-        resolver.lifetime = DNS_TIMEOUT
+
+        def consultar(tipo):
+            # Las consultas van una tras otra: el plazo se recorta en cada una
+            return resolver.resolve(domain, tipo, lifetime=plazo.ajustar(DNS_TIMEOUT))
         
         # Registros A (IPv4)
         try:
-            a_records = resolver.resolve(domain, 'A')
+            a_records = consultar('A')
             ips = [str(r) for r in a_records]
             report.append(f"*A (IPv4):* `{', '.join(ips)}`")
         except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer, dns.exception.Timeout):
@@ -101,7 +91,7 @@ def analyze_dns_records(domain: str) -> str:
         
         # Registros AAAA (IPv6)
         try:
-            aaaa_records = resolver.resolve(domain, 'AAAA')
+            aaaa_records = consultar('AAAA')
             ipv6s = [str(r) for r in aaaa_records]
             report.append(f"*AAAA (IPv6):* `{', '.join(ipv6s[:2])}`")
         except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer, dns.exception.Timeout):
@@ -109,7 +99,7 @@ def analyze_dns_records(domain: str) -> str:
         
         # Registros MX (Mail Exchange)
         try:
-            mx_records = resolver.resolve(domain, 'MX')
+            mx_records = consultar('MX')
             mxs = [f"{r.preference} {str(r.exchange)}" for r in sorted(mx_records, key=lambda x: x.preference)]
             report.append(f"*MX (Email):* `{', '.join(mxs[:3])}`")
         except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer, dns.exception.Timeout):
@@ -117,7 +107,7 @@ def analyze_dns_records(domain: str) -> str:
         
         # Registros TXT (SPF, DKIM, DMARC)
         try:
-            txt_records = resolver.resolve(domain, 'TXT')
+            txt_records = consultar('TXT')
             for txt in txt_records:
                 txt_str = str(txt).replace('"', '')
                 if 'v=spf' in txt_str.lower():
@@ -129,7 +119,7 @@ def analyze_dns_records(domain: str) -> str:
         
         # Registros NS (Nameservers)
         try:
-            ns_records = resolver.resolve(domain, 'NS')
+            ns_records = consultar('NS')
             nameservers = [str(r) for r in ns_records]
             report.append(f"*NS:* `{', '.join(nameservers[:3])}`")
         except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer, dns.exception.Timeout):
@@ -137,7 +127,7 @@ def analyze_dns_records(domain: str) -> str:
         
         # Registro SOA
         try:
-            soa_record = resolver.resolve(domain, 'SOA')[0]
+            soa_record = consultar('SOA')[0]
             report.append(f"*SOA (Primary):* `{str(soa_record.mname)}`")
         except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer, dns.exception.Timeout):
             pass
@@ -152,6 +142,8 @@ def get_geolocation_info(ip_address: str) -> str:
     report = ["\n--- GEOLOCATION ---"]
     
     try:
+        import ipapi
+
         geo_info = ipapi.location(ip=ip_address, output='json')
         
         if geo_info:
@@ -221,7 +213,7 @@ def analyze_robots_and_sitemap(domain: str) -> str:
     # Analizar robots.txt
     try:
         robots_url = f"https://{domain}/robots.txt"
-        response = requests.get(robots_url, headers=HEADERS, timeout=5, verify=False)
+        response = fetch.get(robots_url, timeout=5, verify=False)
         
         if response.status_code == 200:
             content = response.text
@@ -245,7 +237,7 @@ def analyze_robots_and_sitemap(domain: str) -> str:
     # Analizar sitemap.xml
     try:
         sitemap_url = f"https://{domain}/sitemap.xml"
-        response = requests.get(sitemap_url, headers=HEADERS, timeout=5, verify=False)
+        response = fetch.get(sitemap_url, timeout=5, verify=False)
         
         if response.status_code == 200:
             # Contar URLs en el sitemap
@@ -269,7 +261,7 @@ def analyze_http_performance(domain: str) -> Dict[str, any]:
         import time
         start_time = time.time()
         
-        response = requests.get(f"https://{domain}", headers=HEADERS, timeout=10, allow_redirects=True, verify=False)
+        response = fetch.get(f"https://{domain}", timeout=10, allow_redirects=True, verify=False)
         
         load_time = time.time() - start_time
         status_code = response.status_code
@@ -301,7 +293,7 @@ def analyze_http_performance(domain: str) -> Dict[str, any]:
     except requests.exceptions.SSLError:
         # Intentar HTTP
         try:
-            response = requests.get(f"http://{domain}", headers=HEADERS, timeout=10)
+            response = fetch.get(f"http://{domain}", timeout=10)
             report.append(f"[!] HTTPS no disponible, HTTP: `{response.status_code}`")
         except:
             report.append("[X] No se pudo conectar")
@@ -315,11 +307,16 @@ def detect_technologies_advanced(domain: str, response_headers: dict = None) ->
     report = ["\n--- TECHNOLOGIES ---"]
     technologies = []
     
-    # Si tenemos Wappalyzer, usarlo
-    if WAPPALYZER_AVAILABLE:
+    # Si tenemos Wappalyzer (opcional), usarlo
+    try:
+        from Wappalyzer import Wappalyzer, WebPage
+    except ImportError:
+        Wappalyzer = None
+
+    if Wappalyzer:
         try:
             wappalyzer = Wappalyzer.latest()
-            webpage = WebPage.new_from_url(f"https://{domain}", timeout=5)
+            webpage = WebPage.new_from_url(f"https://{domain}", timeout=plazo.ajustar(5))
             techs = wappalyzer.analyze(webpage)
             if techs:
                 technologies.extend(sorted(techs)[:10])
@@ -338,7 +335,7 @@ def detect_technologies_advanced(domain: str, response_headers: dict = None) ->
     
     # Intentar detectar por contenido HTML
     try:
-        response = requests.get(f"https://{domain}", headers=HEADERS, timeout=5, verify=False)
+        response = fetch.get(f"https://{domain}", timeout=5, verify=False)
         html = response.text.lower()
         
         # Detectar CMS/Frameworks comunes
@@ -375,7 +372,7 @@ def scan_single_port(ip_address: str, port: int) -> Optional[Tuple]:
     service, advice, emoji = COMMON_PORTS.get(port, (f"Port {port}", "Servicio desconocido.", "❓"))
     try:
         with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-            sock.settimeout(PORT_SCAN_TIMEOUT)
+            sock.settimeout(plazo.ajustar(PORT_SCAN_TIMEOUT))
             if sock.connect_ex((ip_address, port)) == 0:
                 return (port, service, advice, emoji)
     except (socket.timeout, socket.error):
@@ -411,7 +408,7 @@ def analyze_security_headers_and_ssl(domain: str) -> Tuple[str, dict]:
     response_headers = {}
     
     try:
-        response = requests.get(f"https://{domain}", headers=HEADERS, timeout=5, allow_redirects=True, verify=False)
+        response = fetch.get(f"https://{domain}", timeout=5, allow_redirects=True, verify=False)
         response_headers = response.headers
         
         server = response_headers.get('Server', 'No identificado')
@@ -435,7 +432,7 @@ def analyze_security_headers_and_ssl(domain: str) -> Tuple[str, dict]:
         # Certificado SSL
         try:
             context = ssl.create_default_context()
-            with socket.create_connection((domain, 443), timeout=5) as sock:
+            with socket.create_connection((domain, 443), timeout=plazo.ajustar(5)) as sock:
                 with context.wrap_socket(sock, server_hostname=domain) as ssock:
                     cert = ssock.getpeercert()
                     expire_date = datetime.strptime(cert['notAfter'], '%b %d %H:%M:%S %Y %Z')
@@ -465,7 +462,7 @@ def find_subdomains(domain: str) -> str:
     report = ["\n--- SUBDOMAINS (crt.sh) ---"]
     
     try:
-        response = requests.get(f"https://crt.sh/?q=%.{domain}&output=json", headers=HEADERS, timeout=10)
+        response = fetch.get(f"https://crt.sh/?q=%.{domain}&output=json", timeout=10)
         response.raise_for_status()
         subdomains = set()
         
@@ -491,41 +488,67 @@ def find_subdomains(domain: str) -> str:
         
     return "\n".join(report)
 
+async def _ssl_y_tecnologias(domain: str) -> Tuple[str, str]:
+    """SSL/Headers primero: la detección de tecnologías reutiliza sus cabeceras."""
+    ssl_report, headers = await asyncio.to_thread(analyze_security_headers_and_ssl, domain)
+    tech_report = await asyncio.to_thread(detect_technologies_advanced, domain, headers)
+    return ssl_report, tech_report
+
+async def _analizar_en_paralelo(domain: str, ip_address: str) -> List[str]:
+    """Lanza todas las secciones a la vez; cada una hace su propia E/S bloqueante."""
+    secciones = await afetch.reunir(
+        asyncio.to_thread(get_geolocation_info, ip_address),
+        asyncio.to_thread(analyze_dns_records, domain),
+        asyncio.to_thread(check_blacklists, ip_address),
+        asyncio.to_thread(analyze_http_performance, domain),
+        _ssl_y_tecnologias(domain),
+        asyncio.to_thread(analyze_robots_and_sitemap, domain),
+        asyncio.to_thread(detailed_port_scan, ip_address),
+        asyncio.to_thread(find_subdomains, domain),
+    )
+    # Cada sección ya maneja sus errores; esto cubre fallos inesperados
+    return [
+        s if not isinstance(s, BaseException) else f"\n[!] Error en sección: {str(s)[:60]}"
+        for s in secciones
+    ]
+
 def analyze_domain_complete(domain: str, ip_address: str) -> str:
-    """Análisis completo mejorado de un dominio."""
+    """Análisis completo mejorado de un dominio (secciones en paralelo, reporte en orden)."""
     report = [f"[SEARCH] *Análisis de:* `{domain}` ({ip_address})\n"]
-    
-    # 1. Geolocalización mejorada
-    report.append(get_geolocation_info(ip_address))
-    
-    # 2. DNS Records completos
-    report.append(analyze_dns_records(domain))
-    
-    # 3. Blacklist check
-    report.append(check_blacklists(ip_address))
-    
-    # 4. Performance HTTP
-    report.append(analyze_http_performance(domain))
-    
-    # 5. SSL y Security Headers
-    ssl_report, headers = analyze_security_headers_and_ssl(domain)
-    report.append(ssl_report)
-    
-    # 6. Detección de tecnologías
-    report.append(detect_technologies_advanced(domain, headers))
-    
-    # 7. Robots.txt y Sitemap
-    report.append(analyze_robots_and_sitemap(domain))
-    
-    # 8. Port Scan
-    report.append(detailed_port_scan(ip_address))
-    
-    # 9. Subdominios
-    report.append(find_subdomains(domain))
-    
+
+    (geo, dns_report, blacklist, performance, ssl_tech, robots, ports, subdomains) = \
+        afetch.correr(_analizar_en_paralelo(domain, ip_address))
+
+    if isinstance(ssl_tech, tuple):
+        ssl_report, tech_report = ssl_tech
+    else:
+        ssl_report, tech_report = ssl_tech, ""
+
+    salida.datos({
+        'target': domain,
+        'ip': ip_address,
+        'secciones': {
+            'geo': geo, 'dns': dns_report, 'blacklist': blacklist, 'performance': performance,
+            'ssl': ssl_report, 'tecnologias': tech_report, 'robots': robots, 'puertos': ports,
+            'subdominios': subdomains,
+        },
+    })
+
+    report.extend([
+        geo,            # 1. Geolocalización mejorada
+        dns_report,     # 2. DNS Records completos
+        blacklist,      # 3. Blacklist check
+        performance,    # 4. Performance HTTP
+        ssl_report,     # 5. SSL y Security Headers
+        tech_report,    # 6. Detección de tecnologías
+        robots,         # 7. Robots.txt y Sitemap
+        ports,          # 8. Port Scan
+        subdomains,     # 9. Subdominios
+    ])
+
     return "\n".join(report)
 
-if __name__ == "__main__":
+def main():
     if len(sys.argv) != 2:
         print("Uso: python net_analyzer.py <dominio_o_ip>", file=sys.stderr)
         sys.exit(1)
@@ -558,4 +581,8 @@ if __name__ == "__main__":
         sys.exit(1)
     except Exception as e:
         print(f"[ERROR] {str(e)[:150]}")
-        sys.exit(1)
\ No newline at end of file
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    script.ejecutar(main, swr=True)
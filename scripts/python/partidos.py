@@ -1,11 +1,11 @@
 # partidos.py
+import asyncio
 import requests
 from datetime import datetime, timedelta
-import sys
-import io
 from zoneinfo import ZoneInfo
+from utils import afetch, salida, script, tiempos
 
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+script.configurar_utf8()
 
 # Diccionario de ligas
 LIGAS = {
@@ -25,15 +25,13 @@ def formatear_fecha(dt):
     mes = MESES[dt.month]
     return f"{dia}, {dt.day} de {mes}"
 
-def obtener_y_formatear_partidos(codigo_liga, fecha):
+async def obtener_y_formatear_partidos(codigo_liga, fecha):
     """
     Obtiene los partidos de una liga para una fecha específica.
     """
     url = f"https://site.api.espn.com/apis/site/v2/sports/soccer/{codigo_liga}/scoreboard?dates={fecha.strftime('%Y%m%d')}"
     try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        data = response.json()
+        data = await afetch.get_json(url, timeout=10)
     except (requests.RequestException, ValueError):
         return []
 
@@ -60,48 +58,91 @@ def obtener_y_formatear_partidos(codigo_liga, fecha):
             continue
     return partidos_formateados
 
-def main():
-    fecha_hoy = datetime.now(ZONA_HORARIA_CHILE)
+async def obtener_semana(codigo_liga, fecha_hoy, ya_obtenidos):
+    """
+    Partidos de los próximos 7 días de una liga, consultados en paralelo.
+    `ya_obtenidos` trae los días que ya se pidieron ({offset: partidos}).
+    """
+    faltantes = [i for i in range(1, 8) if i not in ya_obtenidos]
+    resultados = await asyncio.gather(
+        *(obtener_y_formatear_partidos(codigo_liga, fecha_hoy + timedelta(days=i)) for i in faltantes)
+    )
+    return {**ya_obtenidos, **dict(zip(faltantes, resultados))}
+
+
+async def obtener_todo(fecha_hoy):
+    """
+    Descarga hoy y mañana de todas las ligas a la vez; solo las ligas sin
+    partidos hoy piden además el resto de la semana (también en paralelo).
+    """
     fecha_manana = fecha_hoy + timedelta(days=1)
+    codigos = list(LIGAS.values())
+    pedidos = [obtener_y_formatear_partidos(c, f) for c in codigos for f in (fecha_hoy, fecha_manana)]
+    resultados = await asyncio.gather(*pedidos)
 
-    for nombre_liga, codigo in LIGAS.items():
-        print(f"\n*{nombre_liga}*")
+    por_liga = {}
+    for i, codigo in enumerate(codigos):
+        por_liga[codigo] = {0: resultados[2 * i], 1: resultados[2 * i + 1]}
 
-        # --- Partidos de hoy ---
-        partidos_de_hoy = obtener_y_formatear_partidos(codigo, fecha_hoy)
+    sin_partidos_hoy = [c for c in codigos if not por_liga[c][0]]
+    semanas = await asyncio.gather(*(obtener_semana(c, fecha_hoy, por_liga[c]) for c in sin_partidos_hoy))
+    por_liga.update(zip(sin_partidos_hoy, semanas))
+    return por_liga
 
-        if partidos_de_hoy:
-            print(f"📅 *Hoy*, {formatear_fecha(fecha_hoy)}:")
-            for partido in partidos_de_hoy:
-                print(partido)
 
-            # --- Partidos de mañana (solo si hoy tiene partidos) ---
-            partidos_manana = obtener_y_formatear_partidos(codigo, fecha_manana)
-            if partidos_manana:
-                print(f"\n📅 *Mañana*, {formatear_fecha(fecha_manana)}:")
-                for partido in partidos_manana:
+def main():
+    fecha_hoy = datetime.now(ZONA_HORARIA_CHILE)
+    fecha_manana = fecha_hoy + timedelta(days=1)
+    por_liga = afetch.correr(obtener_todo(fecha_hoy))
+    # Partidos ya formateados por liga y día (YYYY-MM-DD) consultado
+    salida.datos({
+        nombre_liga: {
+            (fecha_hoy + timedelta(days=i)).date().isoformat(): partidos
+            for i, partidos in sorted(por_liga[codigo].items())
+        }
+        for nombre_liga, codigo in LIGAS.items()
+    })
+
+    with tiempos.etapa('format'):
+        for nombre_liga, codigo in LIGAS.items():
+            print(f"\n*{nombre_liga}*")
+            dias = por_liga[codigo]
+
+            # --- Partidos de hoy ---
+            partidos_de_hoy = dias[0]
+
+            if partidos_de_hoy:
+                print(f"📅 *Hoy*, {formatear_fecha(fecha_hoy)}:")
+                for partido in partidos_de_hoy:
                     print(partido)
-            else:
-                print(f"\n🚫 No hay partidos programados para mañana.")
 
-        else:
-            print(f"🚫 No hay partidos programados para hoy.")
+                # --- Partidos de mañana (solo si hoy tiene partidos) ---
+                partidos_manana = dias[1]
+                if partidos_manana:
+                    print(f"\n📅 *Mañana*, {formatear_fecha(fecha_manana)}:")
+                    for partido in partidos_manana:
+                        print(partido)
+                else:
+                    print(f"\n🚫 No hay partidos programados para mañana.")
+
+            else:
+                print(f"🚫 No hay partidos programados para hoy.")
 
-            # Buscar la próxima fecha con partidos (desde mañana)
-            encontrado_futuro = False
-            for i in range(1, 8):
-                fecha_futura = fecha_hoy + timedelta(days=i)
-                partidos_futuros = obtener_y_formatear_partidos(codigo, fecha_futura)
+                # Buscar la próxima fecha con partidos (desde mañana)
+                encontrado_futuro = False
+                for i in range(1, 8):
+                    fecha_futura = fecha_hoy + timedelta(days=i)
+                    partidos_futuros = dias[i]
 
-                if partidos_futuros:
-                    print(f"📅 Próxima fecha: {formatear_fecha(fecha_futura)}")
-                    for partido in partidos_futuros:
-                        print(partido)
-                    encontrado_futuro = True
-                    break
+                    if partidos_futuros:
+                        print(f"📅 Próxima fecha: {formatear_fecha(fecha_futura)}")
+                        for partido in partidos_futuros:
+                            print(partido)
+                        encontrado_futuro = True
+                        break
 
-            if not encontrado_futuro:
-                print("🚫 _No se encontraron partidos en los próximos 7 días._")
+                if not encontrado_futuro:
+                    print("🚫 _No se encontraron partidos en los próximos 7 días._")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    script.ejecutar(main)
\ No newline at end of file
@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""
+prefetch.py
+Planificador que mantiene calientes las cachés de los comandos más usados:
+corre cada script en segundo plano con su propia cadencia, así la caché HTTP
+(utils.cache) y la salida guardada de los scripts SWR (utils.swr) ya están
+frescas cuando un usuario pide !metro, !valores, !bolsa o !tabla.
+
+  python prefetch.py            corre el planificador (no termina)
+  python prefetch.py --una-vez  corre cada tarea una vez y sale
+
+Mientras haya que mantenerlo caliente, cada script corre a un intervalo menor
+que el TTL de sus fuentes (utils.cache) y con BOTILLERO_CACHE_REFRESH=1, que
+renueva las entradas aunque sigan frescas: si no, la corrida encontraría la
+caché vigente, no bajaría nada y la entrada vencería igual antes de la
+siguiente. Fuera de esas horas la tarea no corre. Las tareas SWR toman la
+marca de refresco de utils.swr, así no corren a la par de un refresco que ya
+lanzó una consulta.
+
+Node lo levanta con PYTHON_PREFETCH=1 (ver prefetch.service.js). Solo corre
+una instancia a la vez: las demás salen al no poder tomar temp/prefetch.lock.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from utils import archivos, cache, swr
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+ZONA_CL = ZoneInfo('America/Santiago')
+
+MINUTO = 60
+HORA = 60 * MINUTO
+
+TIMEOUT_TAREA = 2 * MINUTO
+# Cuánto antes de vencer el TTL se vuelve a correr (lo que tarda la corrida y algo más)
+MARGEN_TTL = 15
+# Fuera de horario se vuelve a mirar la cadencia cada tanto
+REVISION = 5 * MINUTO
+
+# `cada(ahora)` devuelve cada cuántos segundos correr el script a esa hora, o
+# None si en ese momento no vale la pena. `swr` corre el script en modo
+# refresco para dejar guardada su salida (ver utils.swr).
+Tarea = namedtuple('Tarea', 'script args cada swr')
+
+
+def _entre(ahora, desde, hasta):
+    minutos = ahora.hour * 60 + ahora.minute
+    return desde[0] * 60 + desde[1] <= minutos < hasta[0] * 60 + hasta[1]
+
+
+def bajo_ttl(*hosts):
+    """Intervalo que mantiene fresca la caché de todos esos hosts."""
+    return min(cache.ttl_para(h) for h in hosts) - MARGEN_TTL
+
+
+def cada_metro(ahora):
+    """Mientras el Metro funciona, bajo el TTL de las alertas (t.me) y del estado de red."""
+    if not _entre(ahora, (5, 30), (23, 30)):
+        return None  # Metro cerrado
+    return bajo_ttl('t.me', 'www.metro.cl')
+
+
+def cada_valores(ahora):
+    """Divisas en horario hábil; fuera de él no se mueven y no vale la pena."""
+    if ahora.weekday() < 5 and _entre(ahora, (8, 0), (20, 0)):
+        return bajo_ttl('www.google.com')
+    return None
+
+
+def cada_bolsa(ahora):
+    """Con la bolsa abierta; fuera de eso los índices no se mueven."""
+    if ahora.weekday() < 5 and _entre(ahora, (9, 0), (17, 30)):
+        return bajo_ttl('es.investing.com')
+    return None
+
+
+def cada_tabla(ahora):
+    """
+    En las ventanas de partidos (viernes a lunes en la tarde/noche), bajo el
+    TTL de AS.com; si no cada 6 h, que solo acota la edad de la salida SWR.
+    """
+    if ahora.weekday() in (4, 5, 6, 0) and _entre(ahora, (14, 0), (23, 59)):
+        return bajo_ttl('chile.as.com')
+    return 6 * HORA
+
+
+def cada_proxpar(ahora):
+    """Solo acota la edad de la salida SWR, que es lo que responde la consulta."""
+    return 3 * HORA
+
+
+TAREAS = [
+    Tarea('metro.py', [], cada_metro, swr=False),
+    Tarea('valores.py', [], cada_valores, swr=False),
+    Tarea('bolsa.py', [], cada_bolsa, swr=False),
+    Tarea('tabla.py', [], cada_tabla, swr=True),
+    Tarea('proxpar.py', [], cada_proxpar, swr=True),
+]
+
+
+def correr(tarea):
+    """
+    Ejecuta la tarea en un proceso aparte; devuelve (ok, segundos, detalle).
+    ok es None si la tarea no corrió porque ya había un refresco SWR en curso.
+    """
+    env = {
+        **os.environ,
+        'BOTILLERO_DEADLINE': str(time.time() + TIMEOUT_TAREA),
+        cache.ENV_REFRESCAR: '1',
+    }
+    env.pop('BOTILLERO_JSON', None)
+    clave = ficha = None
+    if tarea.swr:
+        clave = swr.clave_de(tarea.script, tarea.args)
+        ficha = swr.tomar_refresco(clave)
+        if ficha is None:
+            return None, 0.0, "ya hay un refresco en curso"
+        env[swr.ENV] = swr.REFRESCAR
+        env[swr.ENV_MARCA] = ficha
+    inicio = time.monotonic()
+    try:
+        proc = subprocess.run(
+            [sys.executable, os.path.join(SCRIPTS_DIR, tarea.script), *tarea.args],
+            cwd=SCRIPTS_DIR, env=env, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE, timeout=TIMEOUT_TAREA, text=True, encoding='utf-8', errors='replace',
+        )
+    except subprocess.TimeoutExpired:
+        return False, time.monotonic() - inicio, f"timeout de {TIMEOUT_TAREA} s"
+    finally:
+        if ficha is not None:
+            # Normalmente ya la soltó el script; no si murió por el timeout
+            swr.soltar_refresco(clave, ficha)
+    detalle = (proc.stderr.strip().splitlines() or [''])[-1][:200]
+    return proc.returncode == 0, time.monotonic() - inicio, detalle
+
+
+def _resultado(tarea, ok, segundos, detalle):
+    if ok is None:
+        return f"{tarea.script} omitido: {detalle}"
+    if ok:
+        return f"{tarea.script} ok en {segundos:.1f} s"
+    return f"{tarea.script} falló en {segundos:.1f} s: {detalle}"
+
+
+def _log(texto):
+    print(f"(Prefetch) -> {texto}", flush=True)
+
+
+class Planificador:
+    def __init__(self, tareas):
+        self.tareas = tareas
+        self.proxima = {t.script: 0.0 for t in tareas}
+        self.corriendo = set()
+        self.lock = threading.Lock()
+
+    def _ejecutar(self, tarea):
+        try:
+            _log(_resultado(tarea, *correr(tarea)))
+        finally:
+            with self.lock:
+                self.corriendo.discard(tarea.script)
+
+    def paso(self):
+        """Lanza las tareas que tocan y devuelve cuánto dormir hasta la próxima."""
+        ahora = time.time()
+        for tarea in self.tareas:
+            if self.proxima[tarea.script] > ahora:
+                continue
+            with self.lock:
+                if tarea.script in self.corriendo:
+                    continue  # La corrida anterior sigue en curso
+            cada = tarea.cada(datetime.now(ZONA_CL))
+            if cada is None:
+                self.proxima[tarea.script] = ahora + REVISION
+                continue
+            self.proxima[tarea.script] = ahora + cada
+            with self.lock:
+                self.corriendo.add(tarea.script)
+            threading.Thread(target=self._ejecutar, args=(tarea,), daemon=True).start()
+        return max(1.0, min(self.proxima.values()) - time.time())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mantiene calientes las cachés de los scripts.')
+    parser.add_argument('--una-vez', action='store_true', help='correr cada tarea una vez y salir')
+    args = parser.parse_args()
+
+    with archivos.intentar_bloqueo(archivos.ruta_temp('prefetch.lock')) as unico:
+        if not unico:
+            _log("ya hay otro planificador corriendo")
+            return
+
+        if args.una_vez:
+            for tarea in TAREAS:
+                _log(_resultado(tarea, *correr(tarea)))
+            return
+
+        planificador = Planificador(TAREAS)
+        _log(f"iniciado con {len(TAREAS)} tareas")
+        try:
+            while True:
+                time.sleep(planificador.paso())
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == '__main__':
+    main()
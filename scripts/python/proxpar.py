@@ -2,26 +2,30 @@
 """
 proxpar.py
 Muestra los partidos de la jornada actual (y la siguiente si existe)
-de la Liga Chilena, scrapeando chile.as.com con Selenium.
+de la Liga Chilena, scrapeando chile.as.com.
+
+Las jornadas candidatas (la estimada, la anterior y las dos siguientes, para
+corregir la estimación y mostrar la próxima) se piden todas a la vez por
+HTTP junto con la consulta a ESPN; solo las que no llegan por HTTP se cargan
+en el navegador headless compartido (utils/navegador.py): una sola conexión,
+una página por jornada y todas navegando a la vez. Así la latencia es la de
+una sola carga.
+
+Si no hay página ni para la jornada actual ni para la siguiente el script sale
+con error (y SWR no guarda esa salida); los fallos al abrir el navegador
+tampoco se tragan.
 """
-import sys
-import io
 import re
 import time
-import requests
+import sys
+import asyncio
 from datetime import datetime
 from zoneinfo import ZoneInfo
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
+from utils import afetch, fetch, limite, navegador, plazo, salida, script, sopa, tiempos
+# Playwright se importa en utils.navegador/esperar_html(): es la dependencia más pesada del script
 
 # Salida UTF-8
-if sys.stdout.encoding != 'utf-8':
-    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+script.configurar_utf8()
 
 BASE_URL    = "https://chile.as.com"
 ESPN_URL    = "https://site.api.espn.com/apis/site/v2/sports/soccer/chi.1/scoreboard"
@@ -31,17 +35,20 @@ JORNADA_TPL = BASE_URL + "/resultados/futbol/chile/2026/jornada/regular_a_{n}/"
 
 ZONA_CL     = ZoneInfo("America/Santiago")
 
+# Jornadas que se piden de una vez alrededor de la estimada
+VENTANA     = (-1, 0, 1, 2)
+
 # ──────────────────────────────────────────
 # Detectar jornada actual via ESPN
 # ──────────────────────────────────────────
-def detectar_jornada_espn():
+async def detectar_jornada_espn():
     """
     Usa la API de ESPN para determinar cuántas jornadas se han disputado
     mirando el campo 'week.number' o buscando en eventos el número de semana.
     Devuelve un entero con el número de jornada estimado, o None.
     """
     try:
-        r = requests.get(ESPN_URL, timeout=8)
+        r = await afetch.get(ESPN_URL, timeout=8)
         data = r.json()
 
         # Intentar leer week.number directamente
@@ -76,44 +83,115 @@ def detectar_jornada_por_fecha():
 
 
 # ──────────────────────────────────────────
-# Configuración de Selenium
+# Carga con el navegador compartido
 # ──────────────────────────────────────────
-def crear_driver():
-    opts = webdriver.ChromeOptions()
-    opts.add_argument("--headless")
-    opts.add_argument("--disable-gpu")
-    opts.add_argument("--log-level=3")
-    opts.add_argument("--no-sandbox")
-    opts.add_argument("--disable-dev-shm-usage")
-    opts.add_argument(
-        "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-    )
-    opts.add_experimental_option('excludeSwitches', ['enable-logging'])
-    return webdriver.Chrome(service=Service(), options=opts)
+def navegar(page, url, timeout=14):
+    """
+    Empieza a cargar la URL sin esperar el render, para que las páginas de
+    una misma conexión naveguen a la vez. False si no alcanzó a partir.
+    """
+    try:
+        # Sin plazo suficiente no se carga (PlazoAgotado cae en el except general)
+        timeout = plazo.ajustar(timeout)
+        # La navegación comparte con utils.fetch el límite por host de AS.com
+        with limite.turno(fetch.host_de(url)):
+            page.goto(url, wait_until='commit', timeout=timeout * 1000)
+        return True
+    except Exception:
+        return False
+
 
+def esperar_html(page, hasta):
+    """Espera un bloque de día 'a_sd' hasta `hasta` (time.monotonic) y devuelve el HTML."""
+    from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
 
-def get_html(driver, url, timeout=14):
-    """Carga una URL y espera que aparezca un bloque de día 'a_sd'."""
     try:
-        driver.get(url)
-        WebDriverWait(driver, timeout).until(
-            EC.presence_of_element_located((By.CLASS_NAME, "a_sd"))
-        )
-        return driver.page_source
-    except TimeoutException:
+        timeout = plazo.ajustar(max(hasta - time.monotonic(), plazo.MINIMO))
+        page.wait_for_selector('div.a_sd', timeout=timeout * 1000)
+        return page.content()
+    except PlaywrightTimeoutError:
         # Devolver lo que haya aunque no haya partidos
-        return driver.page_source
+        try:
+            return page.content()
+        except Exception:
+            return ""
     except Exception:
         return ""
 
 
-def numero_de_h1(html):
+def sopa_de(html):
+    """Parsea la página una sola vez; None si el navegador no trajo nada."""
+    return sopa.crear(html) if html else None
+
+
+async def cargar_http(n):
+    """
+    Jornada n con una petición simple (utils.fetch, con caché). None si falla
+    o si el HTML no trae los bloques de día 'a_sd' (el mismo criterio con que
+    espera el navegador): ahí va al navegador.
+    """
+    try:
+        html = await afetch.get_texto(JORNADA_TPL.format(n=n), timeout=10)
+    except Exception:
+        return None
+    soup = sopa.crear(html)
+    return soup if soup.find("div", class_="a_sd") else None
+
+
+def cargar_con_navegador(numeros, timeout=14):
+    """
+    Jornadas pedidas en el navegador compartido: una conexión, una página (y
+    contexto) por jornada. Todas navegan a la vez y comparten el mismo plazo
+    de espera. Los errores al abrir el navegador se propagan.
+    """
+    urls = [JORNADA_TPL.format(n=n) for n in numeros]
+    htmls = []
+    with navegador.paginas(len(urls)) as pages:
+        inicio = time.perf_counter()
+        hasta = time.monotonic() + timeout
+        en_curso = [navegar(page, url, timeout) for page, url in zip(pages, urls)]
+        for page, url, ok in zip(pages, urls, en_curso):
+            htmls.append(esperar_html(page, hasta) if ok else "")
+            tiempos.carga_navegador(url, (time.perf_counter() - inicio) * 1000)
+    return [sopa_de(html) for html in htmls]
+
+
+class Jornadas:
+    """Páginas de jornada cargadas ({n: sopa o None}); cada una pasa a lo más una vez por el navegador."""
+
+    def __init__(self, paginas):
+        self.paginas = dict(paginas)
+        self.con_navegador = set()
+
+    def __getitem__(self, n):
+        return self.paginas.get(n)
+
+    def completar(self, numeros):
+        """
+        Carga las jornadas pedidas que falten: primero todas por HTTP en
+        paralelo y después, juntas en el navegador, las que HTTP no trajo.
+        """
+        numeros = {n for n in numeros if n >= 1}
+        faltan = sorted(numeros - self.paginas.keys())
+        if faltan:
+            async def pedir():
+                return await asyncio.gather(*(cargar_http(n) for n in faltan))
+            self.paginas.update(zip(faltan, afetch.correr(pedir())))
+
+        sin_http = sorted(n for n in numeros - self.con_navegador if self.paginas[n] is None)
+        if sin_http:
+            tiempos.marcar('path', 'browser')
+            self.con_navegador.update(sin_http)
+            self.paginas.update(zip(sin_http, cargar_con_navegador(sin_http)))
+
+
+def numero_de_h1(soup):
     """
     Extrae el número de jornada desde el H1 de la página.
     Ej: 'Resultados jornada 3 Liga Chilena 2026' → 3
     """
-    soup = BeautifulSoup(html, "html.parser")
+    if soup is None:
+        return None
     h1 = soup.find("h1")
     if h1:
         m = re.search(r"jornada\s+(\d+)", h1.text, re.IGNORECASE)
@@ -125,15 +203,14 @@ def numero_de_h1(html):
 # ──────────────────────────────────────────
 # Parseo de una página de jornada
 # ──────────────────────────────────────────
-def parsear_jornada(html):
+def parsear_jornada(soup):
     """
-    Parsea el HTML de una página de jornada de AS.com.
+    Parsea una página de jornada de AS.com (ya convertida con sopa_de).
     Devuelve lista de strings formateados, o [] si no hay partidos.
     """
-    if not html:
+    if soup is None:
         return []
 
-    soup   = BeautifulSoup(html, "html.parser")
     lineas = []
 
     # Título
@@ -198,52 +275,58 @@ def parsear_jornada(html):
 # ──────────────────────────────────────────
 # Main
 # ──────────────────────────────────────────
-def main():
-    driver = crear_driver()
-    try:
-        # 1. Estimar jornada actual
-        jornada_esp = detectar_jornada_espn()
-        jornada_est = detectar_jornada_por_fecha()
-        # Usar el mayor entre ambas estimaciones
-        num_inicio = max(jornada_esp or 1, jornada_est)
-
-        # 2. Verificar y ajustar: buscar la jornada real más cercana
-        #    Cargamos la estimada; si el H1 dice otro número, lo usamos.
-        html_actual = get_html(driver, JORNADA_TPL.format(n=num_inicio))
-        num_h1 = numero_de_h1(html_actual)
-
-        # Si el H1 confirmó un número diferente al estimado, usar el del H1
-        if num_h1 and num_h1 != num_inicio:
-            num_jornada = num_h1
-            # Recargar con el numero correcto si no coincide
-            if num_h1 != num_inicio:
-                html_actual = get_html(driver, JORNADA_TPL.format(n=num_jornada))
-        else:
-            num_jornada = num_inicio
-
-        # 3. Mostrar jornada actual
-        lineas = parsear_jornada(html_actual)
-        if lineas:
-            for l in lineas:
-                print(l)
-        else:
-            print(f"🚫 No se encontraron datos para la Jornada {num_jornada}.")
-
-        # 4. Mostrar jornada siguiente (si existe)
-        url_sig    = JORNADA_TPL.format(n=num_jornada + 1)
-        html_sig   = get_html(driver, url_sig, timeout=10)
-        lineas_sig = parsear_jornada(html_sig)
-
-        if lineas_sig:
-            print("\n" + "─" * 40)
-            for l in lineas_sig:
-                print(l)
-        else:
-            print(f"\n🚫 Aún no hay datos para la Jornada {num_jornada + 1}.")
-
-    finally:
-        driver.quit()
+async def preparar(candidatas):
+    """ESPN y las jornadas candidatas por HTTP, todo a la vez."""
+    jornada_esp, *paginas = await asyncio.gather(
+        detectar_jornada_espn(),
+        *(cargar_http(n) for n in candidatas),
+    )
+    return jornada_esp, Jornadas(zip(candidatas, paginas))
+
 
+def main():
+    # 1. Estimar jornada actual y pedir de una vez las candidatas
+    jornada_est = detectar_jornada_por_fecha()
+    candidatas = [jornada_est + d for d in VENTANA if jornada_est + d >= 1]
+    jornada_esp, paginas = afetch.correr(preparar(candidatas))
+    tiempos.marcar('path', 'http')
+    # Usar el mayor entre ambas estimaciones
+    num_inicio = max(jornada_esp or 1, jornada_est)
+    paginas.completar([*candidatas, num_inicio, num_inicio + 1])
+
+    # 2. Verificar y ajustar: si el H1 de la estimada dice otro número, usar ese
+    num_h1 = numero_de_h1(paginas[num_inicio])
+    num_jornada = num_h1 if num_h1 and num_h1 != num_inicio else num_inicio
+    # Casi siempre ya está en la ventana pedida
+    paginas.completar([num_jornada, num_jornada + 1])
+
+    if paginas[num_jornada] is None and paginas[num_jornada + 1] is None:
+        print(f"Error: no se pudo cargar la Jornada {num_jornada} ni la {num_jornada + 1}.", file=sys.stderr)
+        sys.exit(1)
+
+    # 3. Mostrar jornada actual
+    lineas = parsear_jornada(paginas[num_jornada])
+    if lineas:
+        for l in lineas:
+            print(l)
+    else:
+        print(f"🚫 No se encontraron datos para la Jornada {num_jornada}.")
+
+    # 4. Mostrar jornada siguiente (si existe)
+    lineas_sig = parsear_jornada(paginas[num_jornada + 1])
+
+    salida.datos({
+        'jornada': num_jornada,
+        'partidos': lineas,
+        'siguiente': {'jornada': num_jornada + 1, 'partidos': lineas_sig},
+    })
+
+    if lineas_sig:
+        print("\n" + "─" * 40)
+        for l in lineas_sig:
+            print(l)
+    else:
+        print(f"\n🚫 Aún no hay datos para la Jornada {num_jornada + 1}.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    script.ejecutar(main, swr=True)
\ No newline at end of file
@@ -1,39 +1,64 @@
 import sys
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
-from bs4 import BeautifulSoup
-import io
+import time
+from urllib.parse import urlsplit
+from utils import navegador, salida, script, sopa, tiempos
 
 # Configuración para la salida en UTF-8
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+script.configurar_utf8()
 
 url = 'https://chile.as.com/resultados/futbol/chile/clasificacion/?omnil=mpal'
+# De toda la página solo se arma la tabla de posiciones
+SOLO_TABLA = sopa.filtro('table', clase='a_tb')
 
 # Cabecera de un navegador real para evitar ser detectado como un bot
 USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/127.0.0.0 Safari/537.36"
 
-def main():
+def tiene_tabla(soup):
+    """True si la sopa trae la tabla de posiciones con filas."""
+    tabla = soup.find('table', class_='a_tb')
+    cuerpo = tabla.find('tbody') if tabla else None
+    return bool(cuerpo and cuerpo.find('tr'))
+
+
+def cargar_por_http():
+    """
+    Camino rápido: la página con una petición simple (utils.fetch, con caché).
+    Devuelve la sopa si ya trae la tabla en el HTML, o None para pasar al navegador.
+    """
+    # utils.fetch trae requests: solo se carga al usarlo
+    from utils import fetch
+
+    try:
+        respuesta = fetch.get(url)
+    except Exception:
+        return None
+    if not respuesta.ok:
+        return None
+    soup = sopa.crear(respuesta.content, solo=SOLO_TABLA)
+    return soup if tiene_tabla(soup) else None
+
+
+def cargar_con_navegador():
+    """La página renderizada en el navegador compartido (cuando el HTML no trae la tabla)."""
+    # Playwright solo se carga cuando realmente se va a abrir el navegador
+    from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+    # utils.limite trae requests (vía utils.plazo): tampoco hace falta al importar
+    from utils import limite, plazo
+
     content = ""
+    inicio = time.perf_counter()
     try:
-        with sync_playwright() as p:
-            # MEJORA: Argumentos para estabilidad en servidor (VPS/Linux)
-            browser = p.chromium.launch(
-                headless=True,
-                args=['--no-sandbox', '--disable-dev-shm-usage']
-            )
-            
-            context = browser.new_context(
-                user_agent=USER_AGENT,
-                viewport={'width': 1920, 'height': 1080}
-            )
-            page = context.new_page()
-            
-            page.goto(url, wait_until='domcontentloaded', timeout=30000)
+        # Página nueva en el navegador compartido (lo mantiene navegador.py)
+        with navegador.pagina(user_agent=USER_AGENT) as page:
+            # La navegación comparte con utils.fetch el límite por host de AS.com
+            with limite.turno(urlsplit(url).hostname):
+                page.goto(url, wait_until='domcontentloaded', timeout=plazo.ajustar(30) * 1000)
             
             # Esperamos la tabla (timeout reducido para no colgar el bot tanto tiempo)
-            page.wait_for_selector('table.a_tb', timeout=20000)
+            page.wait_for_selector('table.a_tb', timeout=plazo.ajustar(20) * 1000)
             
             content = page.content()
-            browser.close()
+        tiempos.carga_navegador(url, (time.perf_counter() - inicio) * 1000)
 
     except PlaywrightTimeoutError:
         print("Error: Timeout al cargar la tabla de posiciones.")
@@ -42,8 +67,20 @@ def main():
         print(f"Error inesperado: {e}")
         sys.exit(1)
 
+    return sopa.crear(content, solo=SOLO_TABLA)
+
+
+def main():
+    # HTTP primero; el navegador solo si la tabla no viene en el HTML.
+    # El camino usado queda en el registro de tiempos (path=http|browser)
+    soup = cargar_por_http()
+    if soup is not None:
+        tiempos.marcar('path', 'http')
+    else:
+        tiempos.marcar('path', 'browser')
+        soup = cargar_con_navegador()
+
     # --- LÓGICA DE PARSEO ACTUALIZADA ---
-    soup = BeautifulSoup(content, 'html.parser')
     tabla_de_datos = []
 
     try:
@@ -111,8 +148,15 @@ def main():
         nom = abreviar(nombre)
         return f"`{str(pos) + '.':<4} {nom:<14} {str(pts):>3}pts`"
 
+    salida.datos([
+        {'posicion': int(pos), 'equipo': nombre, 'puntos': int(pts) if pts.isdigit() else pts}
+        for pos, nombre, pts in tabla_de_datos
+    ])
+
     if not tabla_de_datos:
+        # Código de error para que SWR no guarde este mensaje como último resultado
         print("No se encontraron datos de equipos.")
+        sys.exit(1)
     else:
         print("🏆 *Tabla de Posiciones - Liga Chilena* 🏆\n")
         print("`#    Equipo         Pts`")
@@ -141,4 +185,4 @@ def main():
         print("🔵 Libertadores · 🟡 Sudamericana · 🔴 Descenso")
 
 if __name__ == "__main__":
-    main()
+    script.ejecutar(main, swr=True)
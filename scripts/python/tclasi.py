@@ -1,18 +1,13 @@
-import sys
-import requests
-from bs4 import BeautifulSoup
-import io
 from unidecode import unidecode
+from utils import fetch, salida, script, sopa
 
 # Configurar salida UTF-8
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+script.configurar_utf8()
 
 # URL genérica que suele redirigir a la edición actual
 URL = 'https://chile.as.com/resultados/futbol/clasificacion_mundial_sudamerica/clasificacion/'
-
-HEADERS = {
-    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-}
+# De toda la página solo se arma la tabla (diseño viejo o nuevo de AS)
+SOLO_TABLA = sopa.filtro('table', clase=['tabla-datos', 'a_tb'])
 
 BANDERAS = {
     'Argentina': '🇦🇷', 'Colombia': '🇨🇴', 'Uruguay': '🇺🇾', 'Ecuador': '🇪🇨',
@@ -20,54 +15,65 @@ BANDERAS = {
     'Chile': '🇨🇱', 'Peru': '🇵🇪', 'Perú': '🇵🇪'
 }
 
-def main():
-    try:
-        response = requests.get(URL, headers=HEADERS, timeout=10)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
+def extraer_equipos(html):
+    """
+    Extrae la tabla de posiciones como lista de equipos, o un string con el
+    error a mostrar si la página no trae la tabla.
+    """
+    soup = sopa.crear(html, solo=SOLO_TABLA)
+    
+    # Intentar encontrar la tabla con selectores comunes de AS
+    tabla = soup.find('table', class_='tabla-datos')
+    if not tabla:
+        tabla = soup.find('table', class_='a_tb') # Selector nuevo diseño
         
-        # Intentar encontrar la tabla con selectores comunes de AS
-        tabla = soup.find('table', class_='tabla-datos')
-        if not tabla:
-            tabla = soup.find('table', class_='a_tb') # Selector nuevo diseño
-            
-        if not tabla:
-            print("Error: No se encontró la tabla de posiciones.")
-            return
+    if not tabla:
+        return "Error: No se encontró la tabla de posiciones."
 
-        equipos_data = []
-        tbody = tabla.find('tbody')
+    equipos_data = []
+    tbody = tabla.find('tbody')
+    
+    if not tbody:
+        return "Error: Tabla sin contenido."
+
+    for i, row in enumerate(tbody.find_all('tr')):
+        # Nombre equipo
+        nombre_tag = row.find('span', class_='nombre-equipo')
+        if not nombre_tag:
+            nombre_tag = row.find('span', class_='a_tb_n')
         
-        if not tbody:
-             print("Error: Tabla sin contenido.")
-             return
+        # Puntos
+        puntos_tag = row.find('td', class_='destacado')
+        if not puntos_tag:
+            puntos_tag = row.find('td', class_='--bd')
 
-        for i, row in enumerate(tbody.find_all('tr')):
-            # Nombre equipo
-            nombre_tag = row.find('span', class_='nombre-equipo')
-            if not nombre_tag:
-                nombre_tag = row.find('span', class_='a_tb_n')
+        if nombre_tag and puntos_tag:
+            nombre = nombre_tag.text.strip()
+            puntos = puntos_tag.text.strip()
+            
+            # Buscar bandera
+            nombre_clean = unidecode(nombre)
+            bandera = "🏳️"
+            for pais, flag in BANDERAS.items():
+                if pais in nombre_clean or nombre_clean in pais:
+                    bandera = flag
+                    break
             
-            # Puntos
-            puntos_tag = row.find('td', class_='destacado')
-            if not puntos_tag:
-                puntos_tag = row.find('td', class_='--bd')
+            equipos_data.append({'pos': i + 1, 'equipo': nombre, 'bandera': bandera, 'puntos': puntos})
+
+    return equipos_data
+
+def main():
+    try:
+        response = fetch.get(URL)
+        response.raise_for_status()
 
-            if nombre_tag and puntos_tag:
-                nombre = nombre_tag.text.strip()
-                puntos = puntos_tag.text.strip()
-                
-                # Buscar bandera
-                nombre_clean = unidecode(nombre)
-                bandera = "🏳️"
-                for pais, flag in BANDERAS.items():
-                    if pais in nombre_clean or nombre_clean in pais:
-                        bandera = flag
-                        break
-                
-                equipos_data.append({'pos': i + 1, 'equipo': nombre, 'bandera': bandera, 'puntos': puntos})
+        equipos_data = fetch.parsear(response, 'tclasi.equipos/v1', extraer_equipos)
+        if isinstance(equipos_data, str):
+            print(equipos_data)
+            return
 
+        salida.datos(equipos_data)
         if not equipos_data:
             print("No se pudieron extraer datos.")
             return
@@ -88,4 +94,4 @@ def main():
         print(f"Error al obtener la tabla: {e}")
 
 if __name__ == "__main__":
-    main()
+    script.ejecutar(main)
@@ -2,6 +2,27 @@
 import sys
 from PIL import Image, ImageDraw, ImageFont
 import textwrap
+from utils import salida, script
+
+# Arial Bold en Windows; en Linux/macOS se prueban equivalentes comunes
+FUENTES = [
+    "C:/Windows/Fonts/arialbd.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
+    "/usr/share/fonts/truetype/liberation/LiberationSans-Bold.ttf",
+    "/Library/Fonts/Arial Bold.ttf",
+]
+
+def cargar_fuente(tamaño):
+    for ruta_fuente in FUENTES:
+        try:
+            return ImageFont.truetype(ruta_fuente, tamaño)
+        except OSError:
+            continue
+    # Sin ninguna instalada: la fuente incluida en Pillow (escalable desde 10.1)
+    try:
+        return ImageFont.load_default(size=tamaño)
+    except TypeError:
+        return ImageFont.load_default()
 
 def agregar_texto_transparente(ruta_imagen, texto_arriba, texto_abajo):
     try:
@@ -14,10 +35,8 @@ def agregar_texto_transparente(ruta_imagen, texto_arriba, texto_abajo):
         draw = ImageDraw.Draw(capa_texto)
 
         # --- Configuración de la fuente ---
-        # Usamos Arial, que es estándar en Windows.
-        ruta_fuente = "C:/Windows/Fonts/arialbd.ttf" # Arial Bold
         tamaño_fuente = int(alto / 12)
-        font = ImageFont.truetype(ruta_fuente, tamaño_fuente)
+        font = cargar_fuente(tamaño_fuente)
         
         # Color del texto: blanco con ~70% de opacidad (180 de 255)
         color_texto = (255, 255, 255, 230)
@@ -49,6 +68,7 @@ def agregar_texto_transparente(ruta_imagen, texto_arriba, texto_abajo):
         ruta_salida = ruta_imagen.replace(".jpeg", "_texto.png").replace(".jpg", "_texto.png")
         img_final.convert("RGB").save(ruta_salida, "JPEG") # Guardamos como JPEG para compatibilidad
         
+        salida.datos({"ruta": ruta_salida})
         print(ruta_salida)
 
     except Exception as e:
@@ -56,7 +76,5 @@ def agregar_texto_transparente(ruta_imagen, texto_arriba, texto_abajo):
         sys.exit(1)
 
 if __name__ == "__main__":
-    image_path = sys.argv[1]
-    top_text = sys.argv[2]
-    bottom_text = sys.argv[3]
-    agregar_texto_transparente(image_path, top_text, bottom_text)
\ No newline at end of file
+    image_path, top_text, bottom_text = salida.argumentos()[:3]
+    script.ejecutar(agregar_texto_transparente, image_path, top_text, bottom_text)
\ No newline at end of file
@@ -4,76 +4,61 @@ Script optimizado para obtener estado de Transbank.
 Sin caché local (delegado a Node.js), con soporte de zona horaria y manejo de errores.
 """
 import sys
-import json
-import requests
-from bs4 import BeautifulSoup
-import io
 from datetime import datetime
 from zoneinfo import ZoneInfo
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+from utils import fetch, salida, script, sopa
 
 # Configurar salida UTF-8
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+script.configurar_utf8()
 
 # Configuración
 URL_TRANSBANK = 'https://status.transbankdevelopers.cl/'
-# Requests session con reintentos
-SESSION = requests.Session()
-RETRY_STRAT = Retry(
-    total=3,
-    backoff_factor=1,
-    status_forcelist=[429, 500, 502, 503, 504],
-    allowed_methods=["GET", "POST"]
-)
-ADAPTER = HTTPAdapter(max_retries=RETRY_STRAT)
-SESSION.mount("https://", ADAPTER)
-SESSION.mount("http://", ADAPTER)
-SESSION.headers.update({'User-Agent': 'Botillero/2.0'})
+# Solo interesa el contenedor con los estados
+SOLO_SERVICIOS = sopa.filtro('div', clase='components-container')
 
-def get_transbank_status():
-    """Obtiene el estado de los servicios haciendo scraping."""
-    try:
-        response = SESSION.get(URL_TRANSBANK, timeout=10)
-        response.raise_for_status()
+def extraer_estados(html):
+    """Extrae {servicio: estado} desde el HTML de la página de status."""
+    soup = sopa.crear(html, solo=SOLO_SERVICIOS)
+    container = soup.find('div', class_='components-container')
+
+    if not container:
+        raise Exception('No se encontró el contenedor de servicios')
 
-        soup = BeautifulSoup(response.text, 'html.parser')
-        container = soup.find('div', class_='components-container')
+    services = container.find_all('div', class_='component-inner-container')
+    if not services:
+        raise Exception('No se encontraron servicios listados')
 
-        if not container:
-            raise Exception('No se encontró el contenedor de servicios')
+    status_map = {}
+    for service in services:
+        name_tag = service.find('span', class_='name')
+        status_tag = service.find('span', class_='component-status')
 
-        services = container.find_all('div', class_='component-inner-container')
-        if not services:
-            raise Exception('No se encontraron servicios listados')
+        if name_tag and status_tag:
+            name = name_tag.text.strip()
+            status = status_tag.text.strip()
+            status_map[name] = status
 
-        status_map = {}
-        for service in services:
-            name_tag = service.find('span', class_='name')
-            status_tag = service.find('span', class_='component-status')
+    if not status_map:
+        raise Exception('No se pudieron extraer los estados')
 
-            if name_tag and status_tag:
-                name = name_tag.text.strip()
-                status = status_tag.text.strip()
-                status_map[name] = status
+    return status_map
 
-        if not status_map:
-            raise Exception('No se pudieron extraer los estados')
+def get_transbank_status():
+    """Obtiene el estado de los servicios haciendo scraping."""
+    try:
+        response = fetch.get(URL_TRANSBANK, headers={'User-Agent': fetch.USER_AGENT_BOT})
+        response.raise_for_status()
 
-        return status_map
+        return fetch.parsear(response, 'transbank.estados/v1', extraer_estados)
 
     except Exception as e:
         raise e
 
 def main():
     try:
-        json_output = '--json' in sys.argv
         data = get_transbank_status()
-        
-        if json_output:
-            # Salida JSON pura para el monitoreo automático
-            print(json.dumps(data, ensure_ascii=False))
-            return
+        # Con --json el monitoreo automático lee estos datos (ver utils.salida)
+        salida.datos(data)
 
         # Formato texto para WhatsApp
         output = "*Estado de Servicios Transbank*\n\n"
@@ -112,4 +97,4 @@ def main():
         sys.exit(1)
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    script.ejecutar(main)
\ No newline at end of file
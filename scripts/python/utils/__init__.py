@@ -0,0 +1 @@
+"""Módulos compartidos por los scripts de scripts/python."""
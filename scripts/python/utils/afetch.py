@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+Capa asíncrona para que los scripts lancen sus peticiones independientes en
+paralelo y la latencia total sea la de la más lenta, no la suma.
+
+Cada petición corre en el pool de hilos de asyncio usando utils.fetch, así que
+la sesión por host, los reintentos y los timeouts son exactamente los mismos
+que en el camino síncrono. Un semáforo por host acota la concurrencia.
+"""
+import asyncio
+import weakref
+
+MAX_POR_HOST = 4
+# Hosts que toleran (o necesitan) otro nivel de paralelismo
+MAX_POR_HOST_ESPECIAL = {
+    'www.google.com': 5,
+}
+
+# Los semáforos quedan atados a su event loop; un worker corre varios asyncio.run()
+_semaforos = weakref.WeakKeyDictionary()
+
+
+def _semaforo(url):
+    # utils.fetch trae requests: se carga con la primera petición, no al importar
+    from utils import fetch
+
+    loop = asyncio.get_running_loop()
+    por_host = _semaforos.setdefault(loop, {})
+    host = fetch.host_de(url)
+    if host not in por_host:
+        por_host[host] = asyncio.Semaphore(MAX_POR_HOST_ESPECIAL.get(host, MAX_POR_HOST))
+    return por_host[host]
+
+
+async def get(url, **kwargs):
+    """Versión asíncrona de fetch.get(); devuelve el mismo requests.Response."""
+    from utils import fetch
+
+    async with _semaforo(url):
+        return await asyncio.to_thread(fetch.get, url, **kwargs)
+
+
+async def get_texto(url, **kwargs):
+    """GET que valida el status y devuelve el cuerpo decodificado."""
+    respuesta = await get(url, **kwargs)
+    respuesta.raise_for_status()
+    return respuesta.text
+
+
+async def get_json(url, **kwargs):
+    """GET que valida el status y devuelve el JSON ya parseado."""
+    respuesta = await get(url, **kwargs)
+    respuesta.raise_for_status()
+    return respuesta.json()
+
+
+async def reunir(*corutinas):
+    """
+    asyncio.gather que no corta al primer error: cada posición trae su
+    resultado o la excepción que lanzó, para armar respuestas parciales.
+    """
+    return await asyncio.gather(*corutinas, return_exceptions=True)
+
+
+def correr(corutina):
+    """Ejecuta una corutina desde código síncrono (el main de cada script)."""
+    return asyncio.run(corutina)
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+Utilidades de archivos compartidas entre procesos: carpeta temporal del bot,
+bloqueo exclusivo (entre procesos y entre hilos) y escritura atómica.
+"""
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# scripts/python/utils -> raíz del repo
+RAIZ_REPO = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+TEMP_DIR = os.environ.get('BOTILLERO_TEMP_DIR') or os.path.join(RAIZ_REPO, 'temp')
+
+_locks_hilo = {}
+_locks_hilo_lock = threading.Lock()
+
+
+def ruta_temp(*partes):
+    """Ruta dentro de la carpeta temporal del bot, creando los directorios padre."""
+    ruta = os.path.join(TEMP_DIR, *partes)
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    return ruta
+
+
+def _lock_hilo(ruta):
+    with _locks_hilo_lock:
+        return _locks_hilo.setdefault(ruta, threading.Lock())
+
+
+def _bloquear_archivo(f, esperar=True):
+    if fcntl:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX if esperar else fcntl.LOCK_EX | fcntl.LOCK_NB)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK if esperar else msvcrt.LK_NBLCK, 1)
+
+
+def _soltar_archivo(f):
+    if fcntl:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+@contextmanager
+def bloqueo(ruta):
+    """
+    Bloqueo exclusivo sobre `ruta` (se crea si no existe).
+    Sirve entre los workers y entre los hilos de un mismo proceso.
+    """
+    with _lock_hilo(ruta):
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        with open(ruta, 'a+b') as f:
+            _bloquear_archivo(f)
+            try:
+                yield
+            finally:
+                _soltar_archivo(f)
+
+
+@contextmanager
+def intentar_bloqueo(ruta):
+    """Como bloqueo(), pero sin esperar: entrega False si otro ya lo tiene."""
+    lock_hilo = _lock_hilo(ruta)
+    if not lock_hilo.acquire(blocking=False):
+        yield False
+        return
+    try:
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        with open(ruta, 'a+b') as f:
+            try:
+                _bloquear_archivo(f, esperar=False)
+            except OSError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                _soltar_archivo(f)
+    finally:
+        lock_hilo.release()
+
+
+def escribir_atomico(ruta, datos):
+    """Escribe bytes en `ruta` vía archivo temporal + os.replace: nunca queda a medias."""
+    carpeta = os.path.dirname(ruta)
+    os.makedirs(carpeta, exist_ok=True)
+    fd, temporal = tempfile.mkstemp(dir=carpeta, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(datos)
+        os.replace(temporal, ruta)
+    except BaseException:
+        try:
+            os.unlink(temporal)
+        except OSError:
+            pass
+        raise
+
+
+def leer_json(ruta, por_defecto=None):
+    """Lee un JSON; si no existe o está corrupto devuelve `por_defecto`."""
+    try:
+        with open(ruta, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return por_defecto
+
+
+def escribir_json(ruta, datos):
+    escribir_atomico(ruta, json.dumps(datos, ensure_ascii=False).encode('utf-8'))
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+Caché en disco de respuestas HTTP, compartida por todos los scripts y workers.
+
+- TTL declarado por fuente (host) en TTL_POR_HOST; los hosts que no aparecen
+  no se cachean.
+- Cada entrada es un JSON escrito de forma atómica; las escrituras y la
+  limpieza van bajo un bloqueo de archivo.
+- Con BOTILLERO_CACHE_REFRESH=1 (lo usa prefetch.py) utils.fetch no sirve
+  entradas frescas sin antes revalidarlas, para que la corrida de fondo
+  renueve la caché en vez de leerla.
+- Tamaño acotado: al pasar MAX_BYTES se borran las entradas menos usadas
+  (el mtime se actualiza en cada lectura, así que es un LRU).
+"""
+import hashlib
+import os
+import time
+
+from utils import archivos
+
+CACHE_DIR = os.environ.get('BOTILLERO_CACHE_DIR') or archivos.ruta_temp('cache', 'http', '')
+MAX_BYTES = int(os.environ.get('BOTILLERO_CACHE_MAX_BYTES') or 50 * 1024 * 1024)
+_LOCK = os.path.join(CACHE_DIR, '.lock')
+ENV_REFRESCAR = 'BOTILLERO_CACHE_REFRESH'
+
+MINUTO = 60
+HORA = 60 * MINUTO
+DIA = 24 * HORA
+
+# Cuánto tiempo se considera fresca una respuesta de cada fuente
+TTL_POR_HOST = {
+    't.me': 1 * MINUTO,                          # Alertas de Metro (Telegram)
+    'www.metro.cl': 2 * MINUTO,
+    'www.red.cl': 5 * MINUTO,
+    'status.transbankdevelopers.cl': 1 * MINUTO,
+    'site.api.espn.com': 1 * MINUTO,              # Marcadores en vivo
+    'www.google.com': 5 * MINUTO,                 # Google Finance
+    'es.investing.com': 5 * MINUTO,
+    'api.bencinaenlinea.cl': 30 * MINUTO,
+    'chile.as.com': 30 * MINUTO,
+    'www.campeonatochileno.cl': 3 * HORA,         # Tablas y fechas de Copa de la Liga
+    'mindicador.cl': 1 * DIA,                     # UF, UTM, IPC: cambian una vez al día
+    'crt.sh': 1 * DIA,
+}
+
+# Hosts que los scripts consultan sin cachear. Junto con TTL_POR_HOST son los
+# hosts conocidos: las métricas y el circuit breaker solo llevan cuenta por
+# host de estos (net_analyzer pide dominios arbitrarios)
+HOSTS_SIN_CACHE = ('fapello.com',)
+
+
+def host_conocido(host):
+    return host in TTL_POR_HOST or host in HOSTS_SIN_CACHE
+
+
+def ttl_para(host):
+    """TTL en segundos para un host, o 0 si no se cachea."""
+    return TTL_POR_HOST.get(host, 0)
+
+
+def refrescar():
+    """True si esta ejecución debe renovar las entradas aunque sigan frescas."""
+    return os.environ.get(ENV_REFRESCAR) == '1'
+
+
+def _ruta(clave):
+    return os.path.join(CACHE_DIR, hashlib.sha1(clave.encode('utf-8')).hexdigest() + '.json')
+
+
+def leer(clave):
+    """
+    Devuelve la entrada guardada para `clave` (sin importar su edad) o None.
+    Las lecturas no bloquean: las escrituras son atómicas.
+    """
+    ruta = _ruta(clave)
+    entrada = archivos.leer_json(ruta)
+    if not entrada or entrada.get('clave') != clave:
+        return None
+    try:
+        os.utime(ruta)  # Marca de uso para el LRU
+    except OSError:
+        pass
+    return entrada
+
+
+def edad(entrada):
+    """Segundos desde que se guardó la entrada."""
+    return time.time() - entrada.get('guardado', 0)
+
+
+def guardar(clave, entrada):
+    """Guarda (o reemplaza) la entrada de `clave` y aplica el límite de tamaño."""
+    entrada = {**entrada, 'clave': clave, 'guardado': time.time()}
+    with archivos.bloqueo(_LOCK):
+        archivos.escribir_json(_ruta(clave), entrada)
+        _recortar()
+
+
+def _recortar():
+    """Borra las entradas menos usadas hasta quedar bajo el 90% de MAX_BYTES."""
+    entradas = []
+    total = 0
+    with os.scandir(CACHE_DIR) as it:
+        for e in it:
+            if not e.name.endswith('.json'):
+                continue
+            try:
+                st = e.stat()
+            except OSError:
+                continue
+            entradas.append((st.st_mtime, st.st_size, e.path))
+            total += st.st_size
+
+    if total <= MAX_BYTES:
+        return
+
+    objetivo = MAX_BYTES * 0.9
+    for _, tamano, ruta in sorted(entradas):
+        try:
+            os.unlink(ruta)
+            total -= tamano
+        except OSError:
+            pass
+        if total <= objetivo:
+            break
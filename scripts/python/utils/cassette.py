@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+Grabación y reproducción de respuestas HTTP para correr los scripts sin red.
+
+BOTILLERO_HTTP_MODE=record   hace las peticiones reales (sin caché) y guarda
+                             cada respuesta en un cassette por host.
+BOTILLERO_HTTP_MODE=replay   no toca la red: responde desde los cassettes y
+                             falla con ConnectionError si falta la grabación.
+
+Los cassettes viven en BOTILLERO_CASSETTE_DIR (por defecto
+scripts/python/fixtures/cassettes), uno por host: `<host>.json` con
+{url: entrada}, en el mismo formato que las entradas de utils.cache. Los
+cuerpos de texto se guardan legibles para poder revisarlos o editarlos a mano.
+
+Solo cubre lo que pasa por utils.fetch / utils.afetch; Selenium, Playwright y
+las consultas DNS/SSL de net_analyzer siguen necesitando red.
+"""
+import base64
+import json
+import os
+
+import requests
+
+from utils import archivos
+
+GRABAR = 'record'
+REPRODUCIR = 'replay'
+
+MODO = os.environ.get('BOTILLERO_HTTP_MODE', '').lower() or None
+CASSETTE_DIR = os.environ.get('BOTILLERO_CASSETTE_DIR') or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'fixtures', 'cassettes'
+)
+
+
+def ruta(host):
+    return os.path.join(CASSETTE_DIR, f"{host or 'sin-host'}.json")
+
+
+def _legible(entrada):
+    """Pasa el cuerpo de base64 a texto si es UTF-8 válido."""
+    entrada = dict(entrada)
+    try:
+        entrada['texto'] = base64.b64decode(entrada['cuerpo']).decode('utf-8')
+        del entrada['cuerpo']
+    except UnicodeDecodeError:
+        pass
+    return entrada
+
+
+def _binaria(entrada):
+    if 'texto' in entrada:
+        entrada = dict(entrada)
+        entrada['cuerpo'] = base64.b64encode(entrada.pop('texto').encode('utf-8')).decode('ascii')
+    return entrada
+
+
+def grabar(host, clave, entrada):
+    """Agrega (o reemplaza) la respuesta de `clave` en el cassette del host."""
+    archivo = ruta(host)
+    # El bloqueo va en temp/ para no ensuciar la carpeta de fixtures
+    with archivos.bloqueo(archivos.ruta_temp('cassettes.lock')):
+        grabadas = archivos.leer_json(archivo, {})
+        grabadas[clave] = _legible(entrada)
+        # Ordenado e indentado: los cassettes se versionan y se revisan en diffs
+        texto = json.dumps(grabadas, ensure_ascii=False, indent=1, sort_keys=True) + '\n'
+        archivos.escribir_atomico(archivo, texto.encode('utf-8'))
+
+
+def reproducir(host, clave):
+    """Entrada grabada para `clave`; ConnectionError si no existe."""
+    entrada = archivos.leer_json(ruta(host), {}).get(clave)
+    if entrada is None:
+        raise requests.ConnectionError(f"Sin grabación para {clave} en {ruta(host)}")
+    return _binaria(entrada)
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+Circuit breaker por host para no esperar timeouts de un upstream caído.
+
+Estados (compartidos entre procesos en temp/circuitos/<host>.json):
+
+  cerrado      normal; cada error de red o respuesta 5xx/429 suma un fallo
+               consecutivo y FALLOS_PARA_ABRIR seguidos lo abren.
+  abierto      las peticiones no salen: utils.fetch responde con lo último
+               guardado en caché (aunque esté vencido) o lanza CircuitoAbierto
+               al instante, y el script muestra su mensaje de error habitual.
+  semiabierto  pasado ENFRIAMIENTO, una sola petición sale de prueba: si
+               anda, el circuito se cierra; si falla, vuelve a abrirse.
+
+Solo los hosts conocidos (utils.cache.host_conocido) tienen circuito: los
+dominios arbitrarios de net_analyzer no dejan un archivo de estado cada uno.
+BOTILLERO_CIRCUIT=0 lo apaga.
+"""
+import math
+import os
+import time
+
+import requests
+
+from utils import archivos, cache
+
+CERRADO = 'cerrado'
+ABIERTO = 'abierto'
+
+FALLOS_PARA_ABRIR = 3
+ENFRIAMIENTO = 60  # segundos abierto antes de dejar pasar una prueba
+# Una prueba que no informó en este tiempo (proceso muerto) se da por perdida
+MAX_PRUEBA = 30
+
+
+class CircuitoAbierto(requests.ConnectionError):
+    """El host está marcado como caído; la petición no llegó a salir."""
+
+    def __init__(self, host, reintento_en):
+        super().__init__(f"{host} no responde; se reintentará en {math.ceil(reintento_en)} s")
+        self.host = host
+
+
+def activo():
+    return os.environ.get('BOTILLERO_CIRCUIT') != '0'
+
+
+def _vigilado(host):
+    return activo() and bool(host) and cache.host_conocido(host)
+
+
+def _ruta(host):
+    return archivos.ruta_temp('circuitos', f'{host}.json')
+
+
+def _estado(host):
+    return archivos.leer_json(_ruta(host), None) or {'estado': CERRADO, 'fallos': 0}
+
+
+def permitir(host):
+    """
+    True si la petición puede salir (circuito cerrado o esta es la prueba).
+    Con el circuito abierto devuelve los segundos que faltan para reintentar.
+    """
+    if not _vigilado(host):
+        return True
+    # Camino rápido sin bloqueo: lo normal es un circuito cerrado
+    if _estado(host)['estado'] == CERRADO:
+        return True
+
+    with archivos.bloqueo(_ruta(host) + '.lock'):
+        estado = _estado(host)
+        if estado['estado'] == CERRADO:
+            return True
+        ahora = time.time()
+        falta = estado['abierto_desde'] + ENFRIAMIENTO - ahora
+        if falta > 0:
+            return falta
+        if ahora - estado.get('prueba_desde', 0) < MAX_PRUEBA:
+            return MAX_PRUEBA  # Ya hay otra petición probando
+        estado['prueba_desde'] = ahora
+        archivos.escribir_json(_ruta(host), estado)
+        return True
+
+
+def _registrar(host, fallo):
+    with archivos.bloqueo(_ruta(host) + '.lock'):
+        estado = _estado(host)
+        if not fallo:
+            nuevo = {'estado': CERRADO, 'fallos': 0}
+        else:
+            fallos = estado.get('fallos', 0) + 1
+            # Una prueba fallida reabre el circuito aunque no llegue al umbral
+            abrir = estado['estado'] == ABIERTO or fallos >= FALLOS_PARA_ABRIR
+            nuevo = {'estado': ABIERTO if abrir else CERRADO, 'fallos': fallos}
+            if abrir:
+                nuevo['abierto_desde'] = time.time()
+        if nuevo != estado:
+            archivos.escribir_json(_ruta(host), nuevo)
+
+
+def exito(host):
+    if not _vigilado(host):
+        return
+    estado = _estado(host)
+    if estado['estado'] == CERRADO and not estado.get('fallos'):
+        return  # Nada que escribir
+    _registrar(host, fallo=False)
+
+
+def fallo(host):
+    if _vigilado(host):
+        _registrar(host, fallo=True)
+
+
+def es_fallo(status):
+    """Status que cuentan como caída del upstream (no los 4xx del propio pedido)."""
+    return status >= 500 or status == 429
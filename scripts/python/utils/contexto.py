@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+Estado por ejecución para correr varios scripts a la vez dentro de un mismo
+proceso (lote.py).
+
+sys.stdout, sys.stderr y sys.argv son globales del intérprete. instalar() los
+reemplaza por versiones que delegan en lo que fijó la ejecución en curso con
+ejecucion(); eso vive en contextvars, así que cada hilo de lote.py tiene lo
+suyo y lo que el script lance con asyncio.to_thread lo hereda. Fuera de una
+ejecución delegan en los originales.
+
+Sin instalar() nada cambia: capturar() y fijar_argv() tocan sys.stdout y
+sys.argv directamente, como siempre lo hicieron utils.script y worker.py.
+"""
+import io
+import sys
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_stdout = ContextVar('botillero_stdout', default=None)
+_stderr = ContextVar('botillero_stderr', default=None)
+_argv = ContextVar('botillero_argv', default=None)
+
+_originales = None
+
+
+class _Flujo(io.TextIOBase):
+    """sys.stdout/sys.stderr que escribe en el flujo de la ejecución en curso."""
+
+    def __init__(self, variable, defecto):
+        self._variable = variable
+        self._defecto = defecto
+
+    def _destino(self):
+        return self._variable.get() or self._defecto
+
+    @property
+    def encoding(self):
+        # Los scripts no vuelven a envolverlo (ver script.configurar_utf8)
+        return 'utf-8'
+
+    def writable(self):
+        return True
+
+    def write(self, texto):
+        return self._destino().write(texto)
+
+    def flush(self):
+        self._destino().flush()
+
+    def __getattr__(self, nombre):
+        return getattr(self._destino(), nombre)
+
+
+class _Argv(list):
+    """sys.argv que lee la lista de la ejecución en curso (la propia lista queda vacía)."""
+
+    def __init__(self, defecto):
+        super().__init__()
+        self._defecto = defecto
+
+    def _actual(self):
+        argv = _argv.get()
+        return self._defecto if argv is None else argv
+
+    def __getitem__(self, indice):
+        return self._actual()[indice]
+
+    def __len__(self):
+        return len(self._actual())
+
+    def __iter__(self):
+        return iter(self._actual())
+
+    def __contains__(self, valor):
+        return valor in self._actual()
+
+    def __eq__(self, otra):
+        return list(self._actual()) == otra
+
+    def __add__(self, otra):
+        return list(self._actual()) + list(otra)
+
+    def __repr__(self):
+        return repr(self._actual())
+
+    def index(self, *args):
+        return self._actual().index(*args)
+
+    def count(self, valor):
+        return self._actual().count(valor)
+
+
+def instalado():
+    return _originales is not None
+
+
+def instalar():
+    """Reemplaza sys.stdout, sys.stderr y sys.argv por sus versiones por ejecución."""
+    global _originales
+    if _originales is not None:
+        return
+    _originales = (sys.stdout, sys.stderr, sys.argv)
+    sys.stdout = _Flujo(_stdout, sys.stdout)
+    sys.stderr = _Flujo(_stderr, sys.stderr)
+    sys.argv = _Argv(sys.argv)
+
+
+def desinstalar():
+    global _originales
+    if _originales is None:
+        return
+    sys.stdout, sys.stderr, sys.argv = _originales
+    _originales = None
+
+
+@contextmanager
+def ejecucion(argv, stdout, stderr):
+    """Fija argv y los flujos de salida de la ejecución que corre en este contexto."""
+    tokens = (_argv.set(list(argv)), _stdout.set(stdout), _stderr.set(stderr))
+    try:
+        yield
+    finally:
+        for variable, token in zip((_argv, _stdout, _stderr), tokens):
+            variable.reset(token)
+
+
+def fijar_argv(argv):
+    """Cambia sys.argv solo para la ejecución en curso."""
+    if instalado() and _argv.get() is not None:
+        _argv.set(list(argv))
+    else:
+        sys.argv = list(argv)
+
+
+@contextmanager
+def capturar():
+    """Junta en un StringIO lo que se imprima en stdout dentro del bloque."""
+    captura = io.StringIO()
+    if instalado():
+        token = _stdout.set(captura)
+        try:
+            yield captura
+        finally:
+            _stdout.reset(token)
+        return
+    previo, sys.stdout = sys.stdout, captura
+    try:
+        yield captura
+    finally:
+        sys.stdout = previo
@@ -0,0 +1,302 @@
+# -*- coding: utf-8 -*-
+"""
+Cliente HTTP compartido por los scrapers.
+
+Mantiene una requests.Session por host (keep-alive y pool de conexiones), con
+reintentos y backoff consistentes, User-Agent unificado y timeout por defecto.
+Dentro de un worker de larga vida, llamadas repetidas al mismo host reutilizan
+la conexión TCP/TLS ya abierta.
+
+Las respuestas 200 de los hosts con TTL (ver utils.cache) se guardan en disco
+y se sirven desde ahí mientras estén frescas. Vencido el TTL se revalidan con
+If-None-Match / If-Modified-Since: un 304 reutiliza el cuerpo guardado y, con
+parsear(), también el resultado ya extraído de ese cuerpo.
+
+Con BOTILLERO_HTTP_MODE=record|replay las respuestas se graban o se sirven
+desde cassettes (ver utils.cassette) para trabajar sin red.
+
+Lo que sí sale a la red espera antes su turno en utils.limite (ritmo y
+concurrencia por host, compartidos entre procesos) y pasa por el circuit
+breaker del host (utils.circuito): con el upstream caído se responde al tiro
+con la última copia guardada, aunque esté vencida, o con CircuitoAbierto.
+
+Si la ejecución tiene plazo (utils.plazo), el timeout de cada petición se
+recorta a lo que queda y, agotado el plazo, se lanza PlazoAgotado. Con plazo
+tampoco se espera lo que pida un Retry-After, y si ya no cabe un segundo
+intento completo (o el timeout quedó recortado) la petición va sin reintentos.
+"""
+import base64
+import hashlib
+import threading
+import time
+from contextvars import ContextVar
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.util.retry import Retry
+
+from utils import cache, cassette, circuito, limite, plazo, tiempos
+
+USER_AGENT_NAVEGADOR = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+    '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+)
+USER_AGENT_BOT = 'Botillero/2.0'
+
+HEADERS_NAVEGADOR = {
+    'User-Agent': USER_AGENT_NAVEGADOR,
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'es-ES,es;q=0.9,en;q=0.8',
+}
+
+TIMEOUT_POR_DEFECTO = 10  # segundos
+
+# Un reintento de conexión y dos por 429/5xx; los timeouts de lectura no se
+# reintentan para no multiplicar la espera del usuario.
+REINTENTOS = Retry(
+    total=2,
+    connect=1,
+    read=0,
+    status=2,
+    backoff_factor=0.5,
+    status_forcelist=[429, 500, 502, 503, 504],
+    allowed_methods=['GET', 'HEAD'],
+    raise_on_status=False,
+)
+# Con plazo: los mismos reintentos sin esperar lo que diga Retry-After
+REINTENTOS_CON_PLAZO = REINTENTOS.new(respect_retry_after_header=False)
+SIN_REINTENTOS = Retry(total=0, raise_on_status=False)
+
+CONEXIONES_POR_HOST = 10
+
+_sesiones = {}
+_lock = threading.Lock()
+# Reintentos de la petición en curso (por hilo/tarea); None usa los del adaptador
+_reintentos = ContextVar('botillero_reintentos', default=None)
+
+
+class _Adaptador(HTTPAdapter):
+    """HTTPAdapter cuyos reintentos se pueden cambiar por petición (ver _reintentos)."""
+
+    @property
+    def max_retries(self):
+        return _reintentos.get() or self._max_retries
+
+    @max_retries.setter
+    def max_retries(self, valor):
+        self._max_retries = valor
+
+
+def host_de(url):
+    """Host (en minúsculas, sin puerto) de una URL."""
+    return (urlsplit(url).hostname or '').lower()
+
+
+def sesion(url):
+    """Devuelve la sesión compartida para el host de la URL, creándola si no existe."""
+    host = host_de(url)
+    with _lock:
+        s = _sesiones.get(host)
+        if s is None:
+            s = requests.Session()
+            adaptador = _Adaptador(
+                max_retries=REINTENTOS, pool_connections=4, pool_maxsize=CONEXIONES_POR_HOST
+            )
+            s.mount('https://', adaptador)
+            s.mount('http://', adaptador)
+            s.headers.update(HEADERS_NAVEGADOR)
+            _sesiones[host] = s
+    return s
+
+
+def _clave_cache(url, params):
+    if not params:
+        return url
+    return requests.Request('GET', url, params=params).prepare().url
+
+
+def _entrada_desde_respuesta(respuesta):
+    return {
+        'url': respuesta.url,
+        'status': respuesta.status_code,
+        'headers': dict(respuesta.headers),
+        'encoding': respuesta.encoding,
+        'cuerpo': base64.b64encode(respuesta.content).decode('ascii'),
+    }
+
+
+def respuesta_desde_cache(entrada):
+    """Reconstruye un requests.Response a partir de una entrada de la caché."""
+    respuesta = requests.Response()
+    respuesta.status_code = entrada['status']
+    respuesta.reason = 'OK'
+    respuesta.url = entrada['url']
+    respuesta.headers = CaseInsensitiveDict(entrada['headers'])
+    respuesta.encoding = entrada.get('encoding')
+    respuesta._content = base64.b64decode(entrada['cuerpo'])
+    respuesta.desde_cache = True
+    respuesta.revalidada = False
+    respuesta.obtenida = entrada.get('guardado')
+    return respuesta
+
+
+def _con_validadores(headers, entrada):
+    """Suma If-None-Match / If-Modified-Since según lo que guardó la entrada."""
+    guardados = CaseInsensitiveDict(entrada['headers'])
+    condicionales = {}
+    if guardados.get('ETag'):
+        condicionales['If-None-Match'] = guardados['ETag']
+    if guardados.get('Last-Modified'):
+        condicionales['If-Modified-Since'] = guardados['Last-Modified']
+    if not condicionales:
+        return headers
+    return {**(headers or {}), **condicionales}
+
+
+def _segundos(timeout):
+    """Peor caso de un timeout de requests (número, tupla (conexión, lectura) o None)."""
+    if isinstance(timeout, tuple):
+        return sum(t or 0 for t in timeout)
+    return timeout or 0
+
+
+def _reintentos_para(timeout, recortado):
+    """Reintentos según el plazo de la ejecución; None sin plazo (los de la sesión)."""
+    queda = plazo.restante()
+    if queda is None:
+        return None
+    if recortado or queda < 2 * _segundos(timeout):
+        return SIN_REINTENTOS
+    return REINTENTOS_CON_PLAZO
+
+
+def get(url, headers=None, timeout=TIMEOUT_POR_DEFECTO, ttl=None, **kwargs):
+    """
+    GET a través de la sesión del host.
+    `headers` se suma a los de la sesión; el resto de kwargs va directo a requests.
+    `ttl` (segundos) reemplaza el TTL del host; ttl=0 desactiva la caché.
+    Cada llamada queda anotada en utils.tiempos con su duración, estado de
+    caché y, como fuente del resultado, la URL y cuándo se obtuvo.
+    """
+    inicio = time.perf_counter()
+    respuesta, estado = None, 'error'
+    try:
+        respuesta, estado = _get(url, headers, timeout, ttl, **kwargs)
+        return respuesta
+    except circuito.CircuitoAbierto:
+        estado = 'open'
+        raise
+    finally:
+        tiempos.peticion(
+            host_de(url), (time.perf_counter() - inicio) * 1000, estado,
+            respuesta.status_code if respuesta is not None else None,
+            url=_clave_cache(url, kwargs.get('params')),
+            obtenida=getattr(respuesta, 'obtenida', None),
+            bytes_red=len(respuesta.content) if estado in ('miss', 'bypass') else 0,
+        )
+
+
+def _get(url, headers, timeout, ttl, **kwargs):
+    """
+    Devuelve (respuesta, estado de caché): replay, hit, revalidated, miss,
+    bypass o stale (copia vencida servida con el circuito abierto).
+    """
+    clave = _clave_cache(url, kwargs.get('params'))
+    if cassette.MODO == cassette.REPRODUCIR:
+        return respuesta_desde_cache(cassette.reproducir(host_de(url), clave)), 'replay'
+    if cassette.MODO == cassette.GRABAR:
+        ttl = 0  # Se graba lo que responde el servidor, no la caché
+
+    if ttl is None:
+        ttl = cache.ttl_para(host_de(url))
+
+    entrada = cache.leer(clave) if ttl else None
+    if entrada:
+        if cache.edad(entrada) < ttl and not cache.refrescar():
+            return respuesta_desde_cache(entrada), 'hit'
+        headers = _con_validadores(headers, entrada)
+
+    host = host_de(url)
+    permiso = circuito.permitir(host)
+    if permiso is not True:
+        entrada = entrada or cache.leer(clave)
+        if entrada:
+            return respuesta_desde_cache(entrada), 'stale'
+        raise circuito.CircuitoAbierto(host, permiso)
+
+    recortado = False
+    try:
+        with limite.turno(host):
+            # Después de esperar turno: la espera también gasta plazo
+            ajustado = plazo.ajustar(timeout)
+            recortado = ajustado != timeout
+            marca = _reintentos.set(_reintentos_para(ajustado, recortado))
+            try:
+                respuesta = sesion(url).get(url, headers=headers, timeout=ajustado, **kwargs)
+            finally:
+                _reintentos.reset(marca)
+    except plazo.PlazoAgotado:
+        raise  # No es culpa del upstream
+    except requests.Timeout:
+        # Con el timeout recortado por el plazo, la demora no prueba que el host esté caído
+        if not recortado:
+            circuito.fallo(host)
+        raise
+    except requests.ConnectionError:
+        circuito.fallo(host)
+        raise
+    if circuito.es_fallo(respuesta.status_code):
+        circuito.fallo(host)
+    else:
+        circuito.exito(host)
+
+    if entrada and respuesta.status_code == 304:
+        # Nada cambió: se renueva la entrada con los headers nuevos que traiga el 304
+        guardados = CaseInsensitiveDict(entrada['headers'])
+        guardados.update(respuesta.headers)
+        entrada['headers'] = dict(guardados)
+        try:
+            cache.guardar(clave, entrada)
+        except OSError:
+            pass
+        revalidada = respuesta_desde_cache(entrada)
+        revalidada.revalidada = True
+        revalidada.obtenida = time.time()
+        return revalidada, 'revalidated'
+
+    respuesta.desde_cache = False
+    respuesta.revalidada = False
+    respuesta.obtenida = time.time()
+
+    if cassette.MODO == cassette.GRABAR:
+        cassette.grabar(host_de(url), clave, _entrada_desde_respuesta(respuesta))
+
+    if ttl and respuesta.status_code == 200:
+        try:
+            cache.guardar(clave, _entrada_desde_respuesta(respuesta))
+        except OSError:
+            pass  # Sin disco no hay caché, pero la respuesta sigue sirviendo
+    return respuesta, ('miss' if ttl else 'bypass')
+
+
+def parsear(respuesta, nombre, parser):
+    """
+    Devuelve parser(respuesta.content), reutilizando el resultado si ese mismo
+    cuerpo ya se parseó antes (caché fresca, 304 o un 200 idéntico).
+    `nombre` identifica al parser: cambiarlo (p. ej. 'liga.fechas/v2') cuando
+    cambie lo que extrae. El resultado debe ser serializable a JSON.
+    """
+    contenido = respuesta.content
+    clave = f"parse:{nombre}:{hashlib.sha1(contenido).hexdigest()}"
+    entrada = cache.leer(clave)
+    if entrada is not None:
+        return entrada['valor']
+
+    valor = parser(contenido)
+    try:
+        cache.guardar(clave, {'valor': valor})
+    except OSError:
+        pass
+    return valor
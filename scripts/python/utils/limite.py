@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+Límite de ritmo y de concurrencia por host, compartido entre scripts, hilos y
+procesos (workers y procesos sueltos).
+
+Cada petición que sale a la red pide antes un turno al host:
+
+- Token bucket: `por_segundo` tokens por segundo con una ráfaga de hasta
+  `rafaga`. El estado vive en temp/limites/<host>.json y se actualiza bajo
+  bloqueo; quien no encuentra token reserva uno (el saldo queda negativo) y
+  duerme lo que falta, así que las esperas se reparten en orden de llegada.
+- Concurrencia: `concurrencia` cupos por host, cada uno un archivo de bloqueo
+  (temp/limites/<host>.cupoN). El sistema operativo los libera si el proceso
+  muere.
+
+Las esperas se suman a la etapa 'throttle' de utils.tiempos. Nunca se espera
+más de MAX_ESPERA (ni más de lo que queda del plazo de la ejecución, ver
+utils.plazo): pasado eso la petición sale igual, porque es preferible
+arriesgar un 429 a dejar colgado el comando. BOTILLERO_RATE_LIMIT=0 lo apaga.
+"""
+import os
+import time
+from collections import namedtuple
+from contextlib import ExitStack, contextmanager
+
+from utils import archivos, plazo, tiempos
+
+Limite = namedtuple('Limite', 'por_segundo rafaga concurrencia')
+
+# AS.com y campeonatochileno.cl los consultan varios scripts; Google Finance
+# recibe ocho consultas por cada valores.py
+LIMITES_POR_HOST = {
+    'chile.as.com': Limite(por_segundo=2, rafaga=4, concurrencia=3),
+    'www.campeonatochileno.cl': Limite(por_segundo=2, rafaga=4, concurrencia=2),
+    'www.google.com': Limite(por_segundo=4, rafaga=8, concurrencia=5),
+}
+LIMITE_POR_DEFECTO = Limite(por_segundo=10, rafaga=20, concurrencia=8)
+
+MAX_ESPERA = 10  # segundos, sumando token y cupo
+INTERVALO_CUPO = 0.05
+
+
+def activo():
+    return os.environ.get('BOTILLERO_RATE_LIMIT') != '0'
+
+
+def limite_para(host):
+    return LIMITES_POR_HOST.get(host, LIMITE_POR_DEFECTO)
+
+
+def _reservar_token(host, limite):
+    """Consume un token del host y devuelve cuántos segundos hay que esperarlo."""
+    ruta = archivos.ruta_temp('limites', f'{host}.json')
+    with archivos.bloqueo(ruta + '.lock'):
+        ahora = time.time()
+        estado = archivos.leer_json(ruta, None) or {'tokens': limite.rafaga, 'actualizado': ahora}
+        transcurrido = max(0.0, ahora - estado['actualizado'])
+        tokens = min(limite.rafaga, estado['tokens'] + transcurrido * limite.por_segundo) - 1
+        # Un saldo negativo sin techo haría esperar de más a los que vengan después
+        tokens = max(tokens, -limite.por_segundo * MAX_ESPERA)
+        archivos.escribir_json(ruta, {'tokens': tokens, 'actualizado': ahora})
+    return -tokens / limite.por_segundo if tokens < 0 else 0.0
+
+
+def _tomar_cupo(pila, host, limite, hasta):
+    """Toma uno de los cupos del host; False si se acabó el tiempo de espera."""
+    while True:
+        for i in range(limite.concurrencia):
+            with ExitStack() as intento:
+                if intento.enter_context(archivos.intentar_bloqueo(archivos.ruta_temp('limites', f'{host}.cupo{i}'))):
+                    # El cupo queda tomado hasta que se cierre `pila`
+                    pila.push(intento.pop_all())
+                    return True
+        if time.monotonic() >= hasta:
+            return False
+        time.sleep(INTERVALO_CUPO)
+
+
+@contextmanager
+def turno(host):
+    """Espera turno para hablar con `host` y mantiene ocupado un cupo durante el bloque."""
+    if not activo() or not host:
+        yield
+        return
+
+    limite = limite_para(host)
+    inicio = time.monotonic()
+    queda = plazo.restante()
+    maximo = MAX_ESPERA if queda is None else max(0.0, min(MAX_ESPERA, queda))
+    hasta = inicio + maximo
+    try:
+        espera = _reservar_token(host, limite)
+    except OSError:
+        espera = 0.0  # Sin disco no hay límite compartido
+    if espera:
+        time.sleep(min(espera, maximo))
+
+    with ExitStack() as pila:
+        try:
+            _tomar_cupo(pila, host, limite, hasta)
+        except OSError:
+            pass
+        esperado = time.monotonic() - inicio
+        if esperado >= 0.001:
+            tiempos.sumar('throttle', esperado * 1000)
+        yield
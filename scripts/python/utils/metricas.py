@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+Métricas acumuladas de la capa Python, en formato de texto de Prometheus.
+
+Al terminar cada ejecución, utils.script suma lo que anotó utils.tiempos a un
+almacén compartido por todos los workers y procesos (temp/metricas/):
+
+  botillero_script_runs_total{script,result}        ejecuciones ok / error
+  botillero_script_duration_seconds{script}         histograma de duración
+  botillero_upstream_requests_total{host,cache}     peticiones por estado de caché
+  botillero_upstream_failures_total{host}           errores de red y status >= 400
+  botillero_upstream_bytes_total{host}              bytes bajados de la red
+  botillero_upstream_duration_seconds{host}         histograma de latencia
+  botillero_upstream_cache_hit_ratio{host}          servidas sin bajar el cuerpo
+
+La etiqueta host solo toma los hosts conocidos (utils.cache.host_conocido); el
+resto (p. ej. los dominios que analiza net_analyzer) se suma como `otros` para
+que la cantidad de series no crezca sin límite.
+
+Cada vez se reescribe también temp/metricas/botillero.prom (para el textfile
+collector de node_exporter); `python metricas.py --serve` las expone por HTTP.
+BOTILLERO_METRICS=0 apaga el registro.
+"""
+import os
+import time
+
+from utils import archivos
+
+ENV = 'BOTILLERO_METRICS'
+
+BUCKETS_SCRIPT = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60)
+BUCKETS_UPSTREAM = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+OTROS = 'otros'
+
+# Estados de utils.fetch que se respondieron sin bajar el cuerpo
+_SIN_DESCARGA = ('hit', 'revalidated')
+
+
+def activo():
+    return os.environ.get(ENV) != '0'
+
+
+def ruta_almacen():
+    return archivos.ruta_temp('metricas', 'metricas.json')
+
+
+def ruta_prom():
+    return archivos.ruta_temp('metricas', 'botillero.prom')
+
+
+def _observar(histograma, buckets, valor):
+    if not histograma:
+        histograma.update({'buckets': [0] * len(buckets), 'sum': 0.0, 'count': 0})
+    for i, limite in enumerate(buckets):
+        if valor <= limite:
+            histograma['buckets'][i] += 1
+    histograma['sum'] += valor
+    histograma['count'] += 1
+
+
+def _acumular(almacen, resumen, ok):
+    # utils.cache solo hace falta al registrar, no al importar cada script
+    from utils import cache
+
+    script = almacen['scripts'].setdefault(resumen.get('script') or 'desconocido', {
+        'runs': {}, 'duracion': {},
+    })
+    resultado = 'ok' if ok else 'error'
+    script['runs'][resultado] = script['runs'].get(resultado, 0) + 1
+    _observar(script['duracion'], BUCKETS_SCRIPT, resumen['total_ms'] / 1000)
+
+    for peticion in resumen.get('fetch', []):
+        nombre = peticion['host'] or 'sin-host'
+        if nombre != 'sin-host' and not cache.host_conocido(nombre):
+            nombre = OTROS
+        host = almacen['hosts'].setdefault(nombre, {
+            'requests': {}, 'failures': 0, 'bytes': 0, 'duracion': {},
+        })
+        estado = peticion['cache']
+        host['requests'][estado] = host['requests'].get(estado, 0) + 1
+        if estado == 'error' or (peticion.get('status') or 0) >= 400:
+            host['failures'] += 1
+        host['bytes'] += peticion.get('bytes') or 0
+        _observar(host['duracion'], BUCKETS_UPSTREAM, peticion['ms'] / 1000)
+
+
+def registrar(resumen, ok):
+    """Suma una ejecución (el resumen de utils.tiempos) al almacén y reescribe el .prom."""
+    if not activo():
+        return
+    try:
+        with archivos.bloqueo(ruta_almacen() + '.lock'):
+            almacen = archivos.leer_json(ruta_almacen(), None) or {
+                'desde': time.time(), 'scripts': {}, 'hosts': {},
+            }
+            _acumular(almacen, resumen, ok)
+            archivos.escribir_json(ruta_almacen(), almacen)
+            archivos.escribir_atomico(ruta_prom(), formatear(almacen).encode('utf-8'))
+    except OSError:
+        pass  # Sin disco no hay métricas, pero el script ya respondió
+
+
+def leer():
+    return archivos.leer_json(ruta_almacen(), None) or {'desde': time.time(), 'scripts': {}, 'hosts': {}}
+
+
+def _etiquetas(**etiquetas):
+    partes = []
+    for clave, valor in etiquetas.items():
+        valor = str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        partes.append(f'{clave}="{valor}"')
+    return '{' + ','.join(partes) + '}'
+
+
+def _numero(valor):
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+def _histograma(lineas, nombre, buckets, histograma, **etiquetas):
+    for limite, cuenta in zip(buckets, histograma['buckets']):
+        lineas.append(f"{nombre}_bucket{_etiquetas(**etiquetas, le=limite)} {cuenta}")
+    lineas.append(f"{nombre}_bucket{_etiquetas(**etiquetas, le='+Inf')} {histograma['count']}")
+    lineas.append(f"{nombre}_sum{_etiquetas(**etiquetas)} {_numero(round(histograma['sum'], 6))}")
+    lineas.append(f"{nombre}_count{_etiquetas(**etiquetas)} {histograma['count']}")
+
+
+def _familia(lineas, nombre, tipo, ayuda):
+    lineas.append(f"# HELP {nombre} {ayuda}")
+    lineas.append(f"# TYPE {nombre} {tipo}")
+
+
+def formatear(almacen):
+    """Texto de exposición de Prometheus para el almacén."""
+    scripts = sorted(almacen['scripts'].items())
+    hosts = sorted(almacen['hosts'].items())
+    lineas = []
+
+    _familia(lineas, 'botillero_script_runs_total', 'counter', 'Ejecuciones de scripts Python por resultado.')
+    for nombre, datos in scripts:
+        for resultado, cuenta in sorted(datos['runs'].items()):
+            lineas.append(f"botillero_script_runs_total{_etiquetas(script=nombre, result=resultado)} {cuenta}")
+
+    _familia(lineas, 'botillero_script_duration_seconds', 'histogram', 'Duración total de cada ejecución.')
+    for nombre, datos in scripts:
+        _histograma(lineas, 'botillero_script_duration_seconds', BUCKETS_SCRIPT, datos['duracion'], script=nombre)
+
+    _familia(lineas, 'botillero_upstream_requests_total', 'counter', 'Peticiones HTTP por host y estado de caché.')
+    for host, datos in hosts:
+        for estado, cuenta in sorted(datos['requests'].items()):
+            lineas.append(f"botillero_upstream_requests_total{_etiquetas(host=host, cache=estado)} {cuenta}")
+
+    _familia(lineas, 'botillero_upstream_failures_total', 'counter', 'Errores de red y respuestas >= 400 por host.')
+    for host, datos in hosts:
+        lineas.append(f"botillero_upstream_failures_total{_etiquetas(host=host)} {datos['failures']}")
+
+    _familia(lineas, 'botillero_upstream_bytes_total', 'counter', 'Bytes de cuerpo bajados de la red por host.')
+    for host, datos in hosts:
+        lineas.append(f"botillero_upstream_bytes_total{_etiquetas(host=host)} {datos['bytes']}")
+
+    _familia(lineas, 'botillero_upstream_duration_seconds', 'histogram', 'Latencia de cada petición HTTP por host.')
+    for host, datos in hosts:
+        _histograma(lineas, 'botillero_upstream_duration_seconds', BUCKETS_UPSTREAM, datos['duracion'], host=host)
+
+    _familia(lineas, 'botillero_upstream_cache_hit_ratio', 'gauge',
+             'Fracción de peticiones respondidas desde la caché (hit o 304).')
+    for host, datos in hosts:
+        total = sum(datos['requests'].values())
+        aciertos = sum(datos['requests'].get(c, 0) for c in _SIN_DESCARGA)
+        lineas.append(f"botillero_upstream_cache_hit_ratio{_etiquetas(host=host)} {_numero(round(aciertos / total, 4) if total else 0.0)}")
+
+    _familia(lineas, 'botillero_metrics_since_seconds', 'gauge', 'Momento (epoch) desde el que se acumulan las métricas.')
+    lineas.append(f"botillero_metrics_since_seconds {_numero(float(round(almacen.get('desde', 0))))}")
+    return '\n'.join(lineas) + '\n'
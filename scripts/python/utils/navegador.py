@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+Navegador headless compartido por los scripts que necesitan renderizar la
+página (tabla.py, proxpar.py).
+
+navegador.py mantiene un Chromium corriendo y deja en temp/navegador/estado.json
+su endpoint de depuración (CDP). pagina() se conecta a ese Chromium y entrega
+una página en un contexto nuevo (cookies, caché y storage propios) que se
+cierra al salir: conectarse cuesta una fracción de lo que cuesta lanzar un
+navegador en cada consulta. paginas(n) entrega n páginas así sobre una sola
+conexión, para cargar varias URL a la vez sin un navegador por cada una. Cada
+página usada queda anotada para que el servicio recicle el navegador pasadas
+MAX_PAGINAS o si crece demasiado.
+
+Si el servicio no está corriendo, pagina() y paginas() lanzan un Chromium
+propio para esa consulta (como antes) y arrancan el servicio en segundo plano
+para las siguientes. BOTILLERO_BROWSER=0 no usa el servicio.
+"""
+import os
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+
+from utils import archivos, tiempos
+
+ENV = 'BOTILLERO_BROWSER'
+
+# Cabecera de un navegador real para evitar ser detectado como un bot
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/127.0.0.0 Safari/537.36"
+)
+VIEWPORT = {'width': 1920, 'height': 1080}
+# Estabilidad en servidor (VPS/Linux)
+ARGS = ['--no-sandbox', '--disable-dev-shm-usage']
+
+TIMEOUT_CONEXION = 5
+# Entre dos intentos de arrancar el servicio desde un script
+ESPERA_ARRANQUE = 60
+# Pasado este tamaño servicio.log se rota a servicio.log.1 al arrancar el servicio
+MAX_LOG = 1024 * 1024
+
+SERVICIO = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'navegador.py')
+
+
+def activo():
+    return os.environ.get(ENV) != '0'
+
+
+def ruta_estado():
+    return archivos.ruta_temp('navegador', 'estado.json')
+
+
+def ruta_paginas(generacion):
+    return archivos.ruta_temp('navegador', f'{generacion}.paginas')
+
+
+def ruta_log():
+    return archivos.ruta_temp('navegador', 'servicio.log')
+
+
+def _rotar_log():
+    ruta = ruta_log()
+    try:
+        if os.path.getsize(ruta) > MAX_LOG:
+            os.replace(ruta, ruta + '.1')
+    except OSError:
+        pass  # Sin log todavía, o en uso por otro servicio (Windows): se rota la próxima vez
+
+
+def estado():
+    """Navegador vigente del servicio ({endpoint, pid, generacion, servicio, desde}) o None."""
+    return archivos.leer_json(ruta_estado())
+
+
+def anotar_pagina(generacion, cantidad=1):
+    # Un byte por página: con O_APPEND las escrituras de varios procesos no se pisan
+    fd = os.open(ruta_paginas(generacion), os.O_WRONLY | os.O_CREAT | os.O_APPEND)
+    try:
+        os.write(fd, b'.' * cantidad)
+    finally:
+        os.close(fd)
+
+
+def paginas_usadas(generacion):
+    try:
+        return os.path.getsize(ruta_paginas(generacion))
+    except OSError:
+        return 0
+
+
+def arrancar_servicio():
+    """Lanza navegador.py desacoplado; si ya hay uno corriendo, el nuevo sale solo."""
+    marca = archivos.ruta_temp('navegador', 'arranque')
+    try:
+        if time.time() - os.path.getmtime(marca) < ESPERA_ARRANQUE:
+            return
+    except OSError:
+        pass
+    with open(marca, 'w'):
+        pass
+
+    if os.name == 'nt':
+        opciones = {'creationflags': subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP}
+    else:
+        opciones = {'start_new_session': True}
+    env = {k: v for k, v in os.environ.items() if k not in ('BOTILLERO_DEADLINE', 'BOTILLERO_JSON')}
+    _rotar_log()
+    try:
+        with open(ruta_log(), 'ab') as log:
+            subprocess.Popen(
+                [sys.executable, '-u', SERVICIO], cwd=os.path.dirname(SERVICIO), env=env,
+                stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT, **opciones,
+            )
+    except OSError:
+        pass
+
+
+def _conectar(p):
+    """(browser, generacion); generacion es None si el navegador se lanzó para esta consulta."""
+    if activo():
+        actual = estado()
+        if actual:
+            try:
+                with tiempos.etapa('browser_connect'):
+                    browser = p.chromium.connect_over_cdp(actual['endpoint'], timeout=TIMEOUT_CONEXION * 1000)
+                tiempos.marcar('browser', 'pool')
+                return browser, actual['generacion']
+            except Exception:
+                pass  # Servicio caído o reciclando: se lanza uno propio
+        arrancar_servicio()
+    with tiempos.etapa('browser_launch'):
+        browser = p.chromium.launch(headless=True, args=ARGS)
+    tiempos.marcar('browser', 'launch')
+    return browser, None
+
+
+@contextmanager
+def paginas(cantidad, user_agent=USER_AGENT, viewport=VIEWPORT):
+    """
+    Lista de `cantidad` páginas de Playwright (API sync), cada una en su
+    contexto, sobre una sola conexión al navegador compartido (o un solo
+    navegador propio si el servicio no está).
+    """
+    # Playwright solo se carga cuando realmente se va a abrir el navegador
+    from playwright.sync_api import sync_playwright
+
+    with sync_playwright() as p:
+        browser, generacion = _conectar(p)
+        contextos = []
+        try:
+            for _ in range(cantidad):
+                contextos.append(browser.new_context(user_agent=user_agent, viewport=viewport))
+            yield [contexto.new_page() for contexto in contextos]
+        finally:
+            for contexto in contextos:
+                contexto.close()
+            if generacion is None:
+                browser.close()
+            elif contextos:
+                # Conectado por CDP: al salir de sync_playwright solo se desconecta
+                anotar_pagina(generacion, len(contextos))
+
+
+@contextmanager
+def pagina(user_agent=USER_AGENT, viewport=VIEWPORT):
+    """Página de Playwright (API sync) en un contexto nuevo del navegador compartido."""
+    with paginas(1, user_agent, viewport) as (unica,):
+        yield unica
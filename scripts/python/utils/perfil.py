@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+Perfilado a pedido, sin tocar el código de los scripts.
+
+BOTILLERO_PROFILE=1 (o una lista de scripts: "net_analyzer.py,proxpar.py")
+hace que utils.script corra el script bajo cProfile y tracemalloc y deje en
+temp/profiles (o BOTILLERO_PROFILE_DIR):
+
+  <script>-<fecha>-<pid>.prof      estadísticas de cProfile (snakeviz, pstats)
+  <script>-<fecha>-<pid>.mem.txt   las líneas que más memoria asignaron
+
+cProfile solo ve el hilo principal; lo que corre en asyncio.to_thread aparece
+como espera. tracemalloc sí cuenta todos los hilos.
+"""
+import os
+import time
+
+from utils import archivos, tiempos
+# cProfile y tracemalloc se importan en perfilar(): casi nunca se usan y
+# utils.script se carga en todos los scripts
+
+ENV = 'BOTILLERO_PROFILE'
+TOP_ASIGNACIONES = 25
+# Frames guardados por asignación: más da mejor contexto pero cuesta memoria
+FRAMES = 5
+
+
+def activo(script):
+    valor = os.environ.get(ENV, '').strip()
+    if not valor or valor == '0':
+        return False
+    if valor in ('1', 'all'):
+        return True
+    return script in {s.strip() for s in valor.split(',')}
+
+
+def _ruta_base(script):
+    carpeta = os.environ.get('BOTILLERO_PROFILE_DIR') or archivos.ruta_temp('profiles', '')
+    os.makedirs(carpeta, exist_ok=True)
+    nombre = f"{script.rsplit('.', 1)[0]}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+    return os.path.join(carpeta, nombre)
+
+
+def _escribir_memoria(ruta, snapshot, pico):
+    """Top de asignaciones vivas de un snapshot de tracemalloc."""
+    estadisticas = snapshot.statistics('lineno')
+    with open(ruta, 'w', encoding='utf-8') as f:
+        f.write(f"Pico de memoria trazada: {pico / 1024:.0f} KB\n")
+        f.write(f"Top {TOP_ASIGNACIONES} líneas por memoria viva al terminar:\n\n")
+        for estadistica in estadisticas[:TOP_ASIGNACIONES]:
+            f.write(f"{estadistica}\n")
+
+
+def perfilar(funcion, script):
+    """Ejecuta `funcion` perfilada y guarda los resultados aunque termine con error."""
+    import cProfile
+    import tracemalloc
+
+    base = _ruta_base(script)
+    ya_trazando = tracemalloc.is_tracing()
+    if not ya_trazando:
+        tracemalloc.start(FRAMES)
+    perfil = cProfile.Profile()
+    try:
+        perfil.runcall(funcion)
+    finally:
+        snapshot = tracemalloc.take_snapshot()
+        _, pico = tracemalloc.get_traced_memory()
+        if not ya_trazando:
+            tracemalloc.stop()
+        perfil.dump_stats(base + '.prof')
+        _escribir_memoria(base + '.mem.txt', snapshot, pico)
+        tiempos.marcar('profile', base + '.prof')
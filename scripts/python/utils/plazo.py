@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+Plazo total de la ejecución, fijado por quien lanza el script.
+
+python.service.js mata los scripts pasado su timeout (30 s, 60 s proxpar) y
+avisa la hora límite en BOTILLERO_DEADLINE (epoch en segundos). Con eso
+utils.fetch achica el timeout de cada petición a lo que queda del plazo, y
+cuando ya no queda nada lanza PlazoAgotado sin salir a la red. PlazoAgotado
+es un requests.Timeout, así que cada script lo maneja como un timeout más y
+responde con lo que alcanzó a juntar en vez de morir sin salida.
+
+Se reservan MARGEN segundos para formatear e imprimir antes del corte. Sin la
+variable (consola, SWR en segundo plano) no hay plazo.
+"""
+import os
+import time
+
+import requests
+
+ENV = 'BOTILLERO_DEADLINE'
+MARGEN = 1.5  # segundos
+# Timeout mínimo que vale la pena intentar: menos que esto es fallar seguro
+MINIMO = 0.2
+
+
+class PlazoAgotado(requests.Timeout):
+    """Se acabó el tiempo de la ejecución; la petición no llegó a salir."""
+
+
+def limite():
+    """Hora límite (epoch) o None si la ejecución no tiene plazo."""
+    try:
+        return float(os.environ[ENV])
+    except (KeyError, ValueError):
+        return None
+
+
+def restante():
+    """Segundos útiles que quedan (ya descontado MARGEN) o None sin plazo."""
+    hasta = limite()
+    if hasta is None:
+        return None
+    return hasta - time.time() - MARGEN
+
+
+def ajustar(timeout):
+    """
+    Recorta `timeout` (segundos, una tupla (conexión, lectura) o None) a lo
+    que queda del plazo. Lanza PlazoAgotado si ya no queda tiempo.
+    """
+    queda = restante()
+    if queda is None:
+        return timeout
+    if queda < MINIMO:
+        raise PlazoAgotado(f"Plazo de la ejecución agotado ({queda + MARGEN:.1f} s restantes)")
+    if timeout is None:
+        return queda
+    if isinstance(timeout, tuple):
+        return tuple(queda if t is None else min(t, queda) for t in timeout)
+    return min(timeout, queda)
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+Salida estructurada común a todos los scripts.
+
+Con `--json` en la línea de comandos (o BOTILLERO_JSON=1, que es lo que usa
+python.service.js) utils.script captura lo que el script imprime y, al
+terminar, escribe en su lugar un único objeto:
+
+    {
+      "data":    lo que el script registró con salida.datos() (o su salida
+                 si ya era JSON); null si no tiene datos estructurados,
+      "text":    el texto para WhatsApp, igual al que imprime sin --json,
+      "sources": [{"url", "host", "fetched_at", "cache", "status"}, ...],
+      "cache":   {"status": hit|miss|partial|replay|stale|error|none,
+                  "requests": {...}},
+      "timings": el mismo resumen que la línea BOTILLERO_TIMING
+    }
+
+`fetched_at` es cuándo se bajó de verdad cada respuesta (ISO 8601, UTC): una
+entrada servida desde la caché conserva la fecha en que se guardó.
+"""
+import json
+import os
+import sys
+from contextvars import ContextVar
+from datetime import datetime, timezone
+
+from utils import tiempos
+
+FLAG = '--json'
+ENV = 'BOTILLERO_JSON'
+
+# Estados de utils.fetch que no tocaron la red
+_DESDE_CACHE = {'hit', 'revalidated'}
+# Los que tampoco bajaron nada: cassette (utils.cassette) o caché
+_SIN_DESCARGA = _DESDE_CACHE | {'replay'}
+# Peticiones que no trajeron nada: error de red o circuito abierto (utils.circuito)
+_FALLIDAS = {'error', 'open'}
+
+# Por ejecución (contextvars) para que lote.py pueda correr varios scripts a la vez
+_datos = ContextVar('botillero_datos', default=None)
+_activo = ContextVar('botillero_sobre', default=False)
+
+
+def pedido():
+    """True si esta ejecución debe responder con el sobre JSON."""
+    return _activo.get() or FLAG in sys.argv[1:] or os.environ.get(ENV) == '1'
+
+
+def activar():
+    """Deja pedido() en True para esta ejecución aunque se quite --json de argv."""
+    _activo.set(True)
+
+
+def argumentos():
+    """sys.argv[1:] sin el flag --json (para los scripts que leen argv a mano)."""
+    return [a for a in sys.argv[1:] if a != FLAG]
+
+
+def reiniciar():
+    _datos.set(None)
+    _activo.set(False)
+
+
+def datos(valor):
+    """Registra el resultado estructurado de la ejecución (debe ser serializable)."""
+    _datos.set(valor)
+
+
+def datos_actuales():
+    return _datos.get()
+
+
+def fecha_iso(timestamp):
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat(timespec='seconds')
+
+
+def _fuentes():
+    lista = tiempos.fuentes()
+    for fuente in lista:
+        fuente['fetched_at'] = fecha_iso(fuente.pop('obtenida'))
+    return lista
+
+
+def _estado_cache(resumen):
+    conteo = resumen.get('cache', {})
+    if resumen.get('swr') == 'stale':
+        return {'status': 'stale', 'age_s': resumen.get('swr_age_s'), 'requests': conteo}
+    estados = set(conteo)
+    if not estados:
+        status = 'none'
+    elif 'stale' in estados:
+        status = 'stale'  # Upstream caído: se sirvió una copia vencida (utils.circuito)
+    elif estados <= _DESDE_CACHE:
+        status = 'hit'
+    elif estados <= _FALLIDAS:
+        status = 'error'
+    elif estados == {'replay'}:
+        status = 'replay'
+    elif estados & _SIN_DESCARGA:
+        status = 'partial'  # Incluye replay con alguna petición fallida
+    else:
+        status = 'miss'
+    return {'status': status, 'requests': conteo}
+
+
+def todo_fallo():
+    """True si la ejecución pidió algo y todas sus peticiones fallaron (estado 'error')."""
+    return _estado_cache(tiempos.resumen())['status'] == 'error'
+
+
+def _datos_de_texto(texto):
+    """Los scripts que ya imprimían JSON (liga, fap_search...) lo entregan como data."""
+    limpio = texto.strip()
+    if not limpio.startswith(('{', '[')):
+        return None
+    try:
+        return json.loads(limpio)
+    except ValueError:
+        return None
+
+
+def sobre(texto):
+    """Arma el sobre JSON con el texto capturado y lo registrado en esta ejecución."""
+    resumen = tiempos.resumen()
+    registrados = _datos.get()
+    return {
+        'data': registrados if registrados is not None else _datos_de_texto(texto),
+        'text': texto.rstrip('\n'),
+        'sources': _fuentes(),
+        'cache': _estado_cache(resumen),
+        'timings': resumen,
+    }
+
+
+def imprimir(texto):
+    print(json.dumps(sobre(texto), ensure_ascii=False, default=str), flush=True)
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+Punto de entrada común de los scripts: `script.ejecutar(main, *args)` bajo
+`if __name__ == '__main__'`.
+
+Reinicia el registro de tiempos (utils.tiempos), corre el script, pasando por
+stale-while-revalidate si se pide con swr=True y por el perfilador si lo pide
+BOTILLERO_PROFILE (utils.perfil), y con BOTILLERO_TIMING=1 deja en stderr la
+línea de tiempos al terminar, también si el script sale con sys.exit() o con
+una excepción. Cada ejecución se suma además a las métricas (utils.metricas).
+
+Con --json (o BOTILLERO_JSON=1) lo que el script imprime se captura y sale
+envuelto en el sobre de utils.salida; el flag se quita de sys.argv antes de
+correr el script.
+
+La captura y el argv pasan por utils.contexto, así que varias ejecuciones
+pueden convivir en un mismo proceso (lote.py).
+"""
+import io
+import os
+import sys
+from contextlib import nullcontext
+
+from utils import contexto, metricas, perfil, salida
+from utils import swr as _swr
+from utils import tiempos
+
+
+def configurar_utf8():
+    """
+    Deja stdout en UTF-8 (Windows/PowerShell). Los scripts lo llaman al importar
+    en vez de envolver sys.stdout por su cuenta, que pisaba la captura del
+    worker y de lote.py.
+    """
+    if (getattr(sys.stdout, 'encoding', None) or '').lower().replace('-', '') == 'utf8':
+        return
+    if hasattr(sys.stdout, 'reconfigure'):
+        sys.stdout.reconfigure(encoding='utf-8')
+    else:
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+
+def ejecutar(main, *args, swr=False):
+    nombre = os.path.basename(sys.argv[0])
+    tiempos.reiniciar(nombre)
+    salida.reiniciar()
+    funcion = (lambda: main(*args)) if args else main
+    if swr:
+        funcion = (lambda f=funcion: _swr.ejecutar(f))
+
+    json_pedido = salida.pedido()
+    if json_pedido:
+        salida.activar()
+        contexto.fijar_argv([sys.argv[0], *salida.argumentos()])
+    ok = False
+    captura = None  # Si capturar() falla al entrar no queda asignada
+    try:
+        with contexto.capturar() if json_pedido else nullcontext() as captura:
+            if perfil.activo(nombre):
+                perfil.perfilar(funcion, nombre)
+            else:
+                funcion()
+        ok = True
+    except SystemExit as e:
+        ok = e.code in (None, 0)
+        raise
+    finally:
+        if captura is not None:
+            salida.imprimir(captura.getvalue())
+        if os.environ.get('BOTILLERO_TIMING') == '1':
+            print(tiempos.linea(), file=sys.stderr, flush=True)
+        metricas.registrar(tiempos.resumen(), ok)
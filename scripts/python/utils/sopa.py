@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+Fachada única para parsear HTML con BeautifulSoup.
+
+Usa lxml (parser en C, varias veces más rápido) cuando está instalado y cae a
+html.parser si no. BOTILLERO_HTML_PARSER fuerza un backend (útil para comparar
+en benchmark.py). Cada documento se parsea una sola vez: las funciones de los
+scripts reciben la sopa ya armada en vez de volver a parsear el mismo HTML.
+
+Con `solo=filtro(...)` se arma el árbol únicamente para el nodo que interesa
+(la tabla, el contenedor de estados...): el resto de la página se tokeniza
+pero no se guarda, lo que baja tiempo y memoria en páginas pesadas.
+BOTILLERO_HTML_PARCIAL=0 lo desactiva y vuelve a parsear páginas completas.
+"""
+import importlib.util
+import os
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from utils import tiempos
+
+BACKEND = (
+    os.environ.get('BOTILLERO_HTML_PARSER')
+    or ('lxml' if importlib.util.find_spec('lxml') else 'html.parser')
+)
+PARCIAL = os.environ.get('BOTILLERO_HTML_PARCIAL') != '0'
+
+
+def _tiene_clase(clases):
+    buscadas = {clases} if isinstance(clases, str) else set(clases)
+
+    def coincide(valor):
+        # Al filtrar, el atributo llega como string crudo ("a b c"), no como lista
+        if not valor:
+            return False
+        tokens = valor.split() if isinstance(valor, str) else valor
+        return not buscadas.isdisjoint(tokens)
+    return coincide
+
+
+def filtro(nombre=None, clase=None, **atributos):
+    """
+    Filtro para crear(solo=...). `clase` acepta una clase o una lista de
+    alternativas y calza aunque el nodo tenga otras clases además.
+    """
+    if clase is not None:
+        atributos['class_'] = _tiene_clase(clase)
+    return SoupStrainer(nombre, **atributos)
+
+
+def crear(html, backend=None, solo=None):
+    """BeautifulSoup de `html` (str o bytes) con el backend más rápido disponible."""
+    with tiempos.etapa('parse'):
+        if solo is not None and PARCIAL:
+            return BeautifulSoup(html, backend or BACKEND, parse_only=solo)
+        return BeautifulSoup(html, backend or BACKEND)
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""
+Stale-while-revalidate para los scripts lentos (Selenium, Playwright, análisis
+de red).
+
+Con BOTILLERO_SWR=1 en el entorno, ejecutar(main) responde al tiro con la
+última salida buena guardada, más una línea con su antigüedad, y lanza en
+segundo plano un proceso que vuelve a correr el script y deja el resultado
+listo para la próxima consulta. Sin resultado guardado (o más viejo que su
+edad máxima, ver MAX_EDAD_POR_SCRIPT), o sin la variable, el script corre
+normal. Se guarda la salida con exit 0 salvo que todas sus peticiones hayan
+fallado (salida.todo_fallo): ese texto es un mensaje de error, no un resultado.
+Si la salida guardada es de hace menos de FRESCO (p. ej. la dejó prefetch.py)
+se sirve sin lanzar otro refresco.
+
+Un solo refresco a la vez por clave: quien lo lanza toma la marca
+`.refresco` (tomar_refresco) y le pasa al proceso de fondo su ficha en
+BOTILLERO_SWR_MARCA; al terminar, el refresco solo borra la marca si sigue
+siendo la suya.
+"""
+import hashlib
+import os
+import secrets
+import subprocess
+import sys
+import time
+
+from utils import archivos, cache, contexto, salida, tiempos
+
+ENV = 'BOTILLERO_SWR'
+REFRESCAR = 'refrescar'  # Valor con el que corre el proceso de fondo
+ENV_MARCA = 'BOTILLERO_SWR_MARCA'
+
+MINUTO = 60
+HORA = 60 * MINUTO
+
+# Pasado esto la salida guardada ya no se sirve y el script corre en primer plano
+MAX_EDAD = 24 * HORA
+# Scripts cuya salida vieja ya no sirve mucho antes
+MAX_EDAD_POR_SCRIPT = {
+    'net_analyzer.py': 15 * MINUTO,               # DNS, puertos y certificados de un dominio cualquiera
+}
+# Un refresco que lleva más que esto se da por muerto y se puede relanzar
+MAX_REFRESCO = 5 * MINUTO
+# Salida más nueva que esto no necesita refresco
+FRESCO = 2 * MINUTO
+
+
+def clave_de(script, args):
+    """Clave de la salida guardada de `script` con esos argumentos."""
+    return ' '.join(['swr:' + os.path.basename(script), *args])
+
+
+def max_edad(script):
+    """Edad máxima (segundos) con la que se sirve la salida guardada de `script`."""
+    return MAX_EDAD_POR_SCRIPT.get(os.path.basename(script), MAX_EDAD)
+
+
+def _clave():
+    return clave_de(sys.argv[0], sys.argv[1:])
+
+
+def _ruta_refresco(clave):
+    nombre = hashlib.sha1(clave.encode('utf-8')).hexdigest() + '.refresco'
+    return archivos.ruta_temp('swr', nombre)
+
+
+def formatear_edad(segundos):
+    if segundos < 60:
+        return f"{int(segundos)} s"
+    if segundos < 3600:
+        return f"{int(segundos // 60)} min"
+    return f"{int(segundos // 3600)} h"
+
+
+def tomar_refresco(clave):
+    """
+    Toma la marca de refresco de `clave` y devuelve la ficha que la
+    identifica, o None si ya hay un refresco en curso.
+    """
+    marca = _ruta_refresco(clave)
+    try:
+        if time.time() - os.path.getmtime(marca) < MAX_REFRESCO:
+            return None
+        os.unlink(marca)
+    except OSError:
+        pass
+    try:
+        fd = os.open(marca, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        return None  # Otro proceso ganó la carrera
+    ficha = secrets.token_hex(8)
+    try:
+        os.write(fd, ficha.encode('ascii'))
+    finally:
+        os.close(fd)
+    return ficha
+
+
+def soltar_refresco(clave, ficha):
+    """Borra la marca de refresco solo si sigue siendo la de `ficha`."""
+    marca = _ruta_refresco(clave)
+    try:
+        with open(marca, encoding='ascii') as f:
+            if f.read() != ficha:
+                return
+        os.unlink(marca)
+    except OSError:
+        pass
+
+
+def _lanzar_refresco(clave):
+    """Arranca el script en un proceso aparte, salvo que ya haya uno en curso."""
+    ficha = tomar_refresco(clave)
+    if ficha is None:
+        return
+
+    script = os.path.abspath(sys.argv[0])
+    if os.name == 'nt':
+        opciones = {'creationflags': subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP}
+    else:
+        opciones = {'start_new_session': True}
+    try:
+        subprocess.Popen(
+            [sys.executable, script, *sys.argv[1:]],
+            cwd=os.path.dirname(script),
+            # El refresco no hereda el plazo de la consulta que lo disparó (utils.plazo)
+            env={**{k: v for k, v in os.environ.items() if k != 'BOTILLERO_DEADLINE'}, ENV: REFRESCAR, ENV_MARCA: ficha},
+            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            **opciones,
+        )
+    except OSError:
+        soltar_refresco(clave, ficha)
+
+
+def _correr_y_guardar(main, clave):
+    # Se captura completa y se reenvía al terminar (la captura es por ejecución,
+    # ver utils.contexto); los consumidores leen la salida entera de todos modos
+    code = 0
+    try:
+        with contexto.capturar() as captura:
+            main()
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        raise
+    except BaseException:
+        code = 1
+        raise
+    finally:
+        texto = captura.getvalue()
+        sys.stdout.write(texto)
+        if code == 0 and not salida.todo_fallo():
+            try:
+                cache.guardar(clave, {
+                    'salida': texto,
+                    'datos': salida.datos_actuales(),
+                    'fuentes': tiempos.fuentes(),
+                })
+            except OSError:
+                pass
+
+
+def ejecutar(main):
+    """Corre `main` en modo SWR si BOTILLERO_SWR lo pide (ver utils.script)."""
+    modo = os.environ.get(ENV)
+    if not modo or modo == '0':
+        main()
+        return
+
+    clave = _clave()
+    if modo == REFRESCAR:
+        tiempos.marcar('swr', 'refresh')
+        try:
+            _correr_y_guardar(main, clave)
+        finally:
+            # Sin ficha (refresco corrido a mano) la marca no es de esta ejecución
+            if os.environ.get(ENV_MARCA):
+                soltar_refresco(clave, os.environ[ENV_MARCA])
+        return
+
+    entrada = cache.leer(clave)
+    edad = cache.edad(entrada) if entrada else None
+    if entrada and edad < max_edad(sys.argv[0]):
+        tiempos.marcar('swr', 'stale')
+        tiempos.marcar('swr_age_s', round(edad))
+        # Para el sobre JSON: los datos y fuentes de la ejecución que se sirve
+        salida.datos(entrada.get('datos'))
+        tiempos.agregar_fuentes(entrada.get('fuentes', []))
+        sys.stdout.write(entrada['salida'].rstrip('\n'))
+        if edad < FRESCO:
+            sys.stdout.write(f"\n\n_(🕒 Datos de hace {formatear_edad(edad)})_\n")
+            return
+        sys.stdout.write(
+            f"\n\n_(🕒 Datos de hace {formatear_edad(edad)}, "
+            f"actualizando en segundo plano)_\n"
+        )
+        _lanzar_refresco(clave)
+        return
+
+    _correr_y_guardar(main, clave)
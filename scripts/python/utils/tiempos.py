@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+Registro de tiempos por etapa de una ejecución: cada petición HTTP (host,
+duración, estado de caché), el parseo HTML y las etapas que marque el script.
+
+utils.script lo reinicia al empezar y, con BOTILLERO_TIMING=1, lo emite al
+final como una sola línea en stderr:
+
+    BOTILLERO_TIMING {"script": "partidos.py", "total_ms": 812.4, ...}
+
+python.service.js la separa del resto de stderr y la registra; la salida
+visible del script no cambia.
+"""
+import json
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from urllib.parse import urlsplit
+
+PREFIJO = 'BOTILLERO_TIMING '
+
+_lock = threading.Lock()
+# Un registro por ejecución: asyncio.to_thread hereda el de quien lo lanza y
+# cada hilo de lote.py arranca con el suyo
+_registro = ContextVar('botillero_tiempos', default=None)
+
+
+def _nuevo(script):
+    return {
+        'script': script,
+        'inicio': time.perf_counter(),
+        'fetch': [],
+        'stages': {},
+        'cache': {},
+        'marcas': {},
+        'fuentes': [],
+    }
+
+
+def reiniciar(script=None):
+    """Empieza un registro nuevo (lo llama utils.script al arrancar cada ejecución)."""
+    _registro.set(_nuevo(script))
+
+
+def _actual():
+    registro = _registro.get()
+    if registro is None:
+        registro = _nuevo(None)
+        _registro.set(registro)
+    return registro
+
+
+def peticion(host, ms, cache, status=None, url=None, obtenida=None, bytes_red=0):
+    """
+    Anota una petición HTTP; `cache` es hit, miss, revalidated, bypass o replay.
+    `bytes_red` es el tamaño del cuerpo bajado de la red (0 si vino de caché).
+    Con `url`, además queda como fuente del resultado; `obtenida` es el
+    timestamp en que se bajó la respuesta (la fecha de guardado si vino de caché).
+    """
+    with _lock:
+        registro = _actual()
+        registro['fetch'].append({
+            'host': host, 'ms': round(ms, 1), 'cache': cache, 'status': status, 'bytes': bytes_red,
+        })
+        registro['cache'][cache] = registro['cache'].get(cache, 0) + 1
+        if url:
+            registro['fuentes'].append({
+                'url': url, 'host': host, 'obtenida': obtenida, 'cache': cache, 'status': status,
+            })
+
+
+def carga_navegador(url, ms):
+    """Anota una página cargada con Selenium/Playwright (estado de caché 'browser')."""
+    peticion((urlsplit(url).hostname or '').lower(), ms, 'browser', url=url, obtenida=time.time())
+
+
+def agregar_fuentes(fuentes):
+    """Suma fuentes de una ejecución anterior (la salida que sirve utils.swr)."""
+    with _lock:
+        _actual()['fuentes'].extend(fuentes)
+
+
+def fuentes():
+    """Copia de las fuentes anotadas en la ejecución (con `obtenida` como timestamp)."""
+    with _lock:
+        return [dict(f) for f in _actual()['fuentes']]
+
+
+def sumar(etapa, ms):
+    with _lock:
+        etapas = _actual()['stages']
+        etapas[etapa] = etapas.get(etapa, 0) + ms
+
+
+@contextmanager
+def etapa(nombre):
+    """Suma al registro el tiempo del bloque bajo `nombre` (parse, format...)."""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        sumar(nombre, (time.perf_counter() - inicio) * 1000)
+
+
+def marcar(clave, valor):
+    """Dato suelto para el registro (p. ej. swr=stale)."""
+    with _lock:
+        _actual()['marcas'][clave] = valor
+
+
+def resumen():
+    """Registro actual listo para serializar."""
+    with _lock:
+        registro = _actual()
+        return {
+            'script': registro['script'],
+            'total_ms': round((time.perf_counter() - registro['inicio']) * 1000, 1),
+            'fetch': list(registro['fetch']),
+            'stages': {k: round(v, 1) for k, v in registro['stages'].items()},
+            'cache': dict(registro['cache']),
+            **registro['marcas'],
+        }
+
+
+def linea():
+    return PREFIJO + json.dumps(resumen(), ensure_ascii=False)
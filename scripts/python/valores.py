@@ -1,43 +1,36 @@
 import asyncio
-import aiohttp
-from bs4 import BeautifulSoup
 import sys
-import requests
 from datetime import datetime
-import io
+from utils import afetch, salida, script, sopa
 
 # Configurar salida UTF-8 para evitar errores en Windows (Consistente con otros scripts)
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+script.configurar_utf8()
 
-# Headers para evitar bloqueos
-HEADERS = {
-    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-}
+# Google Finance: solo se arma el div con el precio
+SOLO_VALOR = sopa.filtro('div', clase='YMlKec')
 
-# Limitar el número de solicitudes simultáneas
-MAX_CONCURRENT_REQUESTS = 5
+# La concurrencia contra Google Finance la acota afetch (límite por host)
 
-async def obtener_html(session, url):
+async def obtener_html(url):
     try:
-        async with session.get(url, headers=HEADERS, timeout=10) as response:
-            if response.status == 200:
-                return await response.text()
-            else:
-                return None
+        response = await afetch.get(url, timeout=10)
+        if response.status_code == 200:
+            return response.text
+        else:
+            return None
     except Exception as e:
         return None
 
-async def obtener_valor_google(session, url, semaphore):
-    async with semaphore:
-        html = await obtener_html(session, url)
-        if html:
-            soup = BeautifulSoup(html, 'html.parser')
-            div_valor = soup.find('div', class_='YMlKec fxKbKc')
-            if div_valor:
-                return div_valor.text.strip().replace(",", "")
-        return None
+async def obtener_valor_google(url):
+    html = await obtener_html(url)
+    if html:
+        soup = sopa.crear(html, solo=SOLO_VALOR)
+        div_valor = soup.find('div', class_='YMlKec fxKbKc')
+        if div_valor:
+            return div_valor.text.strip().replace(",", "")
+    return None
 
-async def obtener_valores_divisas(session):
+async def obtener_valores_divisas():
     urls = {
         '💵 USD (Google)': 'https://www.google.com/finance/quote/USD-CLP',
         '🇪🇺 EUR (Google)': 'https://www.google.com/finance/quote/EUR-CLP',
@@ -48,13 +41,11 @@ async def obtener_valores_divisas(session):
         '🇯🇵 JPY': 'https://www.google.com/finance/quote/JPY-CLP',
         '🇧🇷 BRL': 'https://www.google.com/finance/quote/BRL-CLP'
     }
-    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
-    
     tasks = []
     keys = []
     for name, url in urls.items():
         keys.append(name)
-        tasks.append(obtener_valor_google(session, url, semaphore))
+        tasks.append(obtener_valor_google(url))
     
     resultados = await asyncio.gather(*tasks)
     return dict(zip(keys, resultados))
@@ -71,11 +62,11 @@ def formatear_con_decimales(valor):
     except (ValueError, TypeError):
         return str(valor)
 
-def obtener_indicadores_mindicador():
+async def obtener_indicadores_mindicador():
     """Obtiene los principales indicadores económicos desde mindicador.cl."""
     try:
         url = "https://mindicador.cl/api"
-        response = requests.get(url, headers=HEADERS, timeout=10)
+        response = await afetch.get(url, timeout=10)
         response.raise_for_status()
         data = response.json()
 
@@ -104,34 +95,36 @@ def obtener_indicadores_mindicador():
             f"📈 *IPC ({ipc_fecha}):* {ipc_valor}%"
         ]
         return "\n".join(reporte)
-    except (requests.RequestException, KeyError) as e:
+    # requests.RequestException es un OSError: así requests no se importa al cargar el script
+    except (OSError, KeyError) as e:
         return f"⚠️ Error obteniendo indicadores oficiales: {e}"
 
 async def main():
     ahora = datetime.now()
     fecha = ahora.strftime("%d-%m-%Y")
     
+    # Mindicador y Google Finance se consultan a la vez
+    indicadores, valores_divisas = await asyncio.gather(
+        obtener_indicadores_mindicador(),
+        obtener_valores_divisas(),
+    )
+
+    salida.datos({'fecha': fecha, 'indicadores': indicadores, 'divisas': valores_divisas})
+
     print(f"📅 *Indicadores Económicos - {fecha}*\n")
     
     # 1. Indicadores Oficiales (Mindicador.cl)
-    print(obtener_indicadores_mindicador())
+    print(indicadores)
     
     # 2. Divisas en tiempo real (Google Finance)
-    async with aiohttp.ClientSession() as session:
-        valores_divisas = await obtener_valores_divisas(session)
-
-        if any(valores_divisas.values()):
-            print("\n--- 🌎 *Divisas (Google Finance)* ---")
-            for nombre, valor in valores_divisas.items():
-                if valor:
-                    print(f"{nombre}: ${formatear_con_decimales(valor)}")
+    if any(valores_divisas.values()):
+        print("\n--- 🌎 *Divisas (Google Finance)* ---")
+        for nombre, valor in valores_divisas.items():
+            if valor:
+                print(f"{nombre}: ${formatear_con_decimales(valor)}")
 
 if __name__ == "__main__":
-    # Fix para Windows y asyncio
-    if sys.platform == 'win32':
-        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
-        
     try:
-        asyncio.run(main())
+        script.ejecutar(lambda: afetch.correr(main()))
     except Exception as e:
         print(f"Error en el script principal: {e}", file=sys.stderr)
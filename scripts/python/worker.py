@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""
+worker.py
+Proceso Python de larga vida que ejecuta los scripts de scripts/python sin
+pagar el arranque del intérprete ni las importaciones pesadas en cada comando.
+
+Protocolo (una línea JSON por mensaje):
+  stdin  -> {"id": 1, "script": "metro.py", "args": [], "env": {}}
+  stdout <- {"id": 1, "code": 0, "stdout": "...", "stderr": "..."}
+
+Cada script se compila una sola vez (se recompila si cambia en disco) y se
+ejecuta como __main__ con su salida capturada, así que se comporta igual que
+`python -u scripts/python/<script>.py args`.
+
+Node levanta varios workers en paralelo (ver python-worker.service.js); cada
+uno precarga las dependencias pesadas antes de anunciarse como listo.
+"""
+import importlib
+import io
+import json
+import os
+import sys
+import traceback
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Canal del protocolo: se guarda antes de que cualquier script toque sys.stdout
+_PROTOCOLO = sys.stdout.buffer
+
+# Código compilado por script: {ruta: (mtime, code)}
+_CODIGO = {}
+
+# Dependencias pesadas que se importan una vez al arrancar el worker
+PRECARGA = ['requests', 'bs4', 'dns.resolver', 'PIL.Image', 'unidecode']
+
+
+class _Captura(io.BytesIO):
+    """
+    Buffer de captura que ignora close().
+    Los scripts suelen envolver sys.stdout.buffer en su propio TextIOWrapper;
+    cuando ese wrapper se recolecta cierra el buffer, y necesitamos leerlo después.
+    """
+    def close(self):
+        pass
+
+
+def resolver_script(nombre):
+    """Valida el nombre del script y devuelve su ruta absoluta dentro de scripts/python."""
+    if not isinstance(nombre, str) or os.path.basename(nombre) != nombre or not nombre.endswith('.py'):
+        raise ValueError(f"Nombre de script inválido: {nombre!r}")
+    ruta = os.path.join(SCRIPTS_DIR, nombre)
+    if not os.path.isfile(ruta):
+        raise FileNotFoundError(f"No existe el script {nombre}")
+    return ruta
+
+
+def compilar(ruta):
+    """Devuelve el code object del script, recompilando solo si el archivo cambió."""
+    mtime = os.path.getmtime(ruta)
+    cacheado = _CODIGO.get(ruta)
+    if cacheado and cacheado[0] == mtime:
+        return cacheado[1]
+    with open(ruta, 'rb') as f:
+        codigo = compile(f.read(), ruta, 'exec')
+    _CODIGO[ruta] = (mtime, codigo)
+    return codigo
+
+
+def _codigo_salida(exc):
+    """Traduce un SystemExit al código que devolvería el intérprete."""
+    if exc.code is None:
+        return 0
+    if isinstance(exc.code, int):
+        return exc.code
+    print(exc.code, file=sys.stderr)
+    return 1
+
+
+def correr_como_main(ruta, codigo):
+    """Ejecuta el code object como __main__ y devuelve el código de salida."""
+    try:
+        exec(codigo, {'__name__': '__main__', '__file__': ruta, '__builtins__': __builtins__})
+    except SystemExit as e:
+        return _codigo_salida(e)
+    except BaseException as e:
+        # Igual que el intérprete, sin el frame del propio worker
+        traceback.print_exception(type(e), e, e.__traceback__.tb_next)
+        return 1
+    return 0
+
+
+def ejecutar_script(nombre, args=(), env=None):
+    """
+    Ejecuta un script como si fuera __main__ y devuelve (code, stdout, stderr).
+    El estado global que los scripts modifican (stdout/stderr, argv, entorno)
+    se restaura al terminar.
+    """
+    ruta = resolver_script(nombre)
+    codigo = compilar(ruta)
+
+    captura_out, captura_err = _Captura(), _Captura()
+    stdout_previo, stderr_previo = sys.stdout, sys.stderr
+    argv_previo = sys.argv
+    entorno_previo = {k: os.environ.get(k) for k in (env or {})}
+
+    sys.stdout = io.TextIOWrapper(captura_out, encoding='utf-8', errors='replace')
+    sys.stderr = io.TextIOWrapper(captura_err, encoding='utf-8', errors='replace')
+    sys.argv = [ruta, *[str(a) for a in args]]
+    for clave, valor in (env or {}).items():
+        os.environ[clave] = str(valor)
+
+    try:
+        code = correr_como_main(ruta, codigo)
+    finally:
+        for flujo in (sys.stdout, sys.stderr):
+            try:
+                flujo.flush()
+            except Exception:
+                pass
+        sys.stdout, sys.stderr = stdout_previo, stderr_previo
+        sys.argv = argv_previo
+        for clave, valor in entorno_previo.items():
+            if valor is None:
+                os.environ.pop(clave, None)
+            else:
+                os.environ[clave] = valor
+
+    return (
+        code,
+        captura_out.getvalue().decode('utf-8', errors='replace'),
+        captura_err.getvalue().decode('utf-8', errors='replace'),
+    )
+
+
+def precargar(modulos=PRECARGA):
+    """Importa las dependencias pesadas; las que no estén instaladas se ignoran."""
+    cargados = []
+    for nombre in modulos:
+        try:
+            importlib.import_module(nombre)
+            cargados.append(nombre)
+        except Exception:
+            pass
+    return cargados
+
+
+def _responder(mensaje):
+    _PROTOCOLO.write(json.dumps(mensaje, ensure_ascii=False).encode('utf-8') + b'\n')
+    _PROTOCOLO.flush()
+
+
+def main():
+    # Los scripts importan módulos hermanos desde su propia carpeta
+    if SCRIPTS_DIR not in sys.path:
+        sys.path.insert(0, SCRIPTS_DIR)
+
+    cargados = precargar()
+    _responder({'ready': True, 'pid': os.getpid(), 'preloaded': cargados})
+
+    for linea in sys.stdin.buffer:
+        linea = linea.strip()
+        if not linea:
+            continue
+        try:
+            peticion = json.loads(linea)
+        except ValueError as e:
+            print(f"Petición inválida: {e}", file=sys.stderr)
+            continue
+
+        id_peticion = peticion.get('id')
+        try:
+            code, stdout, stderr = ejecutar_script(
+                peticion.get('script'), peticion.get('args') or [], peticion.get('env')
+            )
+        except (ValueError, FileNotFoundError) as e:
+            code, stdout, stderr = 1, '', str(e)
+
+        _responder({'id': id_peticion, 'code': code, 'stdout': stdout, 'stderr': stderr})
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,6 @@
 // src/config/index.js
 const dotenv = require('dotenv');
+const os = require('os');
 const path = require('path');
 
 dotenv.config({ path: path.resolve(__dirname, '..', '..', '.env') });
@@ -28,7 +29,13 @@ const config = {
   weatherApiKey: process.env.WEATHER_API_KEY,
   geminiApiKey: process.env.GEMINI_API_KEY,
   notificationPort: process.env.NOTIFICATION_PORT || 3001,
-  notificationGroupId: process.env.NOTIFICATION_GROUP_ID
+  notificationGroupId: process.env.NOTIFICATION_GROUP_ID,
+  // Workers Python precalentados (uno por núcleo, entre 2 y 4 si no se indica)
+  pythonWorkers: parseInt(process.env.PYTHON_WORKERS, 10) || Math.max(2, Math.min(4, os.cpus().length)),
+  // Scripts lentos responden con su último resultado y se refrescan en segundo plano
+  pythonSwr: process.env.PYTHON_SWR !== '0',
+  // Planificador que mantiene calientes las cachés de los comandos más usados
+  pythonPrefetch: process.env.PYTHON_PREFETCH === '1'
 };
 
 module.exports = config;
\ No newline at end of file
@@ -6,6 +6,7 @@ const si = require('systeminformation');
 const axios = require('axios');
 const ping = require('ping');
 const packageInfo = require('../../package.json');
+const { getPoolStats, getCoalesceStats } = require('../services/python.service');
 
 // --- Tiempo de inicio del bot ---
 const BOT_START_TIME = Date.now();
@@ -290,6 +291,9 @@ async function handlePing(message) {
     // Servicios check
     const internetStatus = services.internet ? '✅ Conectado' : '❌ Sin conexión';
     const pythonStatus = services.python ? '✅ Disponible' : '⚠️ No detectado';
+    const pool = getPoolStats();
+    const poolStatus = pool ? `${pool.busy}/${pool.size} ocupados, ${pool.queued} en cola` : 'Sin iniciar';
+    const flights = getCoalesceStats();
 
     // Temperatura
     const tempInfo = temperature ? 
@@ -323,6 +327,8 @@ async function handlePing(message) {
 🟢 Node: ${nodeVersion}
 🔧 Versión: v${botVersion}
 🐍 Python: ${pythonStatus}
+🧵 Workers Python: ${poolStatus}
+🔁 Scripts unificados: ${flights.coalesced} de ${flights.executions + flights.coalesced} pedidos
 `.trim();
 
     return response;
@@ -31,7 +31,7 @@ async function getLeagueTable() {
 
     try {
         console.log(`(Servicio Liga) -> Ejecutando tabla.py...`);
-        const result = await pythonService.executeScript('tabla.py');
+        const result = await pythonService.executeScript('tabla.py', [], { swr: true });
         if (result.code !== 0) {
             throw new Error(result.stderr || 'Error al ejecutar tabla.py');
         }
@@ -53,7 +53,7 @@ async function getLeagueUpcomingMatches() {
     try {
         console.log(`(Servicio Liga) -> Ejecutando proxpar.py...`);
         // Aumentamos el timeout a 60s porque Selenium puede ser lento
-        const result = await pythonService.executeScript('proxpar.py', [], { timeout: 60000 });
+        const result = await pythonService.executeScript('proxpar.py', [], { timeout: 60000, swr: true });
         if (result.code !== 0) {
             throw new Error(result.stderr || 'Error al ejecutar proxpar.py');
         }
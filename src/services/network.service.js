@@ -5,7 +5,7 @@ const pythonService = require('./python.service');
 
 async function analyzeDomain(domain) {
     try {
-        const result = await pythonService.executeScript('net_analyzer.py', [domain]);
+        const result = await pythonService.executeScript('net_analyzer.py', [domain], { swr: true });
         
         if (result.code !== 0) {
             throw new Error(result.stderr || 'Error en el análisis de red.');
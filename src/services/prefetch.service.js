@@ -0,0 +1,55 @@
+// src/services/prefetch.service.js
+"use strict";
+
+const { spawn } = require('child_process');
+const path = require('path');
+const readline = require('readline');
+const config = require('../config');
+const { PYTHON_COMMAND } = require('./python.service');
+
+const PREFETCH_SCRIPT = path.join(__dirname, '..', '..', 'scripts', 'python', 'prefetch.py');
+
+// Si el planificador muere, se relanza con espera creciente (tope 5 minutos)
+const RESTART_MIN_MS = 5000;
+const RESTART_MAX_MS = 5 * 60 * 1000;
+
+let proc = null;
+let stopping = false;
+let restartDelay = RESTART_MIN_MS;
+
+/**
+ * Levanta scripts/python/prefetch.py, que mantiene calientes las cachés de
+ * !metro, !valores, !bolsa y !tabla. Solo con PYTHON_PREFETCH=1.
+ */
+function startPrefetch() {
+    if (!config.pythonPrefetch || proc) return;
+    stopping = false;
+
+    const child = spawn(PYTHON_COMMAND, ['-u', PREFETCH_SCRIPT], { windowsHide: true });
+    proc = child;
+    const startedAt = Date.now();
+
+    readline.createInterface({ input: child.stdout }).on('line', (line) => console.log(line));
+    child.stderr.on('data', (chunk) => {
+        console.error(`(Prefetch) -> ${chunk.toString().trim()}`);
+    });
+
+    child.on('error', (err) => {
+        console.error('(Prefetch) -> No se pudo iniciar:', err.message);
+    });
+    child.on('exit', (code, signal) => {
+        proc = null;
+        if (stopping) return;
+        // Un planificador que anduvo un buen rato vuelve a la espera mínima
+        restartDelay = Date.now() - startedAt > RESTART_MAX_MS ? RESTART_MIN_MS : Math.min(restartDelay * 2, RESTART_MAX_MS);
+        console.error(`(Prefetch) -> Terminó (code: ${code}, signal: ${signal}), reintentando en ${restartDelay / 1000}s.`);
+        setTimeout(startPrefetch, restartDelay).unref();
+    });
+}
+
+function stopPrefetch() {
+    stopping = true;
+    if (proc) proc.kill();
+}
+
+module.exports = { startPrefetch, stopPrefetch };
@@ -0,0 +1,260 @@
+// src/services/python-worker.service.js
+"use strict";
+
+const { spawn } = require('child_process');
+const path = require('path');
+const readline = require('readline');
+
+const WORKER_SCRIPT = path.join(__dirname, '..', '..', 'scripts', 'python', 'worker.py');
+
+// Scripts que pueden tardar decenas de segundos: nunca ocupan todos los workers
+const SLOW_SCRIPTS = new Set(['net_analyzer.py', 'proxpar.py', 'tabla.py']);
+const BATCH_SCRIPT = 'lote.py';
+
+/**
+ * true si el trabajo puede tardar decenas de segundos: un script lento o un
+ * lote (scripts/python/lote.py) que incluya alguno.
+ * @param {string} scriptName
+ * @param {Array} args
+ */
+function isSlowJob(scriptName, args) {
+    if (SLOW_SCRIPTS.has(scriptName)) return true;
+    if (scriptName !== BATCH_SCRIPT) return false;
+    try {
+        const items = JSON.parse(args[0]);
+        return !Array.isArray(items) ||
+            items.some(item => SLOW_SCRIPTS.has(typeof item === 'string' ? item : item && item.script));
+    } catch (e) {
+        return true; // Lote que no se puede leer aquí: se trata como lento por si acaso
+    }
+}
+
+/**
+ * Proceso Python persistente (scripts/python/worker.py).
+ * Ejecuta un script a la vez; las peticiones extra esperan en una cola local
+ * para que el timeout de cada una cuente desde que realmente empieza a correr.
+ */
+class PythonWorker {
+    /**
+     * @param {string} pythonExec - Ejecutable de Python a usar
+     */
+    constructor(pythonExec) {
+        this.pythonExec = pythonExec;
+        this.proc = null;
+        this.nextId = 1;
+        this.current = null; // { id, resolve, reject, timer }
+        this.queue = [];
+        this.failed = false; // true si Python no se pudo iniciar: usar spawn clásico
+    }
+
+    get busy() {
+        return this.current !== null;
+    }
+
+    get pending() {
+        return this.queue.length + (this.current ? 1 : 0);
+    }
+
+    start() {
+        if (this.proc) return;
+
+        const proc = spawn(this.pythonExec, ['-u', WORKER_SCRIPT], { windowsHide: true });
+        this.proc = proc;
+
+        readline.createInterface({ input: proc.stdout }).on('line', (line) => this._onLine(line));
+        proc.stderr.on('data', (chunk) => {
+            console.error(`(Worker Python ${proc.pid}) -> ${chunk.toString().trim()}`);
+        });
+
+        proc.on('error', (err) => {
+            console.error('(Worker Python) -> No se pudo iniciar:', err.message);
+            this.failed = true;
+            this._onExit(proc, `Python worker error: ${err.message}`);
+        });
+        proc.on('exit', (code, signal) => {
+            this._onExit(proc, `Worker terminado (code: ${code}, signal: ${signal})`);
+        });
+    }
+
+    /**
+     * Encola la ejecución de un script.
+     * @param {string} scriptName
+     * @param {Array} args
+     * @param {Object} opts - { timeout, env }
+     * @returns {Promise<{code, stdout, stderr}>}
+     */
+    run(scriptName, args = [], opts = {}) {
+        return new Promise((resolve, reject) => {
+            this.queue.push({ scriptName, args, opts, resolve, reject });
+            this._next();
+        });
+    }
+
+    stop() {
+        if (this.proc) this.proc.kill();
+    }
+
+    _next() {
+        if (this.current || this.queue.length === 0) return;
+        this.start();
+
+        const job = this.queue.shift();
+        const id = this.nextId++;
+        const timeout = job.opts.timeout || 30000;
+
+        this.current = {
+            id,
+            resolve: job.resolve,
+            reject: job.reject,
+            // Igual que spawn({timeout}): se mata el proceso y el resultado es code 1
+            timer: setTimeout(() => {
+                console.error(`(Worker Python) -> Timeout de ${timeout}ms en ${job.scriptName}, reiniciando worker.`);
+                const stuck = this.proc;
+                this.proc = null;
+                if (stuck) stuck.kill();
+                this._finish({ code: 1, stdout: '', stderr: `Timeout de ${timeout}ms ejecutando ${job.scriptName}` });
+            }, timeout)
+        };
+
+        // Hora límite para el script (utils/plazo.py): desde que el timer empieza a correr
+        const env = { ...job.opts.env, BOTILLERO_DEADLINE: String((Date.now() + timeout) / 1000) };
+        const request = { id, script: job.scriptName, args: job.args.map(String), env };
+        this.proc.stdin.write(JSON.stringify(request) + '\n');
+    }
+
+    _onLine(line) {
+        let msg;
+        try {
+            msg = JSON.parse(line);
+        } catch (e) {
+            return; // Ruido de librerías nativas escribiendo directo al fd 1
+        }
+        if (!this.current || msg.id !== this.current.id) return;
+        this._finish({ code: msg.code, stdout: msg.stdout || '', stderr: msg.stderr || '' });
+    }
+
+    _onExit(proc, reason) {
+        if (this.proc !== proc) return;
+        this.proc = null;
+
+        if (this.current) {
+            const { reject, timer } = this.current;
+            clearTimeout(timer);
+            this.current = null;
+            const error = new Error(reason);
+            // Si Python alcanzó a arrancar, el script recibió el trabajo y pudo haber corrido (entero o a medias)
+            error.jobSent = !this.failed;
+            reject(error);
+        }
+        if (this.failed) {
+            // Python no arranca: devolver el trabajo pendiente a quien llamó
+            for (const job of this.queue.splice(0)) job.reject(new Error(reason));
+            return;
+        }
+        this._next();
+    }
+
+    _finish(result) {
+        if (!this.current) return;
+        const { resolve, timer } = this.current;
+        clearTimeout(timer);
+        this.current = null;
+        resolve(result);
+        this._next();
+    }
+}
+
+/**
+ * Pool de N workers precalentados.
+ * Cada comando va a un worker libre, así comandos de chats distintos corren en
+ * paralelo; los scripts lentos dejan siempre un worker libre para los rápidos.
+ */
+class WorkerPool {
+    /**
+     * @param {string} pythonExec - Ejecutable de Python a usar
+     * @param {number} size - Cantidad de workers
+     */
+    constructor(pythonExec, size) {
+        this.size = Math.max(1, size);
+        this.workers = Array.from({ length: this.size }, () => new PythonWorker(pythonExec));
+        this.queue = [];
+        this.slowRunning = 0;
+        // Arrancar todos de inmediato para que ya tengan las importaciones cargadas
+        this.workers.forEach(w => w.start());
+    }
+
+    get failed() {
+        return this.workers.every(w => w.failed);
+    }
+
+    /**
+     * Encola la ejecución de un script en el primer worker libre.
+     * @returns {Promise<{code, stdout, stderr}>}
+     */
+    run(scriptName, args = [], opts = {}) {
+        return new Promise((resolve, reject) => {
+            this.queue.push({ scriptName, args, opts, resolve, reject, queuedAt: Date.now() });
+            this._dispatch();
+            if (this.queue.length > 0) {
+                console.log(`(Pool Python) -> ${scriptName} en cola (${this.queue.length} esperando, ${this._busyCount()}/${this.size} ocupados).`);
+            }
+        });
+    }
+
+    /**
+     * Estado actual del pool (para logs y !status).
+     */
+    stats() {
+        const queuedByScript = {};
+        for (const job of this.queue) {
+            queuedByScript[job.scriptName] = (queuedByScript[job.scriptName] || 0) + 1;
+        }
+        const oldest = this.queue.length ? Date.now() - this.queue[0].queuedAt : 0;
+        return {
+            size: this.size,
+            busy: this._busyCount(),
+            idle: this.size - this._busyCount(),
+            queued: this.queue.length,
+            queuedByScript,
+            oldestQueuedMs: oldest,
+            slowRunning: this.slowRunning
+        };
+    }
+
+    stop() {
+        this.workers.forEach(w => w.stop());
+    }
+
+    _busyCount() {
+        return this.workers.filter(w => w.busy).length;
+    }
+
+    _canRunSlow() {
+        return this.size === 1 || this.slowRunning < this.size - 1;
+    }
+
+    _dispatch() {
+        for (let i = 0; i < this.queue.length;) {
+            const worker = this.workers.find(w => !w.busy && !w.failed);
+            if (!worker) return;
+
+            const job = this.queue[i];
+            const slow = isSlowJob(job.scriptName, job.args);
+            if (slow && !this._canRunSlow()) {
+                i++; // Dejar pasar a los comandos rápidos que vienen detrás
+                continue;
+            }
+
+            this.queue.splice(i, 1);
+            if (slow) this.slowRunning++;
+            worker.run(job.scriptName, job.args, job.opts)
+                .then(job.resolve, job.reject)
+                .finally(() => {
+                    if (slow) this.slowRunning--;
+                    this._dispatch();
+                });
+        }
+    }
+}
+
+module.exports = { PythonWorker, WorkerPool, SLOW_SCRIPTS, isSlowJob };
@@ -2,26 +2,160 @@
 
 const { spawn } = require('child_process');
 const path = require('path');
+const { WorkerPool } = require('./python-worker.service');
+const config = require('../config');
 
 // Detectar el comando Python correcto automáticamente
 const PYTHON_COMMAND = process.env.PYTHON || (process.platform === 'win32' ? 'python' : 'python3');
 
+// Workers persistentes (PYTHON_WORKER=0 vuelve al modo de un proceso por comando)
+const WORKER_ENABLED = process.env.PYTHON_WORKER !== '0';
+let pool = null;
+
+// Single-flight: ejecuciones idénticas (mismo script, args y entorno) que llegan
+// mientras otra está en curso esperan ese mismo resultado en vez de relanzarla
+const inFlight = new Map();
+const flightStats = { executions: 0, coalesced: 0 };
+
+function getPool() {
+    if (!WORKER_ENABLED) return null;
+    if (!pool) pool = new WorkerPool(PYTHON_COMMAND, config.pythonWorkers);
+    return pool.failed ? null : pool;
+}
+
 /**
- * Ejecuta un script Python y devuelve una Promise con { stdout, stderr, code, json }.
- * @param {string} scriptName - Nombre del archivo .py (se busca en scripts/python/)
- * @param {Array} args - Argumentos para pasar al script
- * @param {Object} opts - Opciones: {pythonExec, timeout}
- * @returns {Promise<{code, stdout, stderr, json}>}
+ * Estado del pool de workers: tamaño, ocupados y profundidad de la cola.
+ * @returns {Object|null}
+ */
+function getPoolStats() {
+    return pool ? pool.stats() : null;
+}
+
+/**
+ * Contadores del single-flight: ejecuciones reales, peticiones que se sumaron
+ * a una ya en curso y cuántas hay en vuelo ahora.
+ * @returns {{executions: number, coalesced: number, inflight: number}}
+ */
+function getCoalesceStats() {
+    return { ...flightStats, inflight: inFlight.size };
+}
+
+// Línea de tiempos que emiten los scripts en stderr (utils/tiempos.py)
+const TIMING_PREFIX = 'BOTILLERO_TIMING ';
+
+/**
+ * Separa la línea de tiempos del resto de stderr.
+ * @returns {{stderr: string, timings: Object|null}}
+ */
+function extractTimings(stderr) {
+    let timings = null;
+    const lines = stderr.split('\n').filter(line => {
+        if (!line.startsWith(TIMING_PREFIX)) return true;
+        try {
+            timings = JSON.parse(line.slice(TIMING_PREFIX.length));
+        } catch (e) {
+            /* Línea truncada: se descarta igual */
+        }
+        return false;
+    });
+    return { stderr: lines.join('\n'), timings };
+}
+
+/**
+ * Resumen de una línea: total, cada upstream (la más lenta y cuántas
+ * peticiones, con su estado de caché) y las etapas medidas.
+ */
+function formatTimings(t) {
+    const hosts = new Map();
+    for (const f of t.fetch || []) {
+        const h = hosts.get(f.host) || { ms: 0, n: 0, cache: new Set() };
+        h.ms = Math.max(h.ms, f.ms);
+        h.n++;
+        h.cache.add(f.cache);
+        hosts.set(f.host, h);
+    }
+    const parts = [`${t.total_ms}ms`];
+    for (const [host, h] of hosts) {
+        parts.push(`${host} ${h.ms}ms${h.n > 1 ? ` x${h.n}` : ''} (${[...h.cache].join('/')})`);
+    }
+    for (const [stage, ms] of Object.entries(t.stages || {})) parts.push(`${stage} ${ms}ms`);
+    if (t.swr) parts.push(`swr ${t.swr}`);
+    return parts.join(' | ');
+}
+
+/**
+ * ¿Es el sobre JSON de utils/salida.py ({data, text, sources, cache, timings})?
+ */
+function isEnvelope(parsed) {
+    return parsed !== null && typeof parsed === 'object' && !Array.isArray(parsed)
+        && 'data' in parsed && 'text' in parsed && 'sources' in parsed;
+}
+
+/**
+ * Normaliza la salida de un script al contrato
+ * { code, stdout, stderr, json, timings, sources, cache }.
+ * Con el sobre JSON, stdout es el texto para WhatsApp y json los datos
+ * estructurados, igual que si el script hubiera impreso solo eso.
  */
-function executeScript(scriptName, args = [], opts = {}) {
+function buildResult(scriptName, code, signal, stdout, rawStderr) {
+    // Si code es null, fue matado por señal (ej: timeout)
+    const finalCode = code !== null ? code : (signal ? 1 : 0);
+    const { stderr, timings } = extractTimings(rawStderr);
+    if (timings) {
+        console.log(`(Python) -> ${scriptName} ${formatTimings(timings)}`);
+    }
+
+    if (finalCode !== 0 && stderr) {
+        console.error(`Error en script Python (${scriptName}) [Code: ${finalCode}, Signal: ${signal}]: ${stderr}`);
+    }
+
+    // Intentar parsear JSON si el script devuelve JSON
+    let parsed = null;
+    try {
+        parsed = JSON.parse(stdout);
+    } catch (e) {
+        /* No es JSON, es normal */
+    }
+
+    if (isEnvelope(parsed)) {
+        return {
+            code: finalCode,
+            stdout: (parsed.text || '').trim(),
+            stderr: stderr.trim(),
+            json: parsed.data,
+            timings: timings || parsed.timings || null,
+            sources: parsed.sources || [],
+            cache: parsed.cache || null
+        };
+    }
+
+    return {
+        code: finalCode,
+        stdout: stdout.trim(),
+        stderr: stderr.trim(),
+        json: parsed,
+        timings,
+        sources: [],
+        cache: null
+    };
+}
+
+/**
+ * Ejecuta el script en un proceso nuevo (modo clásico).
+ */
+function spawnScript(scriptName, args, opts) {
     return new Promise((resolve, reject) => {
         const pythonExec = opts.pythonExec || PYTHON_COMMAND;
         const scriptPath = path.join(__dirname, '..', '..', 'scripts', 'python', scriptName);
-        
+        const timeout = opts.timeout || 30000; // 30 segundos por defecto
+        // Hora límite para el script (utils/plazo.py): la misma en que se lo mata
+        const env = { ...process.env, ...opts.env, BOTILLERO_DEADLINE: String((Date.now() + timeout) / 1000) };
+
         // Agregamos '-u' para forzar salida sin buffer (importante para logs en tiempo real y evitar cortes)
-        const proc = spawn(pythonExec, ['-u', scriptPath, ...args], { 
+        const proc = spawn(pythonExec, ['-u', scriptPath, ...args], {
             windowsHide: true,
-            timeout: opts.timeout || 30000 // 30 segundos por defecto
+            timeout,
+            env
         });
 
         let stdout = '';
@@ -36,29 +170,109 @@ function executeScript(scriptName, args = [], opts = {}) {
         });
 
         proc.on('close', (code, signal) => {
-            // Si code es null, fue matado por señal (ej: timeout)
-            const finalCode = code !== null ? code : (signal ? 1 : 0);
+            resolve(buildResult(scriptName, code, signal, stdout, stderr));
+        });
+    });
+}
 
-            if (finalCode !== 0 && stderr) {
-                console.error(`Error en script Python (${scriptName}) [Code: ${finalCode}, Signal: ${signal}]: ${stderr}`);
+/**
+ * Ejecuta el script en el pool de workers o, si no se puede, en un proceso propio.
+ */
+async function runScript(scriptName, args, opts) {
+    const workers = opts.pythonExec ? null : getPool();
+    if (workers) {
+        try {
+            const { code, stdout, stderr } = await workers.run(scriptName, args, opts);
+            return buildResult(scriptName, code, null, stdout, stderr);
+        } catch (error) {
+            if (error.jobSent) {
+                // El worker murió con el script ya en curso: repetirlo duplicaría sus efectos
+                // (refresco SWR, grabación de cassettes, turnos de utils.limite)
+                console.error(`(Worker Python) -> ${scriptName} falló en el worker (${error.message}), sin reintentar.`);
+                return buildResult(scriptName, 1, null, '', error.message);
             }
+            // El worker no llegó a recibir el trabajo: correrlo en un proceso propio
+            console.error(`(Worker Python) -> ${scriptName} falló en el worker (${error.message}), usando spawn.`);
+        }
+    }
+    return spawnScript(scriptName, args, opts);
+}
 
-            // Intentar parsear JSON si el script devuelve JSON
-            let parsed = null;
-            try { 
-                parsed = JSON.parse(stdout); 
-            } catch (e) { 
-                /* No es JSON, es normal */ 
-            }
+/**
+ * Ejecuta un script Python y devuelve una Promise con
+ * { stdout, stderr, code, json, timings, sources, cache }.
+ * Los scripts responden con el sobre JSON de utils/salida.py: stdout trae el
+ * texto, json los datos estructurados y sources de dónde y cuándo salieron.
+ * Por defecto usa el worker persistente; si no está disponible, lanza un proceso nuevo.
+ * Si ya hay una ejecución idéntica en curso, espera su resultado (salvo coalesce: false).
+ * @param {string} scriptName - Nombre del archivo .py (se busca en scripts/python/)
+ * @param {Array} args - Argumentos para pasar al script
+ * @param {Object} opts - Opciones: {pythonExec, timeout, env, swr, coalesce}
+ *   swr: responder con el último resultado guardado y refrescarlo en segundo plano
+ *        (solo para scripts que usan utils.swr; se apaga con PYTHON_SWR=0)
+ * @returns {Promise<{code, stdout, stderr, json, timings, sources, cache}>}
+ */
+async function executeScript(scriptName, args = [], opts = {}) {
+    // Los scripts dejan su línea de tiempos en stderr y responden con el sobre JSON (ver buildResult)
+    opts = { ...opts, env: { BOTILLERO_TIMING: '1', BOTILLERO_JSON: '1', ...opts.env } };
+    if (opts.swr && config.pythonSwr) {
+        opts.env.BOTILLERO_SWR = '1';
+    }
+    if (opts.coalesce === false) {
+        flightStats.executions++;
+        return runScript(scriptName, args, opts);
+    }
 
-            resolve({
-                code: finalCode,
-                stdout: stdout.trim(),
-                stderr: stderr.trim(),
-                json: parsed
-            });
-        });
-    });
+    // El timeout entra en la clave: define el plazo (BOTILLERO_DEADLINE) de la ejecución compartida
+    const key = JSON.stringify([scriptName, args.map(String), opts.env || null, opts.pythonExec || null, opts.timeout || null]);
+    let flight = inFlight.get(key);
+    if (flight) {
+        flightStats.coalesced++;
+    } else {
+        flightStats.executions++;
+        flight = runScript(scriptName, args, opts).finally(() => inFlight.delete(key));
+        inFlight.set(key, flight);
+    }
+    // Cada llamador recibe su propia copia del resultado, json incluido
+    return structuredClone(await flight);
+}
+
+/**
+ * Ejecuta varios scripts a la vez en un solo proceso Python (scripts/python/lote.py),
+ * compartiendo sesiones HTTP y caché. Sirve para respuestas que juntan varios
+ * comandos (p. ej. metro + transbank + valores) sin pagar un arranque por script.
+ * @param {Array<{script: string, args?: Array, id?: string}>} items - Scripts del lote;
+ *   el id (por defecto el nombre del script) es la clave del resultado
+ * @param {Object} opts - Mismas opciones que executeScript (timeout es para el lote entero)
+ * @returns {Promise<Object<string, {code, stdout, stderr, json, timings, sources, cache, ms}>>}
+ */
+async function executeBatch(items, opts = {}) {
+    const batch = await executeScript('lote.py', [JSON.stringify(items)], opts);
+    const results = batch.json && batch.json.results;
+    if (!results) {
+        throw new Error(`Lote Python falló [Code: ${batch.code}]: ${batch.stderr}`);
+    }
+
+    const out = {};
+    for (const [id, r] of Object.entries(results)) {
+        out[id] = {
+            code: r.code,
+            stdout: (r.text || '').trim(),
+            stderr: (r.stderr || '').trim(),
+            json: r.data,
+            timings: r.timings || null,
+            sources: r.sources || [],
+            cache: r.cache || null,
+            ms: r.ms
+        };
+        if (r.timings) {
+            console.log(`(Python) -> lote ${id} ${formatTimings(r.timings)}`);
+        }
+        if (r.code !== 0 && r.stderr) {
+            console.error(`Error en script Python (lote ${id}) [Code: ${r.code}]: ${out[id].stderr}`);
+        }
+    }
+    return out;
 }
 
-module.exports = { executeScript };
\ No newline at end of file
+module.exports = { executeScript, executeBatch, getPoolStats, getCoalesceStats, PYTHON_COMMAND };
@@ -59,8 +59,8 @@ function startTransbankMonitoring(client) {
 
     monitoringInterval = setInterval(async () => {
         try {
-            // Pedimos JSON puro para analizar
-            const result = await pythonService.executeScript(TRANSBANK_SCRIPT, ['--json']);
+            // result.json trae los estados por servicio (los datos del sobre JSON)
+            const result = await pythonService.executeScript(TRANSBANK_SCRIPT);
             
             if (result.code === 0 && result.json) {
                 const data = result.json;